@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# Debug Toolbar's sync only middleware would serve one request at a time.
+os.environ.setdefault("DEBUG_TOOLBAR", "0")
 
 application = get_asgi_application()
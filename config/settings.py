@@ -10,11 +10,16 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Running `manage.py test`.
+TESTING = sys.argv[1:2] == ['test']
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
@@ -37,7 +42,6 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'debug_toolbar',
     'rest_framework',
     'core',
     'project_manager',
@@ -45,19 +49,40 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.metrics.MetricsMiddleware',
+    'core.instrumentation.RequestInstrumentationMiddleware',
+    'core.replicas.ReadYourWritesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# Debug Toolbar's middleware is sync only: in the chain, ASGI servers run every request
+# in one thread, so config.asgi turns it off unless DEBUG_TOOLBAR=1 is set.
+DEBUG_TOOLBAR = DEBUG and not TESTING and os.environ.get('DEBUG_TOOLBAR', '1') == '1'
+
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
 
+# Fraction of requests whose SQL, serializer and response metrics are recorded,
+# see core.instrumentation.RequestInstrumentationMiddleware. 0.0 under tests, which
+# enable it with override_settings, so their output does not depend on chance.
+REQUEST_INSTRUMENTATION_SAMPLE_RATE = 0.0 if TESTING else 0.01
+
+# Directory shared by the server's worker processes for /metrics, see core.metrics.Registry.
+# Without it every process serves its own metrics.
+METRICS_DIR = os.environ.get('METRICS_DIR')
+# Seconds between writes of a process' metrics to METRICS_DIR.
+METRICS_FLUSH_INTERVAL = 1.0
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -82,13 +107,82 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# DATABASE_PROFILE=production turns on the SQLite tuning below and persistent connections.
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'development')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600 if DATABASE_PROFILE == 'production' else 0,
+        'CONN_HEALTH_CHECKS': DATABASE_PROFILE == 'production',
+    }
+}
+
+# Optional read replica, e.g. DATABASE_REPLICA_NAME=replica.sqlite3 filled by `manage.py sync_replica`.
+# Read services query it, writes, the admin and migrations stay on the primary, see core.replicas.
+DATABASE_REPLICA_NAME = os.environ.get('DATABASE_REPLICA_NAME')
+if DATABASE_REPLICA_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / DATABASE_REPLICA_NAME,
+        'TEST': {'MIRROR': 'default'},
+    }
+READ_REPLICA_ALIASES = ['replica'] if DATABASE_REPLICA_NAME else []
+DATABASE_ROUTERS = ['core.replicas.PrimaryReplicaRouter']
+# Seconds a client reads from the primary after a request that wrote.
+REPLICA_STICKINESS_SECONDS = 5
+
+# Pragmas run on every new SQLite connection, see core.db.configure_sqlite_connection.
+SQLITE_PRODUCTION_PRAGMAS = {
+    # Readers no longer block behind the writer, and the writer does not wait for readers.
+    'journal_mode': 'wal',
+    # Durable up to the last checkpoint on power loss, never corrupt, and far fewer fsyncs.
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    # Negative values are KiB: 64 MiB page cache per connection.
+    'cache_size': -64 * 1024,
+    # Wait this many milliseconds for the write lock instead of failing with "database is locked".
+    'busy_timeout': 5000,
+    'temp_store': 'memory',
+}
+SQLITE_PRAGMAS = SQLITE_PRODUCTION_PRAGMAS if DATABASE_PROFILE == 'production' else {}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Cache used for list API responses, see core.cache.ResponseCache.
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 300
+
+
+# Logging
+# https://docs.djangoproject.com/en/4.2/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.instrumentation': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -1,7 +1,8 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 
-import debug_toolbar
+from core.views import metrics
 
 from . import views
 
@@ -9,5 +10,8 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("", views.home, name="home"),
     path("api/", include("project_manager.urls")),
-    path("__debug__/", include(debug_toolbar.urls)),
+    path("metrics", metrics, name="metrics"),
 ]
+
+if settings.DEBUG_TOOLBAR:
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
@@ -0,0 +1,165 @@
+import datetime
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import QuerySet
+from rest_framework import ISO_8601, fields, serializers
+from rest_framework.settings import api_settings
+
+
+@dataclass(frozen=True)
+class CompiledSerializer:
+    """
+    Read-only serializer compiled into a single function over `values_list()` rows.
+    """
+
+    columns: tuple[str, ...]
+    to_representation: Callable[[tuple[Any, ...]], dict[str, Any]]
+
+    def can_serialize(self, queryset: QuerySet[Any]) -> bool:
+        return not queryset._prefetch_related_lookups
+
+    def serialize(self, queryset: QuerySet[Any]) -> list[dict[str, Any]]:
+        to_representation = self.to_representation
+        return [to_representation(row) for row in queryset.values_list(*self.columns)]
+
+    def iterate(self, queryset: QuerySet[Any], chunk_size: int) -> Iterator[dict[str, Any]]:
+        to_representation = self.to_representation
+        for row in queryset.values_list(*self.columns).iterator(chunk_size=chunk_size):
+            yield to_representation(row)
+
+    async def aserialize(self, queryset: QuerySet[Any]) -> list[dict[str, Any]]:
+        to_representation = self.to_representation
+        return [to_representation(row) async for row in queryset.values_list(*self.columns)]
+
+    async def aiterate(self, queryset: QuerySet[Any], chunk_size: int) -> AsyncIterator[dict[str, Any]]:
+        # values_list().aiterator() opens its cursor in the event loop thread in Django 4.2,
+        # chunks of the sync iterator are fetched in the sync thread instead.
+        rows = self.iterate(queryset, chunk_size)
+        next_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)))
+        while chunk := await next_chunk():
+            for row in chunk:
+                yield row
+            if len(chunk) < chunk_size:
+                break
+
+
+class _NotCompilable(Exception):
+    pass
+
+
+class _Compiler:
+    def __init__(self) -> None:
+        self.columns: list[str] = []
+        self.converters: dict[str, Callable[[Any], Any]] = {}
+
+    def column(self, path: str) -> str:
+        if path not in self.columns:
+            self.columns.append(path)
+        return f"row[{self.columns.index(path)}]"
+
+    def converter(self, serializer_field: serializers.Field) -> str:
+        """
+        Return the name of a function equivalent to `serializer_field.to_representation`.
+        Common fields are replaced by the builtin they reduce to.
+        """
+        field_class = type(serializer_field)
+        if field_class.to_representation is fields.CharField.to_representation:
+            function = str
+        elif field_class.to_representation is fields.IntegerField.to_representation:
+            function = int
+        elif (
+            field_class.to_representation is fields.DateField.to_representation
+            and getattr(serializer_field, "format", api_settings.DATE_FORMAT) == ISO_8601
+        ):
+            function = datetime.date.isoformat
+        else:
+            function = serializer_field.to_representation
+        name = f"convert_{len(self.converters)}"
+        self.converters[name] = function
+        return name
+
+    def serializer(self, serializer: serializers.BaseSerializer, model: type[models.Model], prefix: str) -> str:
+        if not isinstance(serializer, serializers.Serializer):
+            raise _NotCompilable(serializer)
+        items = []
+        for serializer_field in serializer._readable_fields:
+            value = self.field(serializer_field, serializer_field.source_attrs, model, prefix)
+            items.append(f"{serializer_field.field_name!r}: {value}")
+        return "{" + ", ".join(items) + "}"
+
+    def field(
+        self,
+        serializer_field: serializers.Field,
+        source_attrs: list[str],
+        model: type[models.Model],
+        prefix: str,
+    ) -> str:
+        if serializer_field.source == "*" or not source_attrs:
+            raise _NotCompilable(serializer_field)
+        attr, *rest = source_attrs
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            raise _NotCompilable(serializer_field)
+        path = f"{prefix}{model_field.name}"
+
+        if model_field.is_relation:
+            if not (model_field.concrete and (model_field.many_to_one or model_field.one_to_one)):
+                raise _NotCompilable(serializer_field)
+            if rest:
+                if model_field.null:
+                    # DRF's handling of dotted sources through a missing object depends on
+                    # required/default/allow_null, leave that to the field itself.
+                    raise _NotCompilable(serializer_field)
+                return self.field(serializer_field, rest, model_field.related_model, f"{path}__")
+            if attr == model_field.attname and not isinstance(serializer_field, serializers.BaseSerializer):
+                # The foreign key column itself, e.g. `source="project_id"`.
+                return self._value(serializer_field, path)
+            if isinstance(serializer_field, serializers.BaseSerializer):
+                nested = self.serializer(serializer_field, model_field.related_model, f"{path}__")
+                return f"(None if {self.column(path)} is None else {nested})"
+            raise _NotCompilable(serializer_field)
+
+        if rest or isinstance(serializer_field, serializers.BaseSerializer):
+            raise _NotCompilable(serializer_field)
+        return self._value(serializer_field, path)
+
+    def _value(self, serializer_field: serializers.Field, path: str) -> str:
+        value = self.column(path)
+        return f"(None if (value := {value}) is None else {self.converter(serializer_field)}(value))"
+
+
+def compile_serializer(serializer: serializers.BaseSerializer, model: type[models.Model]) -> CompiledSerializer | None:
+    """
+    Compile `serializer` into a function from `values_list()` rows of `model` to output dicts.
+    Returns None if a field reads something other than a column or a forward relation
+    (method fields, properties, many-valued relations), so callers can fall back to
+    the serializer itself.
+    """
+    compiler = _Compiler()
+    try:
+        body = compiler.serializer(serializer, model, "")
+    except _NotCompilable:
+        return None
+    namespace = dict(compiler.converters)
+    exec(f"def to_representation(row):\n    return {body}\n", namespace)
+    return CompiledSerializer(columns=tuple(compiler.columns), to_representation=namespace["to_representation"])
+
+
+@lru_cache(maxsize=None)
+def get_compiled_serializer(
+    serializer_class: type[serializers.BaseSerializer],
+    model: type[models.Model],
+    fields: tuple[str, ...] | None = None,
+    expand: tuple[str, ...] | None = None,
+) -> CompiledSerializer | None:
+    if fields is None and expand is None:
+        return compile_serializer(serializer_class(), model)
+    return compile_serializer(serializer_class(fields=fields, expand=expand), model)
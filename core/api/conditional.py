@@ -0,0 +1,77 @@
+import hashlib
+import json
+from collections.abc import Awaitable, Callable, Iterable
+from functools import wraps
+from typing import Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
+
+from core.cache import aget_generations, get_generations, reuse_generations
+
+
+def list_condition(model_list: Iterable[type[models.Model]]) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Conditional GET decorator for list views.
+
+    The ETag hashes the cache generation numbers of `model_list`, the models the response
+    is built from, and the query parameters. Saves, deletes and bulk writes bump those
+    generations, see `core.cache.bump_generation`. They are database rows, so every
+    worker computes the same ETag and sees the writes of the others. Computing it is one
+    primary key query, and a matching `If-None-Match` returns 304 before the view runs.
+
+    No `Last-Modified` is sent: no timestamp moves on deletes or on changes to related
+    models, so `If-Modified-Since` would return stale 304s.
+    """
+    model_list = tuple(model_list)
+    etag_condition = condition(
+        etag_func=lambda request, *args, **kwargs: _build_etag(request, get_generations(model_list))
+    )
+
+    def decorator(view: Callable[..., Any]) -> Callable[..., Any]:
+        conditional_view = etag_condition(view)
+
+        @wraps(view)
+        def inner(request: Any, *args: Any, **kwargs: Any) -> Any:
+            # The response cache of the view reuses the generations read for the ETag.
+            with reuse_generations():
+                return conditional_view(request, *args, **kwargs)
+
+        return inner
+
+    return decorator
+
+
+def alist_condition(
+    model_list: Iterable[type[models.Model]],
+) -> Callable[[Callable[..., Awaitable[HttpResponseBase]]], Callable[..., Awaitable[HttpResponseBase]]]:
+    """
+    `list_condition` for async views. Django's `condition()` only wraps sync views.
+    """
+    model_list = tuple(model_list)
+
+    def decorator(view: Callable[..., Awaitable[HttpResponseBase]]) -> Callable[..., Awaitable[HttpResponseBase]]:
+        @wraps(view)
+        async def inner(request: Any, *args: Any, **kwargs: Any) -> HttpResponseBase:
+            if request.method not in ("GET", "HEAD"):
+                return await view(request, *args, **kwargs)
+            with reuse_generations():
+                etag = quote_etag(_build_etag(request, await aget_generations(model_list)))
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+            response.headers.setdefault("ETag", etag)
+            return response
+
+        return inner
+
+    return decorator
+
+
+def _build_etag(request: Any, generations: dict[str, int]) -> str:
+    payload = json.dumps([generations, sorted(request.GET.lists())], cls=DjangoJSONEncoder, sort_keys=True)
+    return hashlib.md5(payload.encode(), usedforsecurity=False).hexdigest()
@@ -0,0 +1,164 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from .serializers import MAX_INTEGER, BaseInputSerializer
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+@dataclass(frozen=True)
+class PageRequest:
+    cursor: str | None = None
+    size: int = DEFAULT_PAGE_SIZE
+    with_count: bool = False
+
+
+@dataclass(frozen=True)
+class Page:
+    items: QuerySet[Any]
+    next_cursor: str | None
+    previous_cursor: str | None
+    count: int | None
+
+
+class CursorPaginationInputSerializer(BaseInputSerializer):
+    """
+    Query parameters of a keyset paginated list endpoint.
+    Subclass it to add the endpoint's own parameters.
+    """
+
+    cursor = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(min_value=1, max_value=MAX_PAGE_SIZE, default=DEFAULT_PAGE_SIZE)
+    count = serializers.BooleanField(default=False)
+
+    def get_page_request(self) -> PageRequest:
+        input_data = self.get_input_data()
+        return PageRequest(
+            cursor=input_data.get("cursor"),
+            size=input_data["page_size"],
+            with_count=input_data["count"],
+        )
+
+
+def encode_cursor(direction: str, ordering: tuple[str, ...], key: tuple[Any, ...]) -> str:
+    payload = json.dumps({"d": direction, "o": ordering, "k": key}, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(queryset: QuerySet[Any], ordering: tuple[str, ...], cursor: str) -> tuple[str, tuple[Any, ...]]:
+    """
+    Return the direction and ordering key position stored in `cursor`.
+    Raises `rest_framework.exceptions.ValidationError` if the cursor was not issued for `ordering`.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        direction, cursor_ordering, key = payload["d"], tuple(payload["o"]), payload["k"]
+        if direction not in (NEXT, PREVIOUS) or cursor_ordering != ordering or len(key) != len(ordering):
+            raise ValueError(cursor)
+        opts = queryset.model._meta
+        return direction, tuple(_decode_key_value(opts.get_field(name), value) for name, value in zip(ordering, key))
+    except (binascii.Error, DjangoValidationError, KeyError, TypeError, ValueError):
+        raise ValidationError({"cursor": ["Invalid cursor."]})
+
+
+def _decode_key_value(field: Any, value: Any) -> Any:
+    # Ordering fields are not nullable, `_after` and `_before` do not handle NULLs.
+    if value is None or isinstance(value, (bool, list, dict)):
+        raise ValueError(value)
+    value = field.to_python(value)
+    if isinstance(value, int) and not -MAX_INTEGER - 1 <= value <= MAX_INTEGER:
+        raise ValueError(value)
+    return value
+
+
+def _after(ordering: tuple[str, ...], key: tuple[Any, ...], inclusive: bool = False) -> Q:
+    """
+    Row value comparison `(ordering) > (key)` spelled out so it can use a composite index.
+    """
+    condition = Q(**{f"{ordering[-1]}__gte" if inclusive else f"{ordering[-1]}__gt": key[-1]})
+    for name, value in zip(reversed(ordering[:-1]), reversed(key[:-1])):
+        condition = Q(**{f"{name}__gt": value}) | (Q(**{name: value}) & condition)
+    return condition
+
+
+def _before(ordering: tuple[str, ...], key: tuple[Any, ...], inclusive: bool = False) -> Q:
+    condition = Q(**{f"{ordering[-1]}__lte" if inclusive else f"{ordering[-1]}__lt": key[-1]})
+    for name, value in zip(reversed(ordering[:-1]), reversed(key[:-1])):
+        condition = Q(**{f"{name}__lt": value}) | (Q(**{name: value}) & condition)
+    return condition
+
+
+def _boundary_keys(queryset: QuerySet[Any], ordering: tuple[str, ...], page: PageRequest) -> tuple[str, QuerySet[Any]]:
+    direction = NEXT
+    keys = queryset.order_by(*ordering).values_list(*ordering)
+    if page.cursor:
+        direction, position = decode_cursor(queryset, ordering, page.cursor)
+        if direction == NEXT:
+            keys = keys.filter(_after(ordering, position))
+        else:
+            keys = keys.filter(_before(ordering, position)).order_by(*(f"-{name}" for name in ordering))
+    return direction, keys[: page.size + 1]
+
+
+def _build_page(
+    queryset: QuerySet[Any],
+    ordering: tuple[str, ...],
+    page: PageRequest,
+    direction: str,
+    boundaries: list[tuple[Any, ...]],
+    count: int | None,
+) -> Page:
+    has_more = len(boundaries) > page.size
+    boundaries = boundaries[: page.size]
+    if direction == PREVIOUS:
+        boundaries.reverse()
+    if not boundaries:
+        return Page(items=queryset.none(), next_cursor=None, previous_cursor=None, count=count)
+
+    first, last = boundaries[0], boundaries[-1]
+    items = queryset.filter(_after(ordering, first, inclusive=True), _before(ordering, last, inclusive=True))
+    has_next = has_more if direction == NEXT else bool(page.cursor)
+    has_previous = has_more if direction == PREVIOUS else bool(page.cursor)
+    return Page(
+        items=items.order_by(*ordering),
+        next_cursor=encode_cursor(NEXT, ordering, last) if has_next else None,
+        previous_cursor=encode_cursor(PREVIOUS, ordering, first) if has_previous else None,
+        count=count,
+    )
+
+
+def paginate(queryset: QuerySet[Any], ordering: tuple[str, ...], page: PageRequest) -> Page:
+    """
+    Return one page of `queryset` ordered by the unique, ascending `ordering` key.
+
+    The page boundaries are read from the ordering key alone, so with an index on
+    `ordering` every page costs the same no matter how deep the cursor is. The page
+    items are returned as an unevaluated queryset bounded by those keys.
+    """
+    direction, keys = _boundary_keys(queryset, ordering, page)
+    boundaries = list(keys)
+    count = queryset.count() if page.with_count else None
+    return _build_page(queryset, ordering, page, direction, boundaries, count)
+
+
+async def apaginate(queryset: QuerySet[Any], ordering: tuple[str, ...], page: PageRequest) -> Page:
+    """
+    Async version of `paginate`, for async views.
+    """
+    direction, keys = _boundary_keys(queryset, ordering, page)
+    boundaries = [key async for key in keys]
+    count = await queryset.acount() if page.with_count else None
+    return _build_page(queryset, ordering, page, direction, boundaries, count)
@@ -0,0 +1,130 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Prefetch, QuerySet
+from rest_framework import serializers
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """
+    Joins, prefetches and columns a serializer reads from a queryset.
+    `only` is None when some field reads an attribute that is not a model column,
+    in which case every column is loaded.
+    """
+
+    select_related: tuple[str, ...] = ()
+    prefetch_related: tuple[Prefetch, ...] = ()
+    only: tuple[str, ...] | None = ()
+
+    def apply(self, queryset: QuerySet[Any]) -> QuerySet[Any]:
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+@dataclass
+class _QueryPlanBuilder:
+    select_related: list[str] = field(default_factory=list)
+    prefetch_related: list[Prefetch] = field(default_factory=list)
+    only: list[str] = field(default_factory=list)
+    restrict_columns: bool = True
+
+    def build(self) -> QueryPlan:
+        return QueryPlan(
+            select_related=tuple(self.select_related),
+            prefetch_related=tuple(self.prefetch_related),
+            only=tuple(self.only) if self.restrict_columns else None,
+        )
+
+    def add_serializer(
+        self,
+        serializer: serializers.BaseSerializer,
+        model: type[models.Model],
+        prefix: str = "",
+    ) -> None:
+        for serializer_field in serializer.fields.values():
+            if serializer_field.write_only:
+                continue
+            if serializer_field.source == "*":
+                if isinstance(serializer_field, serializers.Serializer):
+                    self.add_serializer(serializer_field, model, prefix)
+                else:
+                    self.restrict_columns = False
+                continue
+            self.add_field(serializer_field, serializer_field.source_attrs, model, prefix)
+
+    def add_field(
+        self,
+        serializer_field: serializers.Field,
+        source_attrs: list[str],
+        model: type[models.Model],
+        prefix: str,
+    ) -> None:
+        attr, *rest = source_attrs
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            # Properties and methods may read any column.
+            self.restrict_columns = False
+            return
+
+        path = f"{prefix}{model_field.name}"
+        if not model_field.is_relation:
+            self.only.append(path)
+            return
+
+        related_model = model_field.related_model
+        if related_model is None:
+            # Generic relations resolve their model per row.
+            self.restrict_columns = False
+            return
+        if model_field.many_to_one or model_field.one_to_one:
+            if model_field.concrete:
+                self.only.append(path)
+            if rest:
+                self.select_related.append(path)
+                self.add_field(serializer_field, rest, related_model, f"{path}__")
+            elif isinstance(serializer_field, serializers.Serializer):
+                self.select_related.append(path)
+                self.add_serializer(serializer_field, related_model, f"{path}__")
+            return
+
+        # Many-valued relations cannot be joined, prefetch them in one query instead.
+        accessor = model_field.get_accessor_name() if model_field.auto_created else model_field.name
+        lookup = f"{prefix}{accessor}"
+        if rest or not isinstance(serializer_field, serializers.ListSerializer):
+            self.prefetch_related.append(Prefetch(lookup))
+            return
+        nested = _QueryPlanBuilder()
+        nested.add_serializer(serializer_field.child, related_model)
+        if model_field.one_to_many:
+            nested.only.append(model_field.field.name)
+        related_queryset = related_model._default_manager.all()
+        self.prefetch_related.append(Prefetch(lookup, queryset=nested.build().apply(related_queryset)))
+
+
+def get_query_plan(serializer: serializers.BaseSerializer, model: type[models.Model]) -> QueryPlan:
+    """
+    Work out the query plan needed to serialize instances of `model` with `serializer`.
+    Nested serializers on forward relations become `select_related` joins, nested
+    serializers on many-valued relations become `prefetch_related` lookups.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    builder = _QueryPlanBuilder()
+    builder.add_serializer(serializer, model)
+    return builder.build()
+
+
+def optimize_queryset(queryset: QuerySet[Any], serializer: serializers.BaseSerializer) -> QuerySet[Any]:
+    """
+    Return `queryset` with the joins, prefetches and columns `serializer` reads.
+    """
+    return get_query_plan(serializer, queryset.model).apply(queryset)
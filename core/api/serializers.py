@@ -1,6 +1,17 @@
+import copy
+import time
 from typing import Any
 
+from django.db.models import QuerySet
 from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from core.instrumentation import timer
+from core.metrics import record_serialization
+from .compiler import CompiledSerializer, get_compiled_serializer
+
+# Largest value of a 64-bit integer column, larger query parameters fail in the database driver.
+MAX_INTEGER = 2**63 - 1
 
 
 class BaseSerializer(serializers.Serializer[Any]):
@@ -24,18 +35,119 @@ class BaseInputSerializer(BaseSerializer):
         return self.validated_data
 
 
+class CommaSeparatedField(serializers.CharField):
+    """
+    Comma separated names, e.g. `?fields=title,status`, as a sorted tuple without duplicates.
+    """
+
+    def to_internal_value(self, data: Any) -> tuple[str, ...]:
+        value = super().to_internal_value(data)
+        return tuple(sorted({name.strip() for name in value.split(",") if name.strip()}))
+
+
+class SparseFieldsetInputSerializer(BaseInputSerializer):
+    """
+    Query parameters choosing the item fields of a list endpoint, see `BaseOutputSerializer`.
+    Mix it into the endpoint's input serializer.
+    """
+
+    fields = CommaSeparatedField(required=False)
+    expand = CommaSeparatedField(required=False, allow_blank=True)
+
+
 class BaseOutputSerializer(BaseSerializer):
     """
     Base serializer to provide common functionality to output serializers.
     Do not use this serializer directly - subclass it and define fields.
+
+    `fields` limits the output to the given field names. When `expand` is given, nested
+    serializers of forward relations that it does not name are replaced by the related
+    object's id, so read services load neither the join nor the related columns.
     """
 
+    def __init__(
+        self,
+        *args: Any,
+        fields: tuple[str, ...] | None = None,
+        expand: tuple[str, ...] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self.only_fields = fields
+        self.expand = expand
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self) -> dict[str, serializers.Field]:
+        fields = super().get_fields()
+        if self.only_fields is not None:
+            fields = {name: field for name, field in fields.items() if name in self.only_fields}
+        if self.expand is not None:
+            for name, field in fields.items():
+                source = field.source or name
+                if name not in self.expand and isinstance(field, serializers.Serializer) and "." not in source:
+                    fields[name] = serializers.IntegerField(source=f"{source}_id", allow_null=True)
+        return fields
+
+    @classmethod
+    def get_expandable_fields(cls) -> list[str]:
+        """
+        Return the names of the nested serializers `expand` may name.
+        """
+        return [
+            name
+            for name, field in cls._declared_fields.items()
+            if isinstance(field, serializers.Serializer) and "." not in (field.source or name)
+        ]
+
     @classmethod
-    def get_output_data(cls, obj: Any) -> dict[str, Any]:
+    def get_output_data(cls, obj: Any, **kwargs: Any) -> dict[str, Any]:
         """
         Serialize object into representation and return as output data.
         """
-        return cls(obj).data
+        with timer("serializer"):
+            return cls(obj, **kwargs).data
+
+    def get_compiled(self, model: Any) -> CompiledSerializer | None:
+        """
+        Return this serializer compiled for `model` rows, or None if it cannot be compiled.
+        The fields are inspected once per class, field set and model.
+        """
+        return get_compiled_serializer(type(self), model, self.only_fields, self.expand)
+
+    async def aserialize_many(self, queryset: QuerySet[Any]) -> list[dict[str, Any]]:
+        """
+        Serialize every object of `queryset` with the async ORM, through the compiled
+        row function when possible. Relations must be loaded by the queryset, see
+        `core.api.querysets.optimize_queryset`, lazy loads are not allowed in async code.
+        """
+        compiled = self.get_compiled(queryset.model)
+        started = time.perf_counter()
+        with timer("serializer"):
+            if compiled is not None and compiled.can_serialize(queryset):
+                data = await compiled.aserialize(queryset)
+            else:
+                data = [self.to_representation(instance) async for instance in queryset]
+        record_serialization(self, len(data), time.perf_counter() - started)
+        return data
+
+
+class CompiledListSerializer(serializers.ListSerializer):
+    """
+    Read-only list serializer that serializes querysets through the child's compiled
+    row function instead of instantiating model objects and calling each field.
+    Enable it on an output serializer with `Meta.list_serializer_class`.
+    """
+
+    def to_representation(self, data: Any) -> list[Any]:
+        started = time.perf_counter()
+        compiled = None
+        if isinstance(data, QuerySet) and isinstance(self.child, BaseOutputSerializer):
+            compiled = self.child.get_compiled(data.model)
+        if compiled is not None and compiled.can_serialize(data):
+            rows = compiled.serialize(data)
+        else:
+            rows = super().to_representation(data)
+        record_serialization(self.child, len(rows), time.perf_counter() - started)
+        return rows
 
 
 class BaseListOutputSerializer(BaseOutputSerializer):
@@ -45,6 +157,46 @@ class BaseListOutputSerializer(BaseOutputSerializer):
     """
 
     count = serializers.SerializerMethodField()
+    next = serializers.CharField(source="next_cursor")
+    previous = serializers.CharField(source="previous_cursor")
+
+    def get_count(self, obj: Any) -> int | None:
+        """
+        Return the total number of items, or None if the caller did not ask for it.
+        """
+        return obj.count
+
+    def __init__(self, *args: Any, item_serializer: serializers.BaseSerializer | None = None, **kwargs: Any) -> None:
+        self.item_serializer = item_serializer
+        super().__init__(*args, **kwargs)
 
-    def get_count(self, obj: Any) -> int:
-        return len(obj.items)
+    def get_fields(self) -> dict[str, serializers.Field]:
+        fields = super().get_fields()
+        if self.item_serializer is not None:
+            # A copy, the item serializer may already be bound to another list.
+            fields["items"] = type(fields["items"])(child=copy.deepcopy(self.item_serializer))
+        return fields
+
+    @classmethod
+    def get_item_serializer(
+        cls,
+        fields: tuple[str, ...] | None = None,
+        expand: tuple[str, ...] | None = None,
+    ) -> serializers.BaseSerializer:
+        """
+        Return the serializer used for each of the `items`, limited to `fields` and `expand`.
+        Read services use it to plan the joins and columns they load, pass it back to
+        `get_output_data` as `item_serializer`.
+        Raises `rest_framework.exceptions.ValidationError` for unknown field names.
+        """
+        child = cls().fields["items"].child
+        if fields is None and expand is None:
+            return child
+        errors = {}
+        if unknown := sorted(set(fields or ()) - child.fields.keys()):
+            errors["fields"] = [f"Unknown fields: {', '.join(unknown)}."]
+        if unknown := sorted(set(expand or ()) - set(child.get_expandable_fields())):
+            errors["expand"] = [f"Unknown relations: {', '.join(unknown)}."]
+        if errors:
+            raise ValidationError(errors)
+        return type(child)(fields=fields, expand=expand)
@@ -0,0 +1,201 @@
+import csv
+import io
+import json
+import zlib
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from typing import Any
+
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework.serializers import BaseSerializer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import BaseOutputSerializer
+
+JSON = "json"
+NDJSON = "ndjson"
+
+STREAM_FORMATS = {
+    JSON: "application/json",
+    NDJSON: "application/x-ndjson",
+}
+
+CSV = "csv"
+
+EXPORT_FORMATS = {
+    CSV: "text/csv",
+    NDJSON: "application/x-ndjson",
+}
+
+# Rows fetched per database round trip and written per response chunk.
+STREAM_CHUNK_SIZE = 2000
+
+GZIP_LEVEL = 6
+
+
+def iter_json(rows: Iterable[dict[str, Any]], stream_format: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Encode `rows` as a JSON array or as newline delimited JSON, `chunk_size` rows per chunk.
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    separator = "\n" if stream_format == NDJSON else ","
+    buffer: list[str] = []
+    first = True
+    if stream_format == JSON:
+        yield b"["
+    for row in rows:
+        buffer.append(encoder.encode(row))
+        if len(buffer) >= chunk_size:
+            yield _join(buffer, separator, first, stream_format)
+            first = False
+            buffer = []
+    if buffer:
+        yield _join(buffer, separator, first, stream_format)
+    if stream_format == JSON:
+        yield b"]"
+
+
+async def aiter_json(
+    rows: AsyncIterable[dict[str, Any]], stream_format: str, chunk_size: int = STREAM_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """
+    Async version of `iter_json`, for rows produced by the async ORM.
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    separator = "\n" if stream_format == NDJSON else ","
+    buffer: list[str] = []
+    first = True
+    if stream_format == JSON:
+        yield b"["
+    async for row in rows:
+        buffer.append(encoder.encode(row))
+        if len(buffer) >= chunk_size:
+            yield _join(buffer, separator, first, stream_format)
+            first = False
+            buffer = []
+    if buffer:
+        yield _join(buffer, separator, first, stream_format)
+    if stream_format == JSON:
+        yield b"]"
+
+
+def _join(buffer: list[str], separator: str, first: bool, stream_format: str) -> bytes:
+    chunk = separator.join(buffer)
+    if stream_format == NDJSON:
+        chunk += separator
+    elif not first:
+        chunk = separator + chunk
+    return chunk.encode()
+
+
+def stream_queryset(
+    queryset: QuerySet[Any],
+    serializer: BaseSerializer,
+    stream_format: str = JSON,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> StreamingHttpResponse:
+    """
+    Return a response that reads `queryset` with a server-side cursor and serializes
+    it one row at a time, so memory use does not grow with the number of rows.
+    """
+    compiled = serializer.get_compiled(queryset.model) if isinstance(serializer, BaseOutputSerializer) else None
+    if compiled is not None and compiled.can_serialize(queryset):
+        rows = compiled.iterate(queryset, chunk_size)
+    else:
+        rows = (serializer.to_representation(instance) for instance in queryset.iterator(chunk_size=chunk_size))
+    return StreamingHttpResponse(
+        iter_json(rows, stream_format, chunk_size),
+        content_type=STREAM_FORMATS[stream_format],
+    )
+
+
+def astream_queryset(
+    queryset: QuerySet[Any],
+    serializer: BaseSerializer,
+    stream_format: str = JSON,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> StreamingHttpResponse:
+    """
+    Async version of `stream_queryset`. The response body is an async iterator reading
+    `queryset` with `aiterator()`, so under ASGI a slow client holds no worker thread
+    between chunks. `aiterator()` does not support `prefetch_related()` in Django 4.2.
+    """
+    compiled = serializer.get_compiled(queryset.model) if isinstance(serializer, BaseOutputSerializer) else None
+    if compiled is not None and compiled.can_serialize(queryset):
+        rows = compiled.aiterate(queryset, chunk_size)
+    else:
+        rows = (serializer.to_representation(instance) async for instance in queryset.aiterator(chunk_size=chunk_size))
+    return StreamingHttpResponse(
+        aiter_json(rows, stream_format, chunk_size),
+        content_type=STREAM_FORMATS[stream_format],
+    )
+
+
+def iter_csv(
+    columns: Iterable[str], rows: Iterable[tuple[Any, ...]], chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Encode `rows` as CSV with a `columns` header row, `chunk_size` rows per chunk.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for index, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if index % chunk_size == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def iter_rows(
+    columns: tuple[str, ...],
+    rows: Iterable[tuple[Any, ...]],
+    export_format: str,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Encode `values_list()` rows as CSV or as newline delimited JSON objects keyed by `columns`.
+    """
+    if export_format == CSV:
+        return iter_csv(columns, rows, chunk_size)
+    return iter_json((dict(zip(columns, row)) for row in rows), NDJSON, chunk_size)
+
+
+def iter_gzip(chunks: Iterable[bytes], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    """
+    Compress `chunks` into a gzip stream as they are produced.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+def stream_rows(
+    queryset: QuerySet[Any],
+    columns: tuple[str, ...],
+    export_format: str,
+    filename: str,
+    compress: bool = False,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> StreamingHttpResponse:
+    """
+    Return a file download of a `values_list()` queryset read with a server-side cursor,
+    encoded and optionally gzip compressed as it is read, so memory use does not grow
+    with the number of rows.
+    """
+    chunks = iter_rows(columns, queryset.iterator(chunk_size=chunk_size), export_format, chunk_size)
+    content_type = EXPORT_FORMATS[export_format]
+    filename = f"{filename}.{export_format}"
+    if compress:
+        chunks = iter_gzip(chunks)
+        content_type = "application/gzip"
+        filename += ".gz"
+    return StreamingHttpResponse(
+        chunks,
+        content_type=content_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from .db import configure_sqlite_connection
+        from .instrumentation import install_query_observers
+        from .metrics import record_new_connection
+
+        connection_created.connect(configure_sqlite_connection, dispatch_uid="core.db.configure_sqlite_connection")
+        connection_created.connect(install_query_observers, dispatch_uid="core.instrumentation.install_query_observers")
+        connection_created.connect(record_new_connection, dispatch_uid="core.metrics.record_new_connection")
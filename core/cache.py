@@ -0,0 +1,206 @@
+import hashlib
+import json
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from core.metrics import CACHE_REQUESTS
+from core.models import CacheGeneration
+from core.replicas import use_primary
+
+RESPONSE_KEY = "response:{}:{}:{}"
+STATS_KEY = "response-stats:{}:{}"
+
+HIT = "hit"
+MISS = "miss"
+
+# Generations already read in the current `reuse_generations()` block, by model label.
+_generation_snapshot: ContextVar[dict[str, int] | None] = ContextVar("generation_snapshot", default=None)
+
+
+def get_cache() -> BaseCache:
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+def _next_generation() -> int:
+    # From the clock, so a bump rolled back with its transaction never comes back as a
+    # number that entries cached by that transaction were stored under.
+    return time.time_ns() // 1000
+
+
+def _get_generation_rows(labels: list[str]) -> models.QuerySet:
+    # Models never bumped have no row and are at generation 0.
+    return CacheGeneration.objects.filter(name__in=labels).values_list("name", "value")
+
+
+def _store_generations(labels: list[str], rows: dict[str, int]) -> dict[str, int]:
+    generations = {label: rows.get(label, 0) for label in labels}
+    snapshot = _generation_snapshot.get()
+    if snapshot is not None:
+        snapshot.update(generations)
+    return generations
+
+
+def get_generations(model_list: Iterable[type[models.Model]]) -> dict[str, int]:
+    """
+    Return the current generation number of each model, keyed by model label, with one query,
+    or none for models already read in the current `reuse_generations()` block.
+    """
+    labels = [model._meta.label_lower for model in model_list]
+    generations = dict(_generation_snapshot.get() or {})
+    missing = [label for label in labels if label not in generations]
+    if missing:
+        generations.update(_store_generations(missing, dict(_get_generation_rows(missing))))
+    return {label: generations[label] for label in labels}
+
+
+async def aget_generations(model_list: Iterable[type[models.Model]]) -> dict[str, int]:
+    """
+    Async version of `get_generations`.
+    """
+    labels = [model._meta.label_lower for model in model_list]
+    generations = dict(_generation_snapshot.get() or {})
+    missing = [label for label in labels if label not in generations]
+    if missing:
+        rows = {name: value async for name, value in _get_generation_rows(missing)}
+        generations.update(_store_generations(missing, rows))
+    return {label: generations[label] for label in labels}
+
+
+@contextmanager
+def reuse_generations() -> Iterator[None]:
+    """
+    Read each model's generation at most once in the block, e.g. for both the ETag and
+    the response cache key of a request. Only for blocks that do not write.
+    """
+    token = _generation_snapshot.set({})
+    try:
+        yield
+    finally:
+        _generation_snapshot.reset(token)
+
+
+def bump_generation(model: type[models.Model]) -> None:
+    """
+    Invalidate every cached response that depends on `model`.
+
+    The new generation is written in the current transaction: reads in the writing
+    transaction miss straight away, and other processes see it when they see the rows.
+    """
+    label = model._meta.label_lower
+    generations = CacheGeneration.objects.filter(name=label)
+    value = Greatest(F("value") + 1, _next_generation())
+    if not generations.update(value=value):
+        _, created = CacheGeneration.objects.get_or_create(name=label, defaults={"value": _next_generation()})
+        if not created:
+            generations.update(value=value)
+
+
+class ResponseCache:
+    """
+    Cache of serialized responses keyed by request parameters and by the generation
+    numbers of the models the response is built from. Writes to any of those models
+    bump their generation, see `bump_generation`, which makes older entries unreachable.
+
+    Misses are read from the primary: a lagging replica could still return rows older
+    than the current generations, and the entry would then outlive the lag.
+
+    Only the bodies are stored in the cache backend, the generations are database rows,
+    so any Django cache backend works, per process ones like the local-memory backend too.
+    """
+
+    def __init__(self, name: str, model_list: Iterable[type[models.Model]]) -> None:
+        self.name = name
+        self.model_list = tuple(model_list)
+
+    def get_key(self, params: Mapping[str, Any]) -> str:
+        return self._build_key(params, get_generations(self.model_list))
+
+    async def aget_key(self, params: Mapping[str, Any]) -> str:
+        return self._build_key(params, await aget_generations(self.model_list))
+
+    def _build_key(self, params: Mapping[str, Any], generations: dict[str, int]) -> str:
+        params_hash = hashlib.md5(
+            json.dumps(params, sort_keys=True, cls=DjangoJSONEncoder).encode(), usedforsecurity=False
+        ).hexdigest()
+        version = "-".join(str(generations[model._meta.label_lower]) for model in self.model_list)
+        return RESPONSE_KEY.format(self.name, params_hash, version)
+
+    def get_or_set(self, params: Mapping[str, Any], get_data: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        Return the cached data for `params`, calling `get_data` on a miss,
+        and whether it was a cache hit.
+        """
+        cache = get_cache()
+        key = self.get_key(params)
+        data = cache.get(key)
+        if data is not None:
+            self._record(HIT)
+            return data, True
+        self._record(MISS)
+        with use_primary():
+            data = get_data()
+        cache.set(key, data, timeout=getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300))
+        return data, False
+
+    async def aget_or_set(
+        self, params: Mapping[str, Any], aget_data: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        """
+        Async version of `get_or_set`, `aget_data` is a coroutine function.
+        """
+        cache = get_cache()
+        key = await self.aget_key(params)
+        data = await cache.aget(key)
+        if data is not None:
+            await self._arecord(HIT)
+            return data, True
+        await self._arecord(MISS)
+        with use_primary():
+            data = await aget_data()
+        await cache.aset(key, data, timeout=getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300))
+        return data, False
+
+    def _record(self, outcome: str) -> None:
+        CACHE_REQUESTS.inc(cache=self.name, result=outcome)
+        cache = get_cache()
+        key = STATS_KEY.format(self.name, outcome)
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, timeout=None):
+                cache.incr(key)
+
+    async def _arecord(self, outcome: str) -> None:
+        CACHE_REQUESTS.inc(cache=self.name, result=outcome)
+        cache = get_cache()
+        key = STATS_KEY.format(self.name, outcome)
+        try:
+            await cache.aincr(key)
+        except ValueError:
+            if not await cache.aadd(key, 1, timeout=None):
+                await cache.aincr(key)
+
+    def stats(self) -> dict[str, Any]:
+        cache = get_cache()
+        counts = cache.get_many([STATS_KEY.format(self.name, HIT), STATS_KEY.format(self.name, MISS)])
+        hits = counts.get(STATS_KEY.format(self.name, HIT), 0)
+        misses = counts.get(STATS_KEY.format(self.name, MISS), 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else None,
+        }
+
+    def reset_stats(self) -> None:
+        get_cache().delete_many([STATS_KEY.format(self.name, HIT), STATS_KEY.format(self.name, MISS)])
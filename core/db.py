@@ -0,0 +1,63 @@
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+_PRAGMA_NAME_RE = re.compile(r"^[a-z_]+$")
+_PRAGMA_VALUE_RE = re.compile(r"^-?\w+$")
+
+
+def get_sqlite_pragmas() -> dict[str, Any]:
+    return getattr(settings, "SQLITE_PRAGMAS", {})
+
+
+def apply_sqlite_pragmas(connection: BaseDatabaseWrapper, pragmas: dict[str, Any]) -> None:
+    """
+    Run `PRAGMA name = value` for each of `pragmas` on the raw connection, bypassing
+    query logging and execute wrappers.
+    """
+    for name, value in pragmas.items():
+        if not _PRAGMA_NAME_RE.match(name) or not _PRAGMA_VALUE_RE.match(str(value)):
+            raise ValueError(f"Invalid SQLite pragma {name}={value!r}")
+        connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+def configure_sqlite_connection(sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any) -> None:
+    """
+    `connection_created` receiver applying `SQLITE_PRAGMAS` to every new SQLite connection.
+
+    Most pragmas only last for the connection, so they are set each time one is opened;
+    with `CONN_MAX_AGE` that is once per connection lifetime rather than per request.
+    """
+    if connection.vendor == "sqlite":
+        apply_sqlite_pragmas(connection, get_sqlite_pragmas())
+
+
+@contextmanager
+def deferred_indexes(model: type[models.Model], using: str) -> Iterator[None]:
+    """
+    Drop the secondary indexes of `model`'s table inside the block and create them again
+    at its end, in one transaction. Building an index once is much faster than updating
+    it for every inserted row, use it around loads of many rows. SQLite only, elsewhere
+    the indexes are kept.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        yield
+        return
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        # Indexes backing UNIQUE and PRIMARY KEY constraints have no SQL and stay.
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = %s AND sql IS NOT NULL",
+            [model._meta.db_table],
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+        yield
+        for _, sql in indexes:
+            cursor.execute(sql)
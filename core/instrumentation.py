@@ -0,0 +1,181 @@
+import hashlib
+import json
+import logging
+import random
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger("core.instrumentation")
+
+# Statements repeated at least this many times in one request are reported as N+1 suspects.
+DUPLICATE_QUERY_THRESHOLD = 2
+
+_current_metrics: ContextVar["RequestMetrics | None"] = ContextVar("request_metrics", default=None)
+_query_observers: ContextVar[tuple[Callable[..., Any], ...]] = ContextVar("query_observers", default=())
+
+
+@contextmanager
+def observe_queries(observer: Callable[..., Any]) -> Iterator[None]:
+    """
+    Run the queries made in the block through `observer`, an execute wrapper, see
+    `django.db.backends.base.base.BaseDatabaseWrapper.execute_wrapper`. Unlike it, this
+    covers every connection and thread the block's context reaches, including the
+    `sync_to_async()` threads that run the queries of async views.
+    """
+    token = _query_observers.set((*_query_observers.get(), observer))
+    try:
+        yield
+    finally:
+        _query_observers.reset(token)
+
+
+def _execute_observed(execute, sql, params, many, context):
+    for observer in _query_observers.get():
+        execute = partial(observer, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_observers(connection, **kwargs) -> None:
+    """
+    `connection_created` receiver adding the `observe_queries` wrapper to every connection.
+    """
+    if _execute_observed not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_observed)
+
+
+@dataclass
+class RequestMetrics:
+    queries: int = 0
+    db_time: float = 0.0
+    timings: dict[str, float] = field(default_factory=dict)
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            # Parameters are passed separately, so the statement itself is the signature.
+            self.statements[sql] += 1
+
+    def get_duplicates(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "signature": hashlib.md5(sql.encode(), usedforsecurity=False).hexdigest()[:12],
+                "count": count,
+                "sql": sql[:200],
+            }
+            for sql, count in self.statements.most_common()
+            if count >= DUPLICATE_QUERY_THRESHOLD
+        ]
+
+
+def get_current_metrics() -> RequestMetrics | None:
+    return _current_metrics.get()
+
+
+@contextmanager
+def timer(name: str) -> Iterator[None]:
+    """
+    Add the time spent in the block to the current request's `name` timing.
+    Does nothing when the request is not sampled.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.timings[name] = metrics.timings.get(name, 0.0) + time.perf_counter() - started
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Record SQL count, DB time, repeated statements, serializer time and response size of
+    a sample of requests, and emit them as a `Server-Timing` header and one structured
+    log line on the `core.instrumentation` logger.
+
+    `REQUEST_INSTRUMENTATION_SAMPLE_RATE` is the fraction of requests instrumented.
+    Queries run while a streaming response is consumed are not included.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.is_sampled():
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            with observe_queries(metrics.record_query):
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.process_response(request, response, metrics, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if not self.is_sampled():
+            return await self.get_response(request)
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            with observe_queries(metrics.record_query):
+                response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.process_response(request, response, metrics, time.perf_counter() - started)
+
+    def is_sampled(self) -> bool:
+        return random.random() < getattr(settings, "REQUEST_INSTRUMENTATION_SAMPLE_RATE", 0.01)
+
+    def process_response(self, request, response, metrics: RequestMetrics, total: float):
+        response_bytes = None if response.streaming else len(response.content)
+        self.add_server_timing(response, metrics, total)
+        resolver_match = getattr(request, "resolver_match", None)
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "view": resolver_match.view_name if resolver_match else None,
+                    "status": response.status_code,
+                    "duration_ms": round(total * 1000, 3),
+                    "queries": metrics.queries,
+                    "db_ms": round(metrics.db_time * 1000, 3),
+                    "duplicate_queries": metrics.get_duplicates(),
+                    **{f"{name}_ms": round(value * 1000, 3) for name, value in metrics.timings.items()},
+                    "response_bytes": response_bytes,
+                }
+            )
+        )
+        return response
+
+    def add_server_timing(self, response, metrics: RequestMetrics, total: float) -> None:
+        entries = [f'db;dur={metrics.db_time * 1000:.3f};desc="{metrics.queries} queries"']
+        entries += [f"{name};dur={value * 1000:.3f}" for name, value in metrics.timings.items()]
+        entries.append(f"total;dur={total * 1000:.3f}")
+        existing = response.get("Server-Timing")
+        response["Server-Timing"] = ", ".join([existing, *entries] if existing else entries)
@@ -0,0 +1,325 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .instrumentation import observe_queries
+
+# Prometheus' default latency buckets, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Aliases of the connections opened while the current request runs.
+_opened_connections: ContextVar[set[str] | None] = ContextVar("opened_connections", default=None)
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, registry: "Registry", name: str, help: str, labels: tuple[str, ...]) -> None:
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+    def get_key(self, labels: dict[str, str]) -> tuple[str, tuple[str, ...]]:
+        return self.name, tuple(str(labels[name]) for name in self.labels)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, value: float = 1, **labels: str) -> None:
+        shard = self.registry.get_shard()
+        key = self.get_key(labels)
+        shard[key] = shard.get(key, 0) + value
+
+    def render(self, key: tuple[str, tuple[str, ...]], value: float) -> Iterator[str]:
+        yield f"{self.name}{format_labels(self.labels, key[1])} {format_value(value)}"
+
+
+class Histogram(Metric):
+    """
+    Values are stored as the per-bucket counts followed by the sum and the count, the
+    cumulative `le` buckets of the exposition format are built when rendering.
+    """
+
+    type = "histogram"
+
+    def __init__(self, *args: Any, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels: str) -> None:
+        shard = self.registry.get_shard()
+        key = self.get_key(labels)
+        counts = shard.get(key)
+        if counts is None:
+            counts = shard[key] = [0] * (len(self.buckets) + 3)
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        counts[index] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def render(self, key: tuple[str, tuple[str, ...]], value: list[float]) -> Iterator[str]:
+        names, label_values = (*self.labels, "le"), key[1]
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), value):
+            cumulative += count
+            le = bound if isinstance(bound, str) else format_value(bound)
+            yield f"{self.name}_bucket{format_labels(names, (*label_values, le))} {format_value(cumulative)}"
+        yield f"{self.name}_sum{format_labels(self.labels, label_values)} {format_value(value[-2])}"
+        yield f"{self.name}_count{format_labels(self.labels, label_values)} {format_value(value[-1])}"
+
+
+class Registry:
+    """
+    Process-wide metrics, written to one shard per thread so recording never takes a
+    lock: a thread only takes the registry lock to register its shard. Collecting sums
+    the shards, which the GIL lets us copy while their threads keep writing.
+
+    With `METRICS_DIR` set every process also writes its totals to a file there, at most
+    every `METRICS_FLUSH_INTERVAL` seconds, and collecting adds up the files of all
+    processes, e.g. gunicorn workers. Clear the directory when the server starts.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+        self.lock = threading.Lock()
+        self.shards: list[dict[tuple[str, tuple[str, ...]], Any]] = []
+        self.local = threading.local()
+        self.last_flush = 0.0
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(self, name, help, tuple(labels)))
+
+    def histogram(
+        self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(self, name, help, tuple(labels), buckets=buckets))
+
+    def register(self, metric: Metric) -> Any:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered.")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def get_shard(self) -> dict[tuple[str, tuple[str, ...]], Any]:
+        try:
+            return self.local.shard
+        except AttributeError:
+            shard = self.local.shard = {}
+            with self.lock:
+                self.shards.append(shard)
+            return shard
+
+    def collect_local(self) -> dict[tuple[str, tuple[str, ...]], Any]:
+        """
+        Return the totals of this process.
+        """
+        with self.lock:
+            shards = list(self.shards)
+        totals: dict[tuple[str, tuple[str, ...]], Any] = {}
+        for shard in shards:
+            for key, value in shard.copy().items():
+                merge_value(totals, key, value)
+        return totals
+
+    def collect(self) -> dict[tuple[str, tuple[str, ...]], Any]:
+        """
+        Return the totals of every process writing to `METRICS_DIR`, or of this one.
+        """
+        totals = self.collect_local()
+        directory = get_metrics_dir()
+        if directory is None:
+            return totals
+        self.flush(totals)
+        totals = {}
+        for path in directory.glob("metrics-*.json"):
+            try:
+                entries = json.loads(path.read_text())
+            except (OSError, ValueError):
+                # Removed or being replaced while reading, the next scrape picks it up.
+                continue
+            for name, label_values, value in entries:
+                merge_value(totals, (name, tuple(label_values)), value)
+        return totals
+
+    def flush(self, totals: dict[tuple[str, tuple[str, ...]], Any] | None = None) -> None:
+        """
+        Write this process' totals to its file in `METRICS_DIR`.
+        """
+        directory = get_metrics_dir()
+        if directory is None:
+            return
+        if totals is None:
+            totals = self.collect_local()
+        self.last_flush = time.monotonic()
+        entries = [[name, list(label_values), value] for (name, label_values), value in totals.items()]
+        directory.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so readers never see a partial file.
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump(entries, file)
+        os.replace(temp_path, directory / f"metrics-{os.getpid()}.json")
+
+    def flush_if_due(self) -> None:
+        if time.monotonic() - self.last_flush >= getattr(settings, "METRICS_FLUSH_INTERVAL", 1.0):
+            self.flush()
+
+    def render(self) -> str:
+        """
+        Return the metrics in the Prometheus text exposition format.
+        """
+        by_metric: dict[str, list[tuple[tuple[str, tuple[str, ...]], Any]]] = {}
+        for key, value in sorted(self.collect().items()):
+            by_metric.setdefault(key[0], []).append((key, value))
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for key, value in by_metric.get(name, ()):
+                lines.extend(metric.render(key, value))
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self.lock:
+            for shard in self.shards:
+                shard.clear()
+
+
+def merge_value(totals: dict[tuple[str, tuple[str, ...]], Any], key: tuple[str, tuple[str, ...]], value: Any) -> None:
+    if isinstance(value, list):
+        current = totals.get(key)
+        totals[key] = list(value) if current is None else [a + b for a, b in zip(current, value)]
+    else:
+        totals[key] = totals.get(key, 0) + value
+
+
+def get_metrics_dir() -> Path | None:
+    directory = getattr(settings, "METRICS_DIR", None)
+    return Path(directory) if directory else None
+
+
+def format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+def format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Request latency by URL name.", labels=("view", "method")
+)
+REQUEST_QUERIES = registry.histogram(
+    "http_request_queries", "SQL queries per request by URL name.", labels=("view",), buckets=QUERY_COUNT_BUCKETS
+)
+SERIALIZER_ROWS = registry.counter("serializer_rows_total", "Rows serialized.", labels=("serializer",))
+SERIALIZER_SECONDS = registry.counter(
+    "serializer_seconds_total", "Time spent serializing rows.", labels=("serializer",)
+)
+CACHE_REQUESTS = registry.counter(
+    "response_cache_requests_total", "Response cache lookups by outcome.", labels=("cache", "result")
+)
+DB_CONNECTIONS = registry.counter(
+    "db_connection_requests_total",
+    "Requests that queried a database, by whether they reused an open connection or opened a new one.",
+    labels=("alias", "connection"),
+)
+
+
+def record_serialization(serializer: Any, rows: int, seconds: float) -> None:
+    name = type(serializer).__name__
+    SERIALIZER_ROWS.inc(rows, serializer=name)
+    SERIALIZER_SECONDS.inc(seconds, serializer=name)
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.queries: dict[str, int] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        alias = context["connection"].alias
+        self.queries[alias] = self.queries.get(alias, 0) + 1
+        return execute(sql, params, many, context)
+
+
+def record_new_connection(connection, **kwargs) -> None:
+    """
+    `connection_created` receiver noting connections opened by the current request.
+    """
+    opened = _opened_connections.get()
+    if opened is not None:
+        opened.add(connection.alias)
+
+
+class MetricsMiddleware:
+    """
+    Record the latency and query count of every request under its URL name, and
+    whether each database it queried had a connection open from an earlier request.
+    Requests that match no URL are recorded as `unmatched`.
+
+    Queries and connections are followed through the request's context, so async views
+    are recorded too whichever `sync_to_async()` thread runs their queries.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter, opened = QueryCounter(), set()
+        token = _opened_connections.set(opened)
+        started = time.perf_counter()
+        try:
+            with observe_queries(counter):
+                response = self.get_response(request)
+        finally:
+            _opened_connections.reset(token)
+        self.record(request, counter, opened, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        counter, opened = QueryCounter(), set()
+        token = _opened_connections.set(opened)
+        started = time.perf_counter()
+        try:
+            with observe_queries(counter):
+                response = await self.get_response(request)
+        finally:
+            _opened_connections.reset(token)
+        self.record(request, counter, opened, time.perf_counter() - started)
+        return response
+
+    def record(self, request, counter: QueryCounter, opened: set[str], duration: float) -> None:
+        resolver_match = getattr(request, "resolver_match", None)
+        view = resolver_match.view_name if resolver_match else "unmatched"
+        REQUEST_DURATION.observe(duration, view=view, method=request.method)
+        REQUEST_QUERIES.observe(sum(counter.queries.values()), view=view)
+        for alias in counter.queries:
+            DB_CONNECTIONS.inc(alias=alias, connection="new" if alias in opened else "reused")
+        registry.flush_if_due()
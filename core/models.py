@@ -1,3 +1,11 @@
 from django.db import models
 
-# Create your models here.
+
+class CacheGeneration(models.Model):
+    """
+    Generation number of the cached data built from a model, see `core.cache.bump_generation`.
+    Kept in the database so every process sees the bumps of the others, whatever the cache backend.
+    """
+
+    name = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField(default=0)
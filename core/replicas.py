@@ -0,0 +1,112 @@
+import random
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Set while the current request must read from the primary, see ReadYourWritesMiddleware.
+_use_primary: ContextVar[bool] = ContextVar("use_primary", default=False)
+
+PRIMARY_COOKIE = "read_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+
+def get_read_alias() -> str:
+    """
+    Return the database alias read services should query: one of `READ_REPLICA_ALIASES`,
+    or the primary when there is none or the current request has to see its own writes.
+    """
+    replicas = getattr(settings, "READ_REPLICA_ALIASES", [])
+    if not replicas or _use_primary.get():
+        return DEFAULT_DB_ALIAS
+    return random.choice(replicas)
+
+
+@contextmanager
+def use_primary() -> Iterator[None]:
+    """
+    Send reads made through `get_read_alias` inside the block to the primary.
+    """
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes, migrations and reads that do not ask for a database go to the primary.
+
+    Replicas are only read through `get_read_alias`, which read services pass to
+    `QuerySet.using()`, so the admin and write paths never read stale rows.
+    """
+
+    def db_for_read(self, model: Any, **hints: Any) -> str | None:
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            # Related objects of an instance read from a replica come from the same replica.
+            return instance._state.db
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model: Any, **hints: Any) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> bool:
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, model_name: str | None = None, **hints: Any) -> bool:
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReadYourWritesMiddleware:
+    """
+    Read from the primary during requests with unsafe methods and, through a cookie,
+    for `REPLICA_STICKINESS_SECONDS` after them, so clients see their own writes
+    despite replication lag. Clients that do not keep cookies only get the former.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _use_primary.set(self.must_use_primary(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_primary.reset(token)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        token = _use_primary.set(self.must_use_primary(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_primary.reset(token)
+        return self.process_response(request, response)
+
+    def must_use_primary(self, request) -> bool:
+        return request.method not in SAFE_METHODS or PRIMARY_COOKIE in request.COOKIES
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                "1",
+                max_age=getattr(settings, "REPLICA_STICKINESS_SECONDS", 5),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
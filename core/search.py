@@ -0,0 +1,149 @@
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from django.db import connections, transaction
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def build_match_query(text: str) -> str | None:
+    """
+    Turn free text into an FTS5 query matching rows that contain every word, the last
+    one as a prefix so results follow what is being typed. FTS5 operators and column
+    filters in `text` are not interpreted. Returns None when `text` has no words.
+    """
+    words = _WORD_RE.findall(text)
+    if not words:
+        return None
+    return " ".join([*(f'"{word}"' for word in words[:-1]), f'"{words[-1]}"*'])
+
+
+@dataclass(frozen=True)
+class FullTextIndex:
+    """
+    An external content FTS5 table indexing `columns` of `content_table`, with its `id`
+    as rowid. The table is created by a migration, the triggers keeping it in sync by
+    `install_triggers`. On databases other than SQLite, searches fall back to `icontains`.
+
+    `weights` are the bm25 weights of `columns`, higher ranks matches in that column
+    first.
+    """
+
+    table: str
+    content_table: str
+    columns: tuple[str, ...]
+    weights: tuple[float, ...]
+
+    def is_supported(self, using: str) -> bool:
+        return connections[using].vendor == "sqlite"
+
+    def filter(self, queryset: QuerySet[Any], text: str) -> QuerySet[Any]:
+        """
+        Restrict `queryset` to rows matching `text`, without ranking them.
+        """
+        match = build_match_query(text)
+        if match is None:
+            return queryset.none()
+        if not self.is_supported(queryset.db):
+            return queryset.filter(self._fallback_condition(text))
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [match])
+        )
+
+    def search(self, queryset: QuerySet[Any], text: str, limit: int) -> list[Any]:
+        """
+        Return up to `limit` objects of `queryset` matching `text`, best bm25 rank first.
+
+        The ranked ids come from one query against the index, the objects from one
+        `IN` query, so the cost depends on `limit` and not on the table size. Filters
+        of `queryset` apply after ranking and may return fewer than `limit` objects.
+        """
+        match = build_match_query(text)
+        if match is None:
+            return []
+        if not self.is_supported(queryset.db):
+            return list(queryset.filter(self._fallback_condition(text)).order_by("pk")[:limit])
+        weights = ", ".join(str(float(weight)) for weight in self.weights)
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s "
+                f"ORDER BY bm25({self.table}, {weights}) LIMIT %s",
+                [match, limit],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        objects = queryset.in_bulk(ids)
+        return [objects[pk] for pk in ids if pk in objects]
+
+    def _fallback_condition(self, text: str) -> Q:
+        condition = Q()
+        for word in _WORD_RE.findall(text):
+            word_condition = Q()
+            for column in self.columns:
+                word_condition |= Q(**{f"{column}__icontains": word})
+            condition &= word_condition
+        return condition
+
+    def get_trigger_sql(self) -> list[str]:
+        """
+        Return the statements creating the triggers that keep the index in sync with
+        `content_table`, a no-op for triggers that already exist.
+        """
+        columns = ", ".join(self.columns)
+        new_values = ", ".join(f"new.{column}" for column in self.columns)
+        old_values = ", ".join(f"old.{column}" for column in self.columns)
+        delete = f"INSERT INTO {self.table}({self.table}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+        insert = f"INSERT INTO {self.table}(rowid, {columns}) VALUES (new.id, {new_values});"
+        return [
+            f"CREATE TRIGGER IF NOT EXISTS {self.table}_ai AFTER INSERT ON {self.content_table} BEGIN {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.table}_ad AFTER DELETE ON {self.content_table} BEGIN {delete} END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.table}_au AFTER UPDATE OF {columns} ON {self.content_table} "
+            f"BEGIN {delete} {insert} END",
+        ]
+
+    def install_triggers(self, using: str) -> None:
+        """
+        (Re)create the sync triggers. SQLite drops them whenever a migration rebuilds
+        `content_table`, so this runs after every `migrate`.
+        """
+        if not self.is_supported(using):
+            return
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [self.table])
+            if cursor.fetchone() is None:
+                return
+            for statement in self.get_trigger_sql():
+                cursor.execute(statement)
+
+    @contextmanager
+    def bulk_load(self, using: str) -> Iterator[None]:
+        """
+        Index the rows inserted inside the block with one statement at its end instead
+        of one trigger run per row, in one transaction. Updates and deletes inside the
+        block still go through their triggers.
+        """
+        if not self.is_supported(using):
+            yield
+            return
+        connection = connections[using]
+        columns = ", ".join(self.columns)
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [self.table])
+            if cursor.fetchone() is None:
+                yield
+                return
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {self.content_table}")
+            last_id = cursor.fetchone()[0]
+            cursor.execute(f"DROP TRIGGER IF EXISTS {self.table}_ai")
+            yield
+            cursor.execute(
+                f"INSERT INTO {self.table}(rowid, {columns}) "
+                f"SELECT id, {columns} FROM {self.content_table} WHERE id > %s",
+                [last_id],
+            )
+            for statement in self.get_trigger_sql():
+                cursor.execute(statement)
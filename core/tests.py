@@ -1,3 +1,260 @@
-from django.test import TestCase
+import json
+import tempfile
+import threading
+from pathlib import Path
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.api.streaming import JSON, NDJSON, iter_json
+from core.cache import ResponseCache, bump_generation
+from core.db import apply_sqlite_pragmas
+from core.instrumentation import RequestInstrumentationMiddleware, timer
+from core.metrics import Registry, registry
+from core.models import CacheGeneration
+from core.replicas import PRIMARY_COOKIE, PrimaryReplicaRouter, ReadYourWritesMiddleware, get_read_alias
+
+
+class IterJsonTests(SimpleTestCase):
+    rows = [{"id": index} for index in range(5)]
+
+    def test_json_array_across_chunks(self):
+        for chunk_size in (1, 2, 5, 10):
+            with self.subTest(chunk_size=chunk_size):
+                body = b"".join(iter_json(self.rows, JSON, chunk_size))
+                self.assertEqual(json.loads(body), self.rows)
+
+    def test_empty_json_array(self):
+        self.assertEqual(b"".join(iter_json([], JSON)), b"[]")
+
+    def test_ndjson_across_chunks(self):
+        body = b"".join(iter_json(self.rows, NDJSON, chunk_size=2)).decode()
+        self.assertEqual([json.loads(line) for line in body.splitlines()], self.rows)
+
+
+class RequestInstrumentationMiddlewareTests(TestCase):
+    def get_response(self, request):
+        for _ in range(3):
+            User.objects.filter(pk=1).exists()
+        with timer("serializer"):
+            pass
+        return HttpResponse(b"payload")
+
+    @override_settings(REQUEST_INSTRUMENTATION_SAMPLE_RATE=1.0)
+    def test_sampled_request(self):
+        middleware = RequestInstrumentationMiddleware(self.get_response)
+
+        with self.assertLogs("core.instrumentation", "INFO") as logs:
+            response = middleware(RequestFactory().get("/"))
+
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+        self.assertIn("serializer;dur=", response["Server-Timing"])
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["queries"], 3)
+        self.assertEqual(line["response_bytes"], len(b"payload"))
+        self.assertEqual([duplicate["count"] for duplicate in line["duplicate_queries"]], [3])
+
+    @override_settings(REQUEST_INSTRUMENTATION_SAMPLE_RATE=1.0)
+    async def test_sampled_async_request(self):
+        async def get_response(request):
+            # Async views query the database from sync_to_async() threads.
+            return await sync_to_async(self.get_response)(request)
+
+        middleware = RequestInstrumentationMiddleware(get_response)
+
+        with self.assertLogs("core.instrumentation", "INFO") as logs:
+            response = await middleware(RequestFactory().get("/"))
+
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+        self.assertIn("serializer;dur=", response["Server-Timing"])
+        self.assertEqual(json.loads(logs.records[0].getMessage())["queries"], 3)
+
+    @override_settings(REQUEST_INSTRUMENTATION_SAMPLE_RATE=0.0)
+    def test_unsampled_request(self):
+        response = RequestInstrumentationMiddleware(self.get_response)(RequestFactory().get("/"))
+
+        self.assertNotIn("Server-Timing", response)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+
+    def test_registry_sums_thread_shards(self):
+        metrics = Registry()
+        requests = metrics.counter("requests_total", "Requests.", labels=("view",))
+        latency = metrics.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+
+        def work():
+            for _ in range(100):
+                requests.inc(view='a"b')
+            latency.observe(0.5)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(
+            metrics.render().splitlines(),
+            [
+                "# HELP latency_seconds Latency.",
+                "# TYPE latency_seconds histogram",
+                'latency_seconds_bucket{le="0.1"} 0',
+                'latency_seconds_bucket{le="1"} 4',
+                'latency_seconds_bucket{le="+Inf"} 4',
+                "latency_seconds_sum 2",
+                "latency_seconds_count 4",
+                "# HELP requests_total Requests.",
+                "# TYPE requests_total counter",
+                'requests_total{view="a\\"b"} 400',
+            ],
+        )
+
+    def test_processes_are_aggregated_through_the_metrics_dir(self):
+        metrics = Registry()
+        requests = metrics.counter("requests_total", "Requests.")
+        requests.inc(2)
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            # Another worker's totals.
+            (Path(directory) / "metrics-1.json").write_text(json.dumps([["requests_total", [], 3]]))
+
+            self.assertIn("requests_total 5", metrics.render().splitlines())
+
+    def test_requests_are_recorded(self):
+        self.client.force_login(User.objects.first())
+        self.client.get(reverse("tasks_list"))
+        self.client.get(reverse("tasks_list"))
+
+        body = self.client.get(reverse("metrics")).content.decode()
+
+        self.assertIn('http_request_duration_seconds_count{view="tasks_list",method="GET"} 2', body)
+        self.assertIn('http_request_queries_count{view="tasks_list"} 2', body)
+        self.assertIn('response_cache_requests_total{cache="tasks_list",result="hit"} 1', body)
+        self.assertIn('response_cache_requests_total{cache="tasks_list",result="miss"} 1', body)
+        self.assertRegex(body, r'serializer_rows_total\{serializer="\w+"\} [1-9]')
+        self.assertIn('db_connection_requests_total{alias="default",connection="reused"} 2', body)
+
+    async def test_async_requests_are_recorded(self):
+        await self.async_client.get(reverse("async_tasks_list"))
+        await self.async_client.get(reverse("async_tasks_list"))
+
+        body = (await self.async_client.get(reverse("metrics"))).content.decode()
+
+        self.assertIn('http_request_duration_seconds_count{view="async_tasks_list",method="GET"} 2', body)
+        # The queries of async views run in sync_to_async() threads.
+        self.assertRegex(body, r'http_request_queries_sum\{view="async_tasks_list"\} [1-9]')
+        self.assertIn('db_connection_requests_total{alias="default",connection="reused"} 2', body)
+
+
+class SqlitePragmaTests(TestCase):
+    def get_pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={"cache_size": -1234, "busy_timeout": 321})
+    def test_pragmas_are_applied_to_new_connections(self):
+        connection = connections.create_connection(DEFAULT_DB_ALIAS)
+        try:
+            self.assertEqual(self.get_pragma(connection, "cache_size"), -1234)
+            self.assertEqual(self.get_pragma(connection, "busy_timeout"), 321)
+        finally:
+            connection.close()
+
+    def test_invalid_pragmas_are_rejected(self):
+        with self.assertRaises(ValueError):
+            apply_sqlite_pragmas(connections[DEFAULT_DB_ALIAS], {"cache_size": "1; DROP TABLE auth_user"})
+
+
+@override_settings(READ_REPLICA_ALIASES=["replica"], REPLICA_STICKINESS_SECONDS=7)
+class ReadYourWritesMiddlewareTests(SimpleTestCase):
+    def get_read_alias(self, request):
+        aliases = []
+
+        def get_response(request):
+            aliases.append(get_read_alias())
+            return HttpResponse()
+
+        response = ReadYourWritesMiddleware(get_response)(request)
+        return aliases[0], response
+
+    def test_safe_requests_read_from_replicas(self):
+        alias, response = self.get_read_alias(RequestFactory().get("/"))
+
+        self.assertEqual(alias, "replica")
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+
+    def test_writes_pin_reads_to_primary(self):
+        alias, response = self.get_read_alias(RequestFactory().post("/"))
+
+        self.assertEqual(alias, "default")
+        self.assertEqual(response.cookies[PRIMARY_COOKIE]["max-age"], 7)
+
+        request = RequestFactory().get("/")
+        request.COOKIES[PRIMARY_COOKIE] = "1"
+        alias, _ = self.get_read_alias(request)
+        self.assertEqual(alias, "default")
+        self.assertEqual(get_read_alias(), "replica")
+
+    def test_router_keeps_writes_and_migrations_on_primary(self):
+        router = PrimaryReplicaRouter()
+
+        self.assertEqual(router.db_for_write(User), "default")
+        self.assertEqual(router.db_for_read(User), "default")
+        self.assertFalse(router.allow_migrate("replica", "project_manager"))
+
+
+@override_settings(READ_REPLICA_ALIASES=["replica"])
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_response_cache_is_filled_from_primary(self):
+        response_cache = ResponseCache("users", [User])
+
+        # Reads that would go to a lagging replica must not be stored under the current generation.
+        data, hit = response_cache.get_or_set({}, get_read_alias)
+        self.assertEqual((data, hit), ("default", False))
+        self.assertEqual(response_cache.get_or_set({}, get_read_alias), ("default", True))
+        self.assertEqual(get_read_alias(), "replica")
+
+    async def test_async_response_cache_is_filled_from_primary(self):
+        response_cache = ResponseCache("users", [User])
+
+        async def aget_read_alias():
+            return await sync_to_async(get_read_alias)()
+
+        self.assertEqual(await response_cache.aget_or_set({}, aget_read_alias), ("default", False))
+        self.assertEqual(await response_cache.aget_or_set({}, aget_read_alias), ("default", True))
+
+    def test_generations_are_shared_by_processes(self):
+        response_cache = ResponseCache("users", [User])
+        response_cache.get_or_set({}, lambda: "before")
+
+        # Another worker, with its own local-memory cache, bumps the generation in the database.
+        CacheGeneration.objects.update_or_create(name="auth.user", defaults={"value": 1})
+
+        self.assertEqual(response_cache.get_or_set({}, lambda: "after"), ("after", False))
+        with transaction.atomic():
+            bump_generation(User)
+            self.assertEqual(response_cache.get_or_set({}, lambda: "in transaction"), ("in transaction", False))
+
+    def test_rolled_back_generations_are_not_reused(self):
+        response_cache = ResponseCache("users", [User])
+        with transaction.atomic():
+            bump_generation(User)
+            response_cache.get_or_set({}, lambda: "rolled back")
+            transaction.set_rollback(True)
+
+        bump_generation(User)
+
+        self.assertEqual(response_cache.get_or_set({}, lambda: "committed"), ("committed", False))
@@ -1,3 +1,10 @@
-from django.shortcuts import render
+from django.http import HttpResponse
 
-# Create your views here.
+from core.metrics import CONTENT_TYPE, registry
+
+
+def metrics(request):
+    """
+    Expose the metrics registry in the Prometheus text format.
+    """
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -1,14 +1,253 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth.models import User
+from django.core.exceptions import FieldDoesNotExist, PermissionDenied
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet, Value
+from django.db.models.functions import Lower
+from django.http import JsonResponse
+from django.urls import path, reverse
+from django.utils.functional import cached_property
 
+from core.api.serializers import MAX_INTEGER
 from .models import Project, Task, Team
+from .search import PROJECT_SEARCH_INDEX, TASK_SEARCH_INDEX
 
+AUTOCOMPLETE_PAGE_SIZE = 20
+# Changelists count at most this many rows exactly, larger counts are estimated.
+EXACT_COUNT_LIMIT = 10_000
 
-class TaskAdmin(admin.ModelAdmin):
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator whose count stops at `EXACT_COUNT_LIMIT` rows instead of counting the whole
+    table. When the limit is reached, the count of an unfiltered changelist is the row
+    estimate `ANALYZE` stores in `sqlite_stat1`, if any, and otherwise the limit itself.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        count = queryset.order_by()[: EXACT_COUNT_LIMIT + 1].count()
+        if count <= EXACT_COUNT_LIMIT:
+            return count
+        if not queryset.query.has_filters():
+            return max(count, self.estimate_table_rows(queryset))
+        return count
+
+    def estimate_table_rows(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != "sqlite":
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return 0
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        return int(row[0].split()[0]) if row else 0
+
+
+class TeamMemberAutocompleteSelect(AutocompleteSelect):
+    """
+    Autocomplete for a task's assignee that offers members of the selected project's team.
+    """
+
+    def __init__(self, field, admin_site, project_field="id_project", **kwargs):
+        super().__init__(field, admin_site, **kwargs)
+        self.project_field = project_field
+
+    def get_url(self):
+        return reverse(f"{self.admin_site.name}:project_manager_task_assignee_autocomplete")
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs=extra_attrs)
+        # Initialized by team_member_autocomplete.js instead of admin/js/autocomplete.js.
+        attrs["class"] = attrs["class"].replace("admin-autocomplete", "team-member-autocomplete")
+        attrs["data-project-field"] = self.project_field
+        return attrs
+
+    @property
+    def media(self):
+        return super().media + forms.Media(js=("project_manager/js/team_member_autocomplete.js",))
+
+
+class AssigneeUsernameFilter(admin.SimpleListFilter):
+    """
+    Filter by the assignee's exact username typed into a text box, instead of listing every user.
+    """
+
+    title = "assignee"
+    parameter_name = "assignee"
+    template = "admin/project_manager/input_filter.html"
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(assigned_to__username=self.value())
+        return queryset
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.value() is None,
+            "parameter_name": self.parameter_name,
+            "value": self.value() or "",
+            "query_parts": [
+                (name, value) for name, value in changelist.params.items() if name not in (self.parameter_name, "p")
+            ],
+        }
+
+
+class PerformanceModelAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin whose changelist pages run a constant number of queries:
+
+    - foreign keys shown in `list_display` are joined with `select_related`, and only those;
+    - the paginator counts at most `EXACT_COUNT_LIMIT` rows and the unfiltered total
+      is not counted at all;
+    - searches go through `full_text_index` when set. Otherwise `search_fields` match
+      case-insensitive prefixes through a range over a `Lower(field)` index, which the
+      model declares, instead of `LIKE '%term%'` scans.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    full_text_index = None
+
+    def get_list_select_related(self, request):
+        if self.list_select_related is not False:
+            return self.list_select_related
+        related = []
+        for name in self.get_list_display(request):
+            if not isinstance(name, str):
+                continue
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.many_to_one or field.one_to_one:
+                related.append(name)
+        return related
+
+    def get_search_results(self, request, queryset, search_term):
+        search_fields = self.get_search_fields(request)
+        term = search_term.strip()
+        if not search_fields or not term:
+            return queryset, False
+        if self.full_text_index is not None:
+            return self.full_text_index.filter(queryset, term), False
+        aliases = {f"{name}_lower": Lower(name) for name in search_fields}
+        condition = Q()
+        for alias in aliases:
+            condition |= Q(**{f"{alias}__gte": Lower(Value(term)), f"{alias}__lt": Lower(Value(f"{term}\U0010ffff"))})
+        return queryset.alias(**aliases).filter(condition), False
+
+
+def get_positive_int(value: str | None, max_value: int = MAX_INTEGER) -> int | None:
+    """
+    Return the query parameter `value` as an integer from 1 to `max_value`, or None.
+    """
+    if value and value.isascii() and value.isdigit() and 1 <= int(value) <= max_value:
+        return int(value)
+    return None
+
+
+def get_protected_projects(projects):
+    """
+    Describe the projects of `projects` that cannot be deleted as they still have tasks,
+    with one query. Task counts come from the project counters.
+    """
+    return [
+        f"{project}: {project.pending_task_count + project.done_task_count} tasks"
+        for project in projects.with_tasks().only("name", "pending_task_count", "done_task_count")
+    ]
+
+
+def get_pks(objs):
+    # Admin actions pass a queryset, the delete view a list with one object.
+    return objs.values("pk") if isinstance(objs, QuerySet) else [obj.pk for obj in objs]
+
+
+class ProjectAdmin(PerformanceModelAdmin):
+    search_fields = ("name", "description")
+    full_text_index = PROJECT_SEARCH_INDEX
+
+    def get_deleted_objects(self, objs, request):
+        # Tasks are not collected, see ProjectQuerySet.check_deletable().
+        deleted_objects, model_count, perms_needed, protected = super().get_deleted_objects(objs, request)
+        protected += get_protected_projects(Project.objects.filter(pk__in=get_pks(objs)))
+        return deleted_objects, model_count, perms_needed, protected
+
+
+class TaskAdmin(PerformanceModelAdmin):
     list_display = ("title", "status", "due_date", "assigned_to")
-    list_filter = ("status", "due_date", "assigned_to")
+    list_filter = ("status", "due_date", AssigneeUsernameFilter)
     search_fields = ("title", "description")
+    full_text_index = TASK_SEARCH_INDEX
+    autocomplete_fields = ("project",)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == "assigned_to":
+            kwargs["widget"] = TeamMemberAutocompleteSelect(db_field, self.admin_site)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_urls(self):
+        return [
+            path(
+                "assignee-autocomplete/",
+                self.admin_site.admin_view(self.assignee_autocomplete_view),
+                name="project_manager_task_assignee_autocomplete",
+            ),
+            *super().get_urls(),
+        ]
+
+    def assignee_autocomplete_view(self, request):
+        """
+        Return a page of select2 results of users whose username starts with `term`,
+        limited to the team of `project` when it has one. The prefix match is a range
+        over the unique username index.
+        """
+        if not (self.has_add_permission(request) or self.has_change_permission(request)):
+            raise PermissionDenied
+
+        users = User.objects.order_by("username")
+        project_id = get_positive_int(request.GET.get("project"))
+        if project_id is not None:
+            team_id = Project.objects.filter(pk=project_id).values_list("team_id", flat=True).first()
+            if team_id is not None:
+                users = users.filter(team=team_id)
+        term = request.GET.get("term", "")
+        if term:
+            users = users.filter(Q(username__gte=term) & Q(username__lt=f"{term}\U0010ffff"))
+
+        page = get_positive_int(request.GET.get("page"), MAX_INTEGER // AUTOCOMPLETE_PAGE_SIZE) or 1
+        offset = (page - 1) * AUTOCOMPLETE_PAGE_SIZE
+        rows = list(users.values_list("id", "username")[offset : offset + AUTOCOMPLETE_PAGE_SIZE + 1])
+        return JsonResponse(
+            {
+                "results": [{"id": str(pk), "text": username} for pk, username in rows[:AUTOCOMPLETE_PAGE_SIZE]],
+                "pagination": {"more": len(rows) > AUTOCOMPLETE_PAGE_SIZE},
+            }
+        )
+
+
+class TeamAdmin(PerformanceModelAdmin):
+    search_fields = ("name",)
+    autocomplete_fields = ("members",)
+
+    def get_deleted_objects(self, objs, request):
+        deleted_objects, model_count, perms_needed, protected = super().get_deleted_objects(objs, request)
+        protected += get_protected_projects(Project.objects.filter(team__in=get_pks(objs)))
+        return deleted_objects, model_count, perms_needed, protected
 
 
-admin.site.register(Project)
+admin.site.register(Project, ProjectAdmin)
 admin.site.register(Task, TaskAdmin)
-admin.site.register(Team)
+admin.site.register(Team, TeamAdmin)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ProjectManagerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "project_manager"
+
+    def ready(self):
+        from . import signals  # noqa: F401
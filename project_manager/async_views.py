@@ -0,0 +1,107 @@
+from collections.abc import Awaitable, Callable
+from functools import wraps
+from typing import Any
+
+from django.http import HttpResponse, HttpResponseNotAllowed
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+
+from core.api.conditional import alist_condition
+from core.api.streaming import astream_queryset
+from .services import ProjectFilters, ProjectsReadService, TaskFilters, TasksReadService
+from .views import ProjectListAPIView, TaskListAPIView
+
+# Async versions of the list views for ASGI servers. They are plain Django async views,
+# DRF's APIView only runs synchronously. The async ORM still runs each query in a thread,
+# but only for the query: streamed rows are read with `aiterator()`, so a request waiting
+# on a slow client does not hold a thread in between. That needs every middleware to be
+# async capable, with one sync only middleware Django runs the whole request in a thread.
+# Parameters, response cache and output match the sync views.
+
+SAFE_METHODS = ["GET", "HEAD"]
+
+
+def async_list_view(view: Callable[..., Awaitable[HttpResponse]]) -> Callable[..., Awaitable[HttpResponse]]:
+    """
+    Allow only safe methods and return validation errors as 400 responses, as DRF does
+    for the sync views. Django's `require_safe` only wraps sync views in Django 4.2.
+    """
+
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return HttpResponseNotAllowed(SAFE_METHODS)
+        try:
+            return await view(request, *args, **kwargs)
+        except ValidationError as error:
+            return render_json(error.detail, status.HTTP_400_BAD_REQUEST)
+
+    return inner
+
+
+def render_json(data: Any, status_code: int = status.HTTP_200_OK, **headers: str) -> HttpResponse:
+    return HttpResponse(
+        JSONRenderer().render(data),
+        status=status_code,
+        content_type="application/json",
+        headers=headers,
+    )
+
+
+def render_list(items: list[dict[str, Any]], result: Any) -> dict[str, Any]:
+    return {
+        "count": result.count,
+        "next": result.next_cursor,
+        "previous": result.previous_cursor,
+        "items": items,
+    }
+
+
+@async_list_view
+@alist_condition(ProjectListAPIView.response_cache.model_list)
+async def projects_list(request) -> HttpResponse:
+    view = ProjectListAPIView
+    input_serializer = view.ProjectListInputSerializer(data=request.GET)
+    page = input_serializer.get_page_request()
+    filters = ProjectFilters.from_data(input_serializer.validated_data)
+    item_serializer = view.ProjectListOutputSerializer.get_item_serializer(
+        fields=input_serializer.validated_data.get("fields"),
+        expand=input_serializer.validated_data.get("expand"),
+    )
+    if stream_format := input_serializer.validated_data.get("stream"):
+        projects = await ProjectsReadService().alist(serializer=item_serializer, filters=filters)
+        return astream_queryset(projects.items, item_serializer, stream_format)
+
+    async def aget_output_data():
+        projects = await ProjectsReadService().alist(serializer=item_serializer, page=page, filters=filters)
+        return render_list(await item_serializer.aserialize_many(projects.items), projects)
+
+    output_data, hit = await view.response_cache.aget_or_set(input_serializer.validated_data, aget_output_data)
+    return render_json(output_data, **{"X-Cache": "HIT" if hit else "MISS"})
+
+
+@async_list_view
+@alist_condition(TaskListAPIView.response_cache.model_list)
+async def tasks_list(request) -> HttpResponse:
+    view = TaskListAPIView
+    input_serializer = view.TaskListInputSerializer(data=request.GET)
+    page = input_serializer.get_page_request()
+    ordering = input_serializer.validated_data["ordering"]
+    filters = TaskFilters.from_data(input_serializer.validated_data)
+    item_serializer = view.TaskListOutputSerializer.get_item_serializer(
+        fields=input_serializer.validated_data.get("fields"),
+        expand=input_serializer.validated_data.get("expand"),
+    )
+    if stream_format := input_serializer.validated_data.get("stream"):
+        tasks = await TasksReadService().alist(serializer=item_serializer, ordering=ordering, filters=filters)
+        return astream_queryset(tasks.items, item_serializer, stream_format)
+
+    async def aget_output_data():
+        tasks = await TasksReadService().alist(
+            serializer=item_serializer, page=page, ordering=ordering, filters=filters
+        )
+        return render_list(await item_serializer.aserialize_many(tasks.items), tasks)
+
+    output_data, hit = await view.response_cache.aget_or_set(input_serializer.validated_data, aget_output_data)
+    return render_json(output_data, **{"X-Cache": "HIT" if hit else "MISS"})
@@ -0,0 +1,78 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Project, Task
+
+# Task status to the Project column counting tasks in that status.
+TASK_COUNT_FIELDS = {
+    "pending": "pending_task_count",
+    "done": "done_task_count",
+}
+
+CounterKey = tuple[int | None, str | None]
+
+
+def get_counter_key(task: Task) -> CounterKey:
+    """
+    Return the `(project_id, status)` a task counts towards, without loading deferred fields.
+    """
+    return task.__dict__.get("project_id"), task.__dict__.get("status")
+
+
+def get_loaded_counter_key(task: Task) -> CounterKey | None:
+    """
+    Return the `(project_id, status)` of `task` as it was read from the database, or
+    None when it was not read from the database or with those fields deferred.
+    """
+    key = getattr(task, "_loaded_counter_key", None)
+    if key is None or None in key:
+        return None
+    return key
+
+
+def apply_task_count_changes(changes: Counter[CounterKey], using: str = "default") -> None:
+    """
+    Add `changes`, task count deltas keyed by `(project_id, status)`, to the project
+    counters. Projects receiving the same deltas are updated by one `UPDATE ... SET
+    count = count + delta`, so concurrent writers never overwrite each other.
+    """
+    project_deltas: dict[int, Counter[str]] = defaultdict(Counter)
+    for (project_id, status), delta in changes.items():
+        if project_id is not None and status in TASK_COUNT_FIELDS and delta:
+            project_deltas[project_id][TASK_COUNT_FIELDS[status]] += delta
+
+    projects_by_deltas: dict[tuple[tuple[str, int], ...], list[int]] = defaultdict(list)
+    for project_id, deltas in project_deltas.items():
+        key = tuple(sorted((name, delta) for name, delta in deltas.items() if delta))
+        if key:
+            projects_by_deltas[key].append(project_id)
+
+    with transaction.atomic(using=using, savepoint=False):
+        for deltas, project_ids in projects_by_deltas.items():
+            Project.objects.using(using).filter(pk__in=project_ids).update(
+                **{name: F(name) + delta for name, delta in deltas}
+            )
+
+
+def rebuild_task_counts(projects: QuerySet[Project] | None = None) -> int:
+    """
+    Recompute the counters of `projects`, or of every project, from the tasks table in
+    one `UPDATE` with a correlated count per status. Returns the number of projects.
+    """
+    if projects is None:
+        projects = Project.objects.all()
+    counts = {}
+    for status, name in TASK_COUNT_FIELDS.items():
+        task_count = (
+            Task.objects.using(projects.db)
+            .filter(project=OuterRef("pk"), status=status)
+            .order_by()
+            .values("project")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        counts[name] = Coalesce(Subquery(task_count), 0)
+    return projects.update(**counts)
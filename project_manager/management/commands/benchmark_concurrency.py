@@ -0,0 +1,132 @@
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.test import override_settings
+from django.utils import timezone
+
+from core.api.pagination import PageRequest
+from core.db import apply_sqlite_pragmas
+from project_manager.management.commands.benchmark_endpoints import percentile
+from project_manager.models import Task
+from project_manager.services import TasksReadService
+from project_manager.views import TaskListAPIView
+
+PROFILES = {
+    # Rollback journal, no pragmas and a new connection per operation, as with CONN_MAX_AGE = 0.
+    "development": {"pragmas": {}, "journal_mode": "delete", "persistent": False},
+    "production": {"pragmas": settings.SQLITE_PRODUCTION_PRAGMAS, "journal_mode": "wal", "persistent": True},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent task list reads and task writes against the SQLite database under the "
+        "development and production database profiles, and compare their throughput. "
+        "Writes only touch Task.updated_at."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds per profile.")
+        parser.add_argument("--write-ratio", type=float, default=0.2, help="Fraction of operations that write.")
+        parser.add_argument("--profile", choices=[*PROFILES, "both"], default="both")
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite" or connection.is_in_memory_db():
+            raise CommandError("The concurrency benchmark needs a file-backed SQLite database.")
+        self.task_ids = list(Task.objects.values_list("id", flat=True)[:100_000])
+        if not self.task_ids:
+            raise CommandError("No tasks to read and write, run generate_dataset first.")
+
+        names = list(PROFILES) if options["profile"] == "both" else [options["profile"]]
+        results = {name: self.run_profile(name, options) for name in names}
+        # Leave the database in the journal mode of the configured profile.
+        self.set_journal_mode("wal" if settings.DATABASE_PROFILE == "production" else "delete")
+
+        self.stdout.write(
+            f"{'profile':<14}{'ops/s':>10}{'read p50':>10}{'read p99':>10}{'write p50':>11}{'write p99':>11}"
+            f"{'errors':>8}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<14}{result['ops_per_second']:>10.1f}{result['read_p50_ms']:>10.2f}"
+                f"{result['read_p99_ms']:>10.2f}{result['write_p50_ms']:>11.2f}{result['write_p99_ms']:>11.2f}"
+                f"{result['errors']:>8}"
+            )
+        if len(results) == 2 and results["development"]["ops_per_second"]:
+            speedup = results["production"]["ops_per_second"] / results["development"]["ops_per_second"]
+            self.stdout.write(self.style.SUCCESS(f"production profile throughput: {speedup:.2f}x development"))
+
+    def set_journal_mode(self, journal_mode):
+        connection.ensure_connection()
+        apply_sqlite_pragmas(connection, {"journal_mode": journal_mode})
+        connection.close()
+
+    def run_profile(self, name, options):
+        profile = PROFILES[name]
+        self.set_journal_mode(profile["journal_mode"])
+        latencies = defaultdict(list)
+        errors = []
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options["duration"]
+        seed = options["seed"]
+
+        def worker(index):
+            rng = random.Random(None if seed is None else seed + index)
+            local = defaultdict(list)
+            local_errors = 0
+            try:
+                while time.perf_counter() < deadline:
+                    kind = "write" if rng.random() < options["write_ratio"] else "read"
+                    started = time.perf_counter()
+                    try:
+                        if kind == "write":
+                            self.write(rng)
+                        else:
+                            self.read()
+                    except OperationalError:
+                        local_errors += 1
+                    else:
+                        local[kind].append((time.perf_counter() - started) * 1000)
+                    if not profile["persistent"]:
+                        connections.close_all()
+            finally:
+                connections.close_all()
+                with lock:
+                    for kind, values in local.items():
+                        latencies[kind].extend(values)
+                    errors.append(local_errors)
+
+        self.stdout.write(f"Running the {name} profile for {options['duration']}s with {options['threads']} threads")
+        with override_settings(SQLITE_PRAGMAS=profile["pragmas"]):
+            threads = [threading.Thread(target=worker, args=(index,)) for index in range(options["threads"])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        operations = len(latencies["read"]) + len(latencies["write"])
+        return {
+            "ops_per_second": operations / options["duration"],
+            "read_p50_ms": statistics.median(latencies["read"]) if latencies["read"] else 0.0,
+            "read_p99_ms": percentile(latencies["read"], 0.99) if latencies["read"] else 0.0,
+            "write_p50_ms": statistics.median(latencies["write"]) if latencies["write"] else 0.0,
+            "write_p99_ms": percentile(latencies["write"], 0.99) if latencies["write"] else 0.0,
+            "errors": sum(errors),
+        }
+
+    def read(self):
+        item_serializer = TaskListAPIView.TaskListOutputSerializer.get_item_serializer()
+        tasks = TasksReadService().list(serializer=item_serializer, page=PageRequest())
+        TaskListAPIView.TaskListOutputSerializer.get_output_data(tasks)
+
+    def write(self, rng):
+        with transaction.atomic():
+            Task.objects.filter(pk=rng.choice(self.task_ids)).update(updated_at=timezone.now())
@@ -0,0 +1,178 @@
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+
+from project_manager.models import Task
+from project_manager.urls import urlpatterns
+
+# Query parameters for endpoints that need some to do representative work.
+ENDPOINT_PARAMS: dict[str, dict[str, str]] = {
+    "tasks_search": {"q": "synthetic task"},
+}
+
+# Tasks the bulk endpoint rewrites per request, unchanged, so repeated requests do the same work.
+BULK_BENCHMARK_TASKS = 500
+
+
+def get_bulk_body():
+    tasks = Task.objects.order_by("id").values(
+        "id", "project", "assigned_to", "title", "description", "due_date", "status"
+    )[:BULK_BENCHMARK_TASKS]
+    return {"tasks": [{**task, "due_date": task["due_date"].isoformat()} for task in tasks]}
+
+
+# JSON bodies of POST-only endpoints.
+ENDPOINT_BODIES = {
+    "tasks_bulk": get_bulk_body,
+}
+
+METRICS = ("p50_ms", "p99_ms", "queries", "peak_memory_kb")
+
+
+def iter_pattern_names(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_pattern_names(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure p50/p99 latency, query count and peak memory of every endpoint in "
+        "project_manager/urls.py, optionally saving or comparing against a JSON baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20, help="Timed requests per endpoint.")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed requests per endpoint.")
+        parser.add_argument("--warm-cache", action="store_true", help="Keep response caches between requests.")
+        parser.add_argument("--username", help="User the requests are authenticated as, defaults to the first one.")
+        parser.add_argument("--save", type=Path, help="Write the results to this JSON baseline file.")
+        parser.add_argument("--compare", type=Path, help="Fail if results regress against this JSON baseline.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Allowed relative regression of latency and memory against the baseline (default 0.2).",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by("id")
+        if options["username"]:
+            users = users.filter(username=options["username"])
+        user = users.first()
+        if user is None:
+            raise CommandError("No user to authenticate as, run generate_dataset first.")
+        client = Client()
+        client.force_login(user)
+        results = {}
+        # Benchmark without the debug toolbar and its per-request instrumentation.
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for name in iter_pattern_names(urlpatterns):
+                result = self.benchmark(client, name, options)
+                if result is not None:
+                    results[name] = result
+
+        self.print_results(results)
+        if options["save"]:
+            options["save"].write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(f"Baseline saved to {options['save']}")
+        if options["compare"]:
+            self.compare(results, json.loads(options["compare"].read_text()), options["threshold"])
+
+    def request(self, client, url, params, warm_cache, body=None):
+        if not warm_cache:
+            cache.clear()
+        if body is not None:
+            return client.post(url, body, content_type="application/json")
+        return client.get(url, params)
+
+    def benchmark(self, client, name, options):
+        try:
+            url = reverse(name)
+        except Exception:
+            self.stdout.write(f"Skipping {name}: it needs URL arguments")
+            return None
+        params = ENDPOINT_PARAMS.get(name, {})
+        body = ENDPOINT_BODIES[name]() if name in ENDPOINT_BODIES else None
+        method = "GET" if body is None else "POST"
+
+        response = self.request(client, url, params, options["warm_cache"], body)
+        if response.status_code != 200:
+            self.stdout.write(f"Skipping {name}: {method} returned {response.status_code}")
+            return None
+        for _ in range(options["warmup"]):
+            self.request(client, url, params, options["warm_cache"], body)
+
+        latencies = []
+        queries = []
+        for _ in range(options["requests"]):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = self.request(client, url, params, options["warm_cache"], body)
+                if response.streaming:
+                    size = sum(len(chunk) for chunk in response.streaming_content)
+                else:
+                    size = len(response.content)
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+
+        # Measured separately, tracing allocations skews latency.
+        tracemalloc.start()
+        try:
+            response = self.request(client, url, params, options["warm_cache"], body)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p99_ms": round(percentile(latencies, 0.99), 3),
+            "queries": max(queries),
+            "peak_memory_kb": round(peak / 1024, 1),
+            "response_bytes": size,
+        }
+
+    def print_results(self, results):
+        header = f"{'endpoint':<24}{'p50 ms':>10}{'p99 ms':>10}{'queries':>9}{'peak KiB':>11}{'bytes':>12}"
+        self.stdout.write(header)
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<24}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['queries']:>9}"
+                f"{result['peak_memory_kb']:>11.1f}{result['response_bytes']:>12}"
+            )
+
+    def compare(self, results, baseline, threshold):
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            for metric in METRICS:
+                expected = baseline[name][metric]
+                # Query counts are deterministic, any increase is a regression.
+                limit = expected if metric == "queries" else expected * (1 + threshold)
+                if result[metric] > limit:
+                    regressions.append(f"{name} {metric}: {result[metric]} > baseline {expected}")
+        if regressions:
+            raise CommandError("Regressions against baseline:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
@@ -0,0 +1,123 @@
+import time
+from dataclasses import replace
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from core.api.streaming import CSV, EXPORT_FORMATS, STREAM_CHUNK_SIZE, iter_gzip, iter_rows
+from project_manager.models import Project, Task
+from project_manager.services import TASK_EXPORT_COLUMNS, TaskFilters, TasksReadService
+
+PARTITIONS = ("none", "month", "project")
+
+
+def iter_months(first: date, last: date):
+    """
+    Yield the `(first day, last day)` of every month from `first` to `last`, clipped to them.
+    """
+    start = first
+    while start <= last:
+        next_month = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        yield start, min(next_month - timedelta(days=1), last)
+        start = next_month
+
+
+class Command(BaseCommand):
+    help = (
+        "Export tasks joined with their project and assignee as CSV or NDJSON, optionally gzip "
+        "compressed and split into one file per due date month or per project. Rows are read "
+        "through one cursor per file and written as they are read, so memory use stays flat."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "output",
+            type=Path,
+            help="File to write, or directory of the partition files with --partition-by.",
+        )
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default=CSV)
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument("--due-date-after", type=date.fromisoformat)
+        parser.add_argument("--due-date-before", type=date.fromisoformat)
+        parser.add_argument("--project", type=int, help="Only export this project.")
+        parser.add_argument("--partition-by", choices=PARTITIONS, default="none")
+        parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE, help="Rows per database fetch.")
+
+    def handle(self, *args, **options):
+        self.options = options
+        filters = TaskFilters(
+            due_date_after=options["due_date_after"],
+            due_date_before=options["due_date_before"],
+            project=options["project"],
+        )
+        partitions = list(self.get_partitions(filters))
+        if options["partition_by"] != "none":
+            options["output"].mkdir(parents=True, exist_ok=True)
+
+        started = time.perf_counter()
+        total = 0
+        for name, partition_filters, ordering in partitions:
+            path = self.get_path(name)
+            partition_started = time.perf_counter()
+            rows = self.export(path, partition_filters, ordering)
+            total += rows
+            self.stdout.write(f"  {path}: {self.format_rate(rows, time.perf_counter() - partition_started)}")
+
+        rate = self.format_rate(total, time.perf_counter() - started)
+        self.stdout.write(self.style.SUCCESS(f"Exported {len(partitions)} files: {rate}"))
+
+    def format_rate(self, rows, elapsed):
+        return f"{rows} rows in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)"
+
+    def get_partitions(self, filters):
+        """
+        Yield the file name, filters and ordering of every partition. Each one is read
+        through the index matching its filter.
+        """
+        partition_by = self.options["partition_by"]
+        if partition_by == "project":
+            project_ids = Project.objects.order_by("id").values_list("id", flat=True)
+            if filters.project is not None:
+                project_ids = project_ids.filter(pk=filters.project)
+            for project_id in project_ids:
+                yield f"tasks-project-{project_id}", replace(filters, project=project_id), "due_date"
+        elif partition_by == "month":
+            bounds = filters.apply(Task.objects.all()).aggregate(first=Min("due_date"), last=Max("due_date"))
+            if bounds["first"] is None:
+                return
+            for first, last in iter_months(bounds["first"], bounds["last"]):
+                yield f"tasks-{first:%Y-%m}", replace(filters, due_date_after=first, due_date_before=last), "due_date"
+        else:
+            yield "tasks", filters, "id"
+
+    def get_path(self, name):
+        if self.options["partition_by"] == "none":
+            return self.options["output"]
+        suffix = f".{self.options['format']}" + (".gz" if self.options["gzip"] else "")
+        return self.options["output"] / f"{name}{suffix}"
+
+    def export(self, path, filters, ordering):
+        """
+        Write the tasks matching `filters` to `path` and return the number of rows.
+        """
+        rows_read = 0
+
+        def rows():
+            nonlocal rows_read
+            queryset = TasksReadService().export(filters, ordering=ordering)
+            for row in queryset.iterator(chunk_size=self.options["chunk_size"]):
+                rows_read += 1
+                yield row
+
+        chunks = iter_rows(tuple(TASK_EXPORT_COLUMNS), rows(), self.options["format"], self.options["chunk_size"])
+        if self.options["gzip"]:
+            chunks = iter_gzip(chunks)
+        try:
+            with open(path, "wb") as file:
+                for chunk in chunks:
+                    file.write(chunk)
+        except OSError as error:
+            raise CommandError(f"Cannot write {path}: {error}")
+        return rows_read
@@ -0,0 +1,64 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cache import bump_generation
+from project_manager.models import Project, Task, Team
+from project_manager.seeding import SeedSize, Seeder
+
+
+class Command(BaseCommand):
+    help = "Generate a large synthetic dataset of users, teams, projects and tasks with batched bulk inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=int,
+            default=None,
+            help="Repeat the demo data this many times instead of giving each count.",
+        )
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--teams", type=int, default=1_000)
+        parser.add_argument("--team-size", type=int, default=10, help="Members per team.")
+        parser.add_argument("--projects", type=int, default=50_000)
+        parser.add_argument("--tasks", type=int, default=5_000_000)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument("--seed", type=int, default=None, help="Random seed, for reproducible datasets.")
+        parser.add_argument(
+            "--prefix",
+            default=None,
+            help="Username and name prefix. Defaults to a random one so the command can be run repeatedly.",
+        )
+
+    def handle(self, *args, **options):
+        if options["scale"] is not None:
+            size = SeedSize.from_scale(options["scale"])
+        else:
+            size = SeedSize(
+                users=options["users"],
+                teams=options["teams"],
+                team_size=options["team_size"],
+                projects=options["projects"],
+                tasks=options["tasks"],
+            )
+        if size.team_size > size.users:
+            raise CommandError("--team-size cannot be larger than --users.")
+        if size.tasks and not (size.projects and size.users):
+            raise CommandError("Tasks need at least one project and one user.")
+        prefix = options["prefix"] or f"load{random.Random(options['seed']).randrange(16 ** 6):06x}"
+
+        started = time.perf_counter()
+        seeder = Seeder(
+            prefix=f"{prefix}-",
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+            log=self.stdout.write,
+        )
+        seeder.seed(size)
+
+        # Bulk inserts do not send model signals.
+        for model in (User, Team, Project, Task):
+            bump_generation(model)
+        self.stdout.write(self.style.SUCCESS(f"Dataset {prefix!r} generated in {time.perf_counter() - started:.1f}s"))
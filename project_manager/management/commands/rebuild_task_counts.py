@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.cache import bump_generation
+from project_manager.counters import rebuild_task_counts
+from project_manager.models import Project
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized pending/done task counters of every project from the tasks table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, action="append", help="Only rebuild this project, repeatable.")
+
+    def handle(self, *args, **options):
+        projects = Project.objects.all()
+        if options["project"]:
+            projects = projects.filter(pk__in=options["project"])
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            rebuilt = rebuild_task_counts(projects)
+        # Counter updates do not send model signals.
+        bump_generation(Project)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt task counters of {rebuilt} projects in {time.perf_counter() - started:.1f}s")
+        )
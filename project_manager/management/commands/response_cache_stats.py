@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from project_manager.views import ProjectListAPIView, ProjectStatsAPIView, TaskListAPIView, TaskSearchAPIView
+
+
+class Command(BaseCommand):
+    help = "Print hit/miss statistics of the API response caches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Reset the counters after printing them.")
+
+    def handle(self, *args, **options):
+        response_caches = [
+            ProjectListAPIView.response_cache,
+            ProjectStatsAPIView.response_cache,
+            TaskListAPIView.response_cache,
+            TaskSearchAPIView.response_cache,
+        ]
+        stats = {response_cache.name: response_cache.stats() for response_cache in response_caches}
+        self.stdout.write(json.dumps(stats, indent=2))
+        if options["reset"]:
+            for response_cache in response_caches:
+                response_cache.reset_stats()
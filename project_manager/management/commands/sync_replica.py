@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into a replica alias with the SQLite online backup API, "
+        "to try read replicas locally. Run it again to pick up new writes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--alias", default="replica", help="Replica database alias (default: replica).")
+
+    def handle(self, *args, **options):
+        alias = options["alias"]
+        if alias not in connections.databases:
+            raise CommandError(f"No {alias!r} database configured, set DATABASE_REPLICA_NAME.")
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if primary.vendor != "sqlite" or replica.vendor != "sqlite":
+            raise CommandError("sync_replica only copies SQLite databases.")
+
+        started = time.perf_counter()
+        primary.ensure_connection()
+        replica.ensure_connection()
+        primary.connection.backup(replica.connection)
+        self.stdout.write(
+            self.style.SUCCESS(f"Copied {primary.settings_dict['NAME']} to {alias} in {time.perf_counter() - started:.1f}s")
+        )
@@ -0,0 +1,78 @@
+from collections.abc import Iterable
+from threading import Lock
+
+from core.cache import get_cache, get_generations
+from .models import Team
+
+MEMBERS_KEY = "team-members:{}:{}"
+MEMBERS_TIMEOUT = 24 * 60 * 60
+
+
+class TeamMembershipIndex:
+    """
+    Index of team id to the ids of its members, kept in process memory and in the
+    Django cache.
+
+    Entries are stored under the `Team` cache generation, which `m2m_changed` on
+    `Team.members` and team saves/deletes bump (see `project_manager.signals`), so
+    a membership change invalidates every process' copy. Looking up any number of
+    teams costs one query for the generation, one `get_many` for teams missing from
+    process memory and one query for teams missing from the cache.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._generation: int | None = None
+        self._members: dict[int, frozenset[int]] = {}
+
+    def get_members(self, team_ids: Iterable[int]) -> dict[int, frozenset[int]]:
+        team_ids = set(team_ids)
+        generation = get_generations([Team])[Team._meta.label_lower]
+        with self._lock:
+            if generation != self._generation:
+                self._generation = generation
+                self._members = {}
+            members = {team_id: self._members[team_id] for team_id in team_ids if team_id in self._members}
+
+        missing = team_ids - members.keys()
+        if missing:
+            cache = get_cache()
+            keys = {MEMBERS_KEY.format(generation, team_id): team_id for team_id in missing}
+            cached = {keys[key]: value for key, value in cache.get_many(keys).items()}
+            missing -= cached.keys()
+            loaded = {team_id: set() for team_id in missing}
+            if missing:
+                memberships = Team.members.through.objects.filter(team_id__in=missing)
+                for team_id, user_id in memberships.values_list("team_id", "user_id"):
+                    loaded[team_id].add(user_id)
+                loaded = {team_id: frozenset(user_ids) for team_id, user_ids in loaded.items()}
+                cache.set_many(
+                    {MEMBERS_KEY.format(generation, team_id): user_ids for team_id, user_ids in loaded.items()},
+                    timeout=MEMBERS_TIMEOUT,
+                )
+            members |= cached | loaded
+            with self._lock:
+                if generation == self._generation:
+                    self._members.update(cached | loaded)
+        return members
+
+    def is_member(self, team_id: int, user_id: int) -> bool:
+        return user_id in self.get_members([team_id])[team_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation = None
+            self._members = {}
+
+
+team_membership_index = TeamMembershipIndex()
+
+
+def validate_assignments(assignments: Iterable[tuple[int | None, int]]) -> list[bool]:
+    """
+    Return, for each `(team_id, user_id)` pair, whether the user may be assigned a task
+    of a project in that team. Projects without a team accept any user.
+    """
+    assignments = list(assignments)
+    members = team_membership_index.get_members(team_id for team_id, _ in assignments if team_id is not None)
+    return [team_id is None or user_id in members[team_id] for team_id, user_id in assignments]
@@ -1,92 +1,93 @@
 import random
 from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
 from django.db import migrations
-from django.utils.timezone import now
+
+# The demo data as created at this migration. It does not use project_manager.seeding,
+# so later changes to the seeder do not change this history.
+USERS = [
+    ('jsmith', 'John', 'Smith'),
+    ('agarcia', 'Ana', 'Garcia'),
+    ('mchen', 'Michael', 'Chen'),
+    ('spatel', 'Sarah', 'Patel'),
+    ('rwilson', 'Robert', 'Wilson'),
+]
+
+PROJECTS = [
+    ('Mobile App Redesign', 'Redesign and modernize our mobile application UI/UX for better user engagement'),
+    ('Cloud Migration Phase 1', 'Migrate core services to cloud infrastructure for improved scalability'),
+    ('Customer Portal Enhancement', 'Implement new features and security improvements in the customer portal'),
+    ('API Integration Platform', 'Develop a centralized platform for third-party API integrations'),
+    ('Performance Optimization', 'Optimize database queries and application performance for better response times'),
+]
+
+TASK_TEMPLATES = [
+    ('Requirements Documentation', 'Create detailed requirements documentation for {}'),
+    ('Technical Design', 'Develop technical design specifications for {}'),
+    ('Implementation', 'Implement core functionality for {}'),
+    ('Code Review', 'Conduct code review for {} implementation'),
+    ('Testing', 'Perform comprehensive testing for {}'),
+    ('Documentation', 'Create user and technical documentation for {}'),
+    ('Security Review', 'Conduct security assessment for {}'),
+    ('Performance Testing', 'Execute performance tests for {}'),
+    ('Deployment Planning', 'Prepare deployment strategy for {}'),
+    ('Stakeholder Review', 'Present {} to stakeholders for feedback'),
+]
+
+TASK_COUNT = 38
 
 
 def create_test_data(apps, schema_editor):
-    # Get the models
     User = apps.get_model('auth', 'User')
     Project = apps.get_model('project_manager', 'Project')
     Task = apps.get_model('project_manager', 'Task')
+    db_alias = schema_editor.connection.alias
 
-    # Create 5 users with realistic names
-    user_data = [
-        ('jsmith', 'John Smith', 'Engineering Lead'),
-        ('agarcia', 'Ana Garcia', 'Product Manager'),
-        ('mchen', 'Michael Chen', 'Senior Developer'),
-        ('spatel', 'Sarah Patel', 'UX Designer'),
-        ('rwilson', 'Robert Wilson', 'QA Engineer')
-    ]
-    
-    users = []
-    for username, full_name, _ in user_data:
-        first_name, last_name = full_name.split()
-        user = User.objects.create_user(
+    # One password hash for every user, hashing is deliberately slow.
+    password = make_password('testpass123')
+    User.objects.using(db_alias).bulk_create(
+        User(
             username=username,
             email=f'{username}@company.com',
-            password='testpass123',
+            password=password,
             first_name=first_name,
-            last_name=last_name
+            last_name=last_name,
         )
-        users.append(user)
+        for username, first_name, last_name in USERS
+    )
+    users = list(User.objects.using(db_alias).filter(username__in=[username for username, _, _ in USERS]))
 
-    # Create 5 projects with realistic names and descriptions
-    project_data = [
-        ('Mobile App Redesign', 'Redesign and modernize our mobile application UI/UX for better user engagement'),
-        ('Cloud Migration Phase 1', 'Migrate core services to cloud infrastructure for improved scalability'),
-        ('Customer Portal Enhancement', 'Implement new features and security improvements in the customer portal'),
-        ('API Integration Platform', 'Develop a centralized platform for third-party API integrations'),
-        ('Performance Optimization', 'Optimize database queries and application performance for better response times')
-    ]
-    
-    project_statuses = ['active', 'completed']
     today = date.today()
     projects = []
-    
-    for name, description in project_data:
+    for name, description in PROJECTS:
         start_date = today - timedelta(days=random.randint(1, 30))
-        end_date = start_date + timedelta(days=random.randint(30, 90))
-        
-        project = Project.objects.create(
+        projects.append(Project.objects.using(db_alias).create(
             name=name,
             description=description,
             start_date=start_date,
-            end_date=end_date,
-            status=random.choice(project_statuses)
-        )
-        projects.append(project)
+            end_date=start_date + timedelta(days=random.randint(30, 90)),
+            status=random.choice(['active', 'completed']),
+        ))
 
-    # Common task templates that can be adapted for each project
-    task_templates = [
-        ('Requirements Documentation', 'Create detailed requirements documentation for {}'),
-        ('Technical Design', 'Develop technical design specifications for {}'),
-        ('Implementation', 'Implement core functionality for {}'),
-        ('Code Review', 'Conduct code review for {} implementation'),
-        ('Testing', 'Perform comprehensive testing for {}'),
-        ('Documentation', 'Create user and technical documentation for {}'),
-        ('Security Review', 'Conduct security assessment for {}'),
-        ('Performance Testing', 'Execute performance tests for {}'),
-        ('Deployment Planning', 'Prepare deployment strategy for {}'),
-        ('Stakeholder Review', 'Present {} to stakeholders for feedback')
-    ]
-
-    task_statuses = ['pending', 'done']
-    
-    for project in projects:
-        num_tasks = random.randint(5, 10)
-        selected_tasks = random.sample(task_templates, num_tasks)
-        
-        for task_name, task_desc_template in selected_tasks:
-            due_date = project.end_date - timedelta(days=random.randint(1, 30))
-            Task.objects.create(
+    tasks_per_project = [0] * len(projects)
+    for _ in range(TASK_COUNT):
+        tasks_per_project[random.randrange(len(projects))] += 1
+    tasks = []
+    for project, task_count in zip(projects, tasks_per_project):
+        for index in range(task_count):
+            title, description = TASK_TEMPLATES[index % len(TASK_TEMPLATES)]
+            # Projects with more tasks than templates number the repetitions.
+            repetition = index // len(TASK_TEMPLATES)
+            tasks.append(Task(
                 project=project,
-                title=task_name,
-                description=task_desc_template.format(project.name),
+                title=f'{title} {repetition}' if repetition else title,
+                description=description.format(project.name),
                 assigned_to=random.choice(users),
-                due_date=due_date,
-                status=random.choice(task_statuses)
-            )
+                due_date=project.end_date - timedelta(days=random.randint(1, 30)),
+                status=random.choice(['pending', 'done']),
+            ))
+    Task.objects.using(db_alias).bulk_create(tasks)
 
 
 def remove_test_data(apps, schema_editor):
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:12
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_manager', '0006_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='team_name_lower_idx'),
+        ),
+    ]
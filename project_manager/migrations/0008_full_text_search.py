@@ -0,0 +1,54 @@
+from django.db import migrations
+
+# External content FTS5 tables and the triggers keeping them in sync, as created at this
+# migration. Later changes to core.search.FullTextIndex do not change this history.
+SEARCH_INDEXES = [
+    ("project_manager_task_fts", "project_manager_task", ("title", "description")),
+    ("project_manager_project_fts", "project_manager_project", ("name", "description")),
+]
+
+
+def get_search_table_sql(table, content_table, columns):
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    delete = f"INSERT INTO {table}({table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});"
+    insert = f"INSERT INTO {table}(rowid, {column_list}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE {table} USING fts5({column_list}, "
+        f"content='{content_table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"INSERT INTO {table}({table}) VALUES ('rebuild')",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON {content_table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON {content_table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE OF {column_list} ON {content_table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+def create_search_tables(apps, schema_editor):
+    # FTS5 is SQLite only, other databases use the icontains fallback of FullTextIndex.
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table, content_table, columns in SEARCH_INDEXES:
+        for statement in get_search_table_sql(table, content_table, columns):
+            schema_editor.execute(statement)
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table, _, _ in SEARCH_INDEXES:
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_manager', '0007_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:16
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_task_counts(apps, schema_editor):
+    Project = apps.get_model("project_manager", "Project")
+    Task = apps.get_model("project_manager", "Task")
+    db_alias = schema_editor.connection.alias
+    counts = {}
+    for status in ("pending", "done"):
+        task_count = (
+            Task.objects.using(db_alias)
+            .filter(project=OuterRef("pk"), status=status)
+            .order_by()
+            .values("project")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        counts[f"{status}_task_count"] = Coalesce(Subquery(task_count), 0)
+    Project.objects.using(db_alias).update(**counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_manager', '0008_full_text_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='done_task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='pending_task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_task_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:27
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def fill_change_sequences(apps, schema_editor):
+    # Existing rows take their id as change sequence number, the counters start after them.
+    ChangeSequence = apps.get_model("project_manager", "ChangeSequence")
+    db_alias = schema_editor.connection.alias
+    for model_name in ("project", "task"):
+        model = apps.get_model("project_manager", model_name)
+        model.objects.using(db_alias).update(change_seq=F("id"))
+        value = model.objects.using(db_alias).aggregate(value=Max("id"))["value"] or 0
+        ChangeSequence.objects.using(db_alias).create(name=f"project_manager.{model_name}", value=value)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_manager', '0009_project_task_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeSequence',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('object_id', models.BigIntegerField()),
+                ('change_seq', models.BigIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'change_seq'], name='tombstone_model_change_seq_idx')],
+            },
+        ),
+        migrations.RunPython(fill_change_sequences, migrations.RunPython.noop),
+    ]
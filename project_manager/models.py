@@ -1,33 +1,198 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, router, transaction
+from django.db.models import Exists, F, OuterRef, ProtectedError
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 
 
+class TeamQuerySet(models.QuerySet):
+    def check_deletable(self) -> None:
+        """
+        Raise `ProtectedError` if a project of these teams still has tasks, with one query.
+        """
+        Project.objects.using(self.db).filter(team__in=self.values("pk")).check_deletable()
+
+    def delete(self):
+        self.check_deletable()
+        return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Team(models.Model):
     name = models.CharField(max_length=255)
     members = models.ManyToManyField(User)
-    
+
+    objects = TeamQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Admin prefix search.
+            models.Index(Lower("name"), name="team_name_lower_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(type(self), instance=self)
+        Team.objects.using(using).filter(pk=self.pk).check_deletable()
+        return super().delete(using=using, keep_parents=keep_parents)
+
+
+class ChangeSequence(models.Model):
+    """
+    Counter row allocating the change sequence numbers of a model, see `ChangeTrackedModel`.
+    """
+
+    name = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    @classmethod
+    def allocate(cls, model: type[models.Model], count: int = 1, using: str = "default") -> range:
+        """
+        Reserve `count` consecutive change sequence numbers of `model`.
+
+        The counter row stays locked until the surrounding transaction ends, so writers
+        commit in sequence order and a client never skips a number that commits late.
+        """
+        sequences = cls.objects.using(using).filter(name=model._meta.label_lower)
+        with transaction.atomic(using=using, savepoint=False):
+            if not sequences.update(value=F("value") + count):
+                cls.objects.using(using).get_or_create(name=model._meta.label_lower)
+                sequences.update(value=F("value") + count)
+            value = sequences.values_list("value", flat=True).get()
+        return range(value - count + 1, value + 1)
+
+
+class Tombstone(models.Model):
+    """
+    A deleted row of a `ChangeTrackedModel`, so incremental sync can report deletes.
+    """
+
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["model", "change_seq"], name="tombstone_model_change_seq_idx"),
+        ]
+
+
+class ChangeTrackedModel(models.Model):
+    """
+    Rows stamped with a change sequence number on every save, for clients to fetch the
+    rows changed since the last number they saw. Deletes leave a `Tombstone`, see
+    `project_manager.signals`. `bulk_create()`, `bulk_update()` and `QuerySet.update()`
+    must assign `change_seq` themselves with `ChangeSequence.allocate()`.
+    """
 
-class Project(models.Model):
+    change_seq = models.BigIntegerField(default=0, editable=False, db_index=True)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        # post_save receivers, e.g. the task counters, run in the same transaction.
+        with transaction.atomic(using=using, savepoint=False):
+            self.change_seq = ChangeSequence.allocate(type(self), using=using).start
+            if kwargs.get("update_fields"):
+                kwargs["update_fields"] = {*kwargs["update_fields"], "change_seq"}
+            super().save(*args, **kwargs)
+
+
+class ProjectQuerySet(models.QuerySet):
+    def with_tasks(self) -> "ProjectQuerySet":
+        return self.filter(Exists(Task.objects.filter(project=OuterRef("pk"))))
+
+    def check_deletable(self) -> None:
+        """
+        Raise `ProtectedError` if any of these projects still has tasks, with one query.
+        `Task.project` does not cascade: collecting the tasks of a delete would load
+        every one of them into memory. Tasks added after the check fail the delete
+        on the foreign key constraint.
+        """
+        projects = self.with_tasks()
+        if projects.exists():
+            raise ProtectedError("Cannot delete projects that still have tasks.", projects)
+
+    def delete(self):
+        self.check_deletable()
+        return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class Project(ChangeTrackedModel):
     name = models.CharField(max_length=255)
     description = models.TextField()
     start_date = models.DateField()
     end_date = models.DateField()
     status = models.CharField(max_length=20, choices=[('active', 'Active'), ('completed', 'Completed')])
     team = models.ForeignKey(Team, on_delete=models.CASCADE, null=True, related_name="projects")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Denormalized task counts by status, maintained by project_manager.counters.
+    pending_task_count = models.PositiveIntegerField(default=0, editable=False)
+    done_task_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = ProjectQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # List filters, each ending with the pagination key.
+            models.Index(fields=["status", "id"], name="project_status_id_idx"),
+            models.Index(fields=["team", "id"], name="project_team_id_idx"),
+            models.Index(fields=["start_date", "id"], name="project_start_date_id_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
-class Task(models.Model):
-    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="tasks")
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(type(self), instance=self)
+        Project.objects.using(using).filter(pk=self.pk).check_deletable()
+        return super().delete(using=using, keep_parents=keep_parents)
+
+
+class Task(ChangeTrackedModel):
+    # Deletes are guarded by ProjectQuerySet.check_deletable(), the database constraint backs it.
+    project = models.ForeignKey(Project, on_delete=models.DO_NOTHING, related_name="tasks")
     title = models.CharField(max_length=255)
     description = models.TextField()
     assigned_to = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tasks")
     due_date = models.DateField()
     status = models.CharField(max_length=20, choices=[('pending', 'Pending'), ('done', 'Done')])
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination ordering for the task list.
+            models.Index(fields=["due_date", "id"], name="task_due_date_id_idx"),
+            # List filters, each followed by the due_date ordering.
+            models.Index(fields=["status", "due_date", "id"], name="task_status_due_date_id_idx"),
+            models.Index(fields=["assigned_to", "due_date", "id"], name="task_assignee_due_date_id_idx"),
+            models.Index(fields=["project", "due_date", "id"], name="task_project_due_date_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.status}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The loaded project and status, for the counters to know what a save changed.
+        instance._loaded_counter_key = (instance.__dict__.get("project_id"), instance.__dict__.get("status"))
+        return instance
+
+    def clean(self):
+        from .membership import team_membership_index
+
+        if self.project_id is None or self.assigned_to_id is None:
+            return
+        team_id = self.project.team_id
+        if team_id is not None and not team_membership_index.is_member(team_id, self.assigned_to_id):
+            raise ValidationError({"assigned_to": "The assignee must be a member of the project's team."})
@@ -0,0 +1,15 @@
+from core.search import FullTextIndex
+
+# Created by migration 0008_full_text_search, triggers installed after every migrate (see signals).
+TASK_SEARCH_INDEX = FullTextIndex(
+    table="project_manager_task_fts",
+    content_table="project_manager_task",
+    columns=("title", "description"),
+    weights=(10.0, 1.0),
+)
+PROJECT_SEARCH_INDEX = FullTextIndex(
+    table="project_manager_project_fts",
+    content_table="project_manager_project",
+    columns=("name", "description"),
+    weights=(10.0, 1.0),
+)
@@ -0,0 +1,336 @@
+import random
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import ExitStack
+from dataclasses import dataclass
+from functools import cache
+from datetime import date, timedelta
+from itertools import islice
+from typing import Any
+
+from django.apps import apps as global_apps
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.db import deferred_indexes
+
+from .models import ChangeSequence
+from .search import TASK_SEARCH_INDEX
+
+SEED_PASSWORD = "testpass123"
+
+DEFAULT_BATCH_SIZE = 5_000
+
+# From this many tasks on, the task indexes are built once after the insert.
+DEFER_INDEXES_MIN_TASKS = 100_000
+
+# Scale 1 is this demo data, larger scales repeat it with numbered names.
+DEMO_USERS = [
+    ("jsmith", "John", "Smith"),
+    ("agarcia", "Ana", "Garcia"),
+    ("mchen", "Michael", "Chen"),
+    ("spatel", "Sarah", "Patel"),
+    ("rwilson", "Robert", "Wilson"),
+]
+
+DEMO_PROJECTS = [
+    ("Mobile App Redesign", "Redesign and modernize our mobile application UI/UX for better user engagement"),
+    ("Cloud Migration Phase 1", "Migrate core services to cloud infrastructure for improved scalability"),
+    ("Customer Portal Enhancement", "Implement new features and security improvements in the customer portal"),
+    ("API Integration Platform", "Develop a centralized platform for third-party API integrations"),
+    ("Performance Optimization", "Optimize database queries and application performance for better response times"),
+]
+
+TASK_TEMPLATES = [
+    ("Requirements Documentation", "Create detailed requirements documentation for {}"),
+    ("Technical Design", "Develop technical design specifications for {}"),
+    ("Implementation", "Implement core functionality for {}"),
+    ("Code Review", "Conduct code review for {} implementation"),
+    ("Testing", "Perform comprehensive testing for {}"),
+    ("Documentation", "Create user and technical documentation for {}"),
+    ("Security Review", "Conduct security assessment for {}"),
+    ("Performance Testing", "Execute performance tests for {}"),
+    ("Deployment Planning", "Prepare deployment strategy for {}"),
+    ("Stakeholder Review", "Present {} to stakeholders for feedback"),
+]
+
+
+@dataclass(frozen=True)
+class SeedSize:
+    users: int
+    teams: int
+    team_size: int
+    projects: int
+    tasks: int
+
+    @classmethod
+    def from_scale(cls, scale: int) -> "SeedSize":
+        """
+        Return the size of the demo data repeated `scale` times: 5 users, 5 projects and
+        about 38 tasks per unit, plus one team of 5 members per unit above the first.
+        """
+        return cls(
+            users=5 * scale,
+            teams=scale - 1,
+            team_size=5 if scale > 1 else 0,
+            projects=5 * scale,
+            tasks=38 * scale,
+        )
+
+
+@dataclass(frozen=True)
+class SeededProject:
+    id: int
+    team_id: int | None
+    name: str
+    end_date: date
+    pending: int
+    done: int
+
+
+def has_field(model: type[models.Model], name: str) -> bool:
+    try:
+        model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def batched(iterable: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Seeder:
+    """
+    Insert users, teams, memberships, projects and tasks with batched `bulk_create()`,
+    tasks as plain rows with batched `executemany()`: building a model instance per row
+    costs more than inserting it. Tasks are indexed for full-text search once at the end
+    and large seeds also build the task indexes once, instead of per row.
+
+    Every user shares one password hash, hashing is deliberately slow. Models come from
+    `apps`, so data migrations can pass their historical models: fields those models do
+    not have yet, e.g. `Project.team`, are left out. Project task counters and change
+    sequence numbers are set on insert, as bulk inserts do not send model signals.
+    `prefix` keeps the names of repeated seeds apart, the scale 1 demo data uses none.
+    """
+
+    def __init__(
+        self,
+        apps: Any = global_apps,
+        using: str = DEFAULT_DB_ALIAS,
+        prefix: str = "",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        seed: int | None = None,
+        log: Callable[[str], None] | None = None,
+    ) -> None:
+        self.User = apps.get_model("auth", "User")
+        self.Project = apps.get_model("project_manager", "Project")
+        self.Task = apps.get_model("project_manager", "Task")
+        self.Team = apps.get_model("project_manager", "Team") if has_field(self.Project, "team") else None
+        self.apps = apps
+        self.using = using
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.log = log or (lambda message: None)
+
+    def seed(self, size: SeedSize) -> None:
+        with transaction.atomic(using=self.using):
+            user_ids = self.create_users(size.users)
+            team_members = self.create_teams(size.teams, size.team_size, user_ids)
+            projects = self.create_projects(size.projects, size.tasks, team_members)
+            with ExitStack() as stack:
+                stack.enter_context(TASK_SEARCH_INDEX.bulk_load(self.using))
+                if size.tasks >= DEFER_INDEXES_MIN_TASKS:
+                    stack.enter_context(deferred_indexes(self.Task, self.using))
+                self.create_tasks(projects, team_members, user_ids)
+
+    def bulk_create(self, model: type[models.Model], objs: Iterable[models.Model], total: int) -> None:
+        manager = model._base_manager.db_manager(self.using)
+        created = 0
+        for batch in batched(objs, self.batch_size):
+            if has_field(model, "change_seq"):
+                self.assign_change_seqs(model, batch)
+            manager.bulk_create(batch)
+            created += len(batch)
+            self.log_progress(model, created, total)
+
+    def insert_rows(self, model: type[models.Model], fields: list[str], rows: Iterable[tuple], total: int) -> None:
+        """
+        Insert `rows`, tuples of database values of `fields`, without model instances.
+        """
+        connection = connections[self.using]
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ", ".join(connection.ops.quote_name(model._meta.get_field(name).column) for name in fields)
+        placeholders = ", ".join(["%s"] * len(fields))
+        sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+        created = 0
+        with connection.cursor() as cursor:
+            for batch in batched(rows, self.batch_size):
+                cursor.executemany(sql, batch)
+                created += len(batch)
+                self.log_progress(model, created, total)
+
+    def log_progress(self, model: type[models.Model], created: int, total: int) -> None:
+        if created % (self.batch_size * 20) == 0:
+            self.log(f"  {model._meta.verbose_name_plural}: {created}/{total}")
+
+    def insert(self, model: type[models.Model], objs: list[models.Model]) -> list[int]:
+        """
+        Insert `objs` and return their ids, in order.
+        """
+        if connections[self.using].features.can_return_rows_from_bulk_insert:
+            self.bulk_create(model, objs, len(objs))
+            return [obj.pk for obj in objs]
+        # Without ids from bulk inserts, the seeded rows are the table's newest ones.
+        rows = model._base_manager.using(self.using)
+        last_id = rows.aggregate(last_id=Max("id"))["last_id"] or 0
+        self.bulk_create(model, objs, len(objs))
+        return list(rows.filter(id__gt=last_id).order_by("id").values_list("id", flat=True))
+
+    def assign_change_seqs(self, model: type[models.Model], objs: list[models.Model]) -> None:
+        for obj, change_seq in zip(objs, self.allocate_change_seqs(model, len(objs))):
+            obj.change_seq = change_seq
+
+    def allocate_change_seqs(self, model: type[models.Model], count: int) -> range:
+        sequences = self.apps.get_model("project_manager", "ChangeSequence")
+        # Historical models have no methods, run the allocation on the given counter model.
+        return ChangeSequence.allocate.__func__(sequences, model, count, self.using)
+
+    def get_name(self, names: list[Any], index: int) -> tuple[Any, str]:
+        """
+        Return the demo entry for `index` and the suffix numbering its repetitions.
+        """
+        repetition = index // len(names)
+        return names[index % len(names)], f" {repetition}" if repetition else ""
+
+    def create_users(self, count: int) -> list[int]:
+        self.log(f"Creating {count} users")
+        password = make_password(SEED_PASSWORD)
+
+        def build(index):
+            (username, first_name, last_name), suffix = self.get_name(DEMO_USERS, index)
+            username = f"{self.prefix}{username}{suffix.strip()}"
+            return self.User(
+                username=username,
+                email=f"{username}@company.com",
+                password=password,
+                first_name=first_name,
+                last_name=f"{last_name}{suffix}",
+            )
+
+        return self.insert(self.User, [build(index) for index in range(count)])
+
+    def create_teams(self, count: int, team_size: int, user_ids: list[int]) -> dict[int, list[int]]:
+        if self.Team is None or not count:
+            return {}
+        self.log(f"Creating {count} teams")
+        team_ids = self.insert(self.Team, [self.Team(name=f"{self.prefix}Team {index}") for index in range(count)])
+        team_members = {team_id: self.random.sample(user_ids, min(team_size, len(user_ids))) for team_id in team_ids}
+        Membership = self.Team.members.through
+        self.bulk_create(
+            Membership,
+            (
+                Membership(team_id=team_id, user_id=user_id)
+                for team_id, members in team_members.items()
+                for user_id in members
+            ),
+            count * team_size,
+        )
+        return team_members
+
+    def create_projects(
+        self, count: int, task_count: int, team_members: dict[int, list[int]]
+    ) -> list[SeededProject]:
+        """
+        Insert `count` projects and spread `task_count` tasks over them, which are
+        counted on insert, with about as many pending as done.
+        """
+        self.log(f"Creating {count} projects")
+        if not count:
+            return []
+        team_ids = list(team_members)
+        today = date.today()
+        tasks_per_project = [0] * count
+        for _ in range(task_count):
+            tasks_per_project[self.random.randrange(count)] += 1
+        with_counters = has_field(self.Project, "pending_task_count")
+        pending_counts = []
+
+        def build(index):
+            (name, description), suffix = self.get_name(DEMO_PROJECTS, index)
+            start_date = today - timedelta(days=self.random.randint(1, 30))
+            pending = sum(self.random.random() < 0.5 for _ in range(tasks_per_project[index]))
+            pending_counts.append(pending)
+            project = self.Project(
+                name=f"{self.prefix}{name}{suffix}",
+                description=description,
+                start_date=start_date,
+                end_date=start_date + timedelta(days=self.random.randint(30, 90)),
+                status=self.random.choice(("active", "completed")),
+            )
+            if team_ids:
+                project.team_id = self.random.choice(team_ids)
+            if with_counters:
+                project.pending_task_count = pending
+                project.done_task_count = tasks_per_project[index] - pending
+            return project
+
+        projects = [build(index) for index in range(count)]
+        project_ids = self.insert(self.Project, projects)
+        return [
+            SeededProject(
+                id=project_id,
+                team_id=getattr(project, "team_id", None),
+                name=project.name,
+                end_date=project.end_date,
+                pending=pending,
+                done=total - pending,
+            )
+            for project_id, project, pending, total in zip(project_ids, projects, pending_counts, tasks_per_project)
+        ]
+
+    def create_tasks(
+        self,
+        projects: list[SeededProject],
+        team_members: dict[int, list[int]],
+        user_ids: list[int],
+    ) -> None:
+        total = sum(project.pending + project.done for project in projects)
+        if not total:
+            return
+        self.log(f"Creating {total} tasks")
+        connection = connections[self.using]
+        adapt_date = cache(connection.ops.adapt_datefield_value)
+        fields = ["project", "title", "description", "assigned_to", "due_date", "status"]
+        extra = ()
+        if has_field(self.Task, "updated_at"):
+            fields.append("updated_at")
+            extra += (connection.ops.adapt_datetimefield_value(timezone.now()),)
+        change_seqs = None
+        if has_field(self.Task, "change_seq"):
+            fields.append("change_seq")
+            change_seqs = iter(self.allocate_change_seqs(self.Task, total))
+
+        def build():
+            for project in projects:
+                # Assign tasks to members of the project's team.
+                members = team_members.get(project.team_id) or user_ids
+                for index in range(project.pending + project.done):
+                    (title, description), suffix = self.get_name(TASK_TEMPLATES, index)
+                    row = (
+                        project.id,
+                        f"{title}{suffix}",
+                        description.format(project.name),
+                        self.random.choice(members),
+                        adapt_date(project.end_date - timedelta(days=self.random.randint(1, 30))),
+                        "pending" if index < project.pending else "done",
+                        *extra,
+                    )
+                    yield row if change_seqs is None else (*row, next(change_seqs))
+
+        self.insert_rows(self.Task, fields, build(), total)
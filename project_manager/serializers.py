@@ -1,17 +1,17 @@
 from rest_framework import serializers
 
-from core.api.serializers import BaseSerializer
+from core.api.serializers import BaseOutputSerializer, CompiledListSerializer
 from .models import Project
 
 
-class UserSerializer(BaseSerializer):
+class UserSerializer(BaseOutputSerializer):
     username = serializers.CharField(max_length=255)
     email = serializers.EmailField()
     first_name = serializers.CharField(max_length=255)
     last_name = serializers.CharField(max_length=255)
 
 
-class ProjectSerializer(BaseSerializer):
+class ProjectSerializer(BaseOutputSerializer):
     name = serializers.CharField(max_length=255)
     description = serializers.CharField()
     start_date = serializers.DateField()
@@ -27,9 +27,10 @@ class ProjectSerializer(BaseSerializer):
             "end_date",
             "status",
         ]
+        list_serializer_class = CompiledListSerializer
 
 
-class TaskSerializer(BaseSerializer):
+class TaskSerializer(BaseOutputSerializer):
     project = ProjectSerializer()
     assigned_to = UserSerializer()
 
@@ -38,3 +39,6 @@ class TaskSerializer(BaseSerializer):
     due_date = serializers.DateField()
     status = serializers.CharField()
 
+    class Meta:
+        list_serializer_class = CompiledListSerializer
+
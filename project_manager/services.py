@@ -1,22 +1,488 @@
-from dataclasses import dataclass
-from .models import Project, Task
+from collections import Counter
+from dataclasses import dataclass, field, fields
+from datetime import date
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, QuerySet, Sum
+from django.utils import timezone
+from rest_framework.serializers import BaseSerializer
+
+from core.api.pagination import PageRequest, apaginate, paginate
+from core.api.querysets import optimize_queryset
+from core.cache import bump_generation
+from core.replicas import get_read_alias
+from .counters import apply_task_count_changes, get_counter_key
+from .membership import validate_assignments
+from .models import ChangeSequence, ChangeTrackedModel, Project, Task, Tombstone
+from .search import TASK_SEARCH_INDEX
+
+PROJECT_ORDERING = ("id",)
+
+TASK_ORDERINGS = {
+    "id": ("id",),
+    "due_date": ("due_date", "id"),
+}
+
+BULK_WRITE_BATCH_SIZE = 500
+
+DEFAULT_SEARCH_LIMIT = 20
+
+DEFAULT_CHANGES_LIMIT = 100
+
+# Export column name to the `values_list()` lookup it reads, joins included.
+TASK_EXPORT_COLUMNS = {
+    "id": "id",
+    "title": "title",
+    "description": "description",
+    "status": "status",
+    "due_date": "due_date",
+    "updated_at": "updated_at",
+    "project_id": "project_id",
+    "project_name": "project__name",
+    "project_status": "project__status",
+    "team_id": "project__team_id",
+    "assigned_to_id": "assigned_to_id",
+    "assigned_to_username": "assigned_to__username",
+    "assigned_to_email": "assigned_to__email",
+}
 
 
 @dataclass(frozen=True)
 class ProjectList:
     items: list[Project]
+    count: int | None = None
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
 
 
 @dataclass(frozen=True)
 class TaskList:
     items: list[Task]
+    count: int | None = None
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+
+@dataclass(frozen=True)
+class ChangeSet:
+    items: QuerySet[Any]
+    deleted: list[int]
+    next_token: int
+    has_more: bool = False
+
+
+@dataclass(frozen=True)
+class ProjectTaskStats:
+    id: int
+    name: str
+    team: int | None
+    pending: int
+    done: int
+    overdue: int
+
+
+@dataclass(frozen=True)
+class TeamTaskStats:
+    id: int
+    name: str
+    projects: int
+    pending: int
+    done: int
+    overdue: int
+
+
+@dataclass(frozen=True)
+class ProjectStats:
+    items: list[ProjectTaskStats]
+    teams: list[TeamTaskStats]
+    count: int | None = None
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+
+@dataclass(frozen=True)
+class ProjectFilters:
+    status: str | None = None
+    team: int | None = None
+    start_date_after: date | None = None
+    start_date_before: date | None = None
+
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> "ProjectFilters":
+        return cls(**{field.name: data.get(field.name) for field in fields(cls)})
+
+    def apply(self, projects: QuerySet[Project]) -> QuerySet[Project]:
+        if self.status is not None:
+            projects = projects.filter(status=self.status)
+        if self.team is not None:
+            projects = projects.filter(team_id=self.team)
+        if self.start_date_after is not None:
+            projects = projects.filter(start_date__gte=self.start_date_after)
+        if self.start_date_before is not None:
+            projects = projects.filter(start_date__lte=self.start_date_before)
+        return projects
+
+
+@dataclass(frozen=True)
+class TaskFilters:
+    status: str | None = None
+    due_date_after: date | None = None
+    due_date_before: date | None = None
+    assigned_to: int | None = None
+    project: int | None = None
+    team: int | None = None
+
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> "TaskFilters":
+        return cls(**{field.name: data.get(field.name) for field in fields(cls)})
+
+    def apply(self, tasks: QuerySet[Task]) -> QuerySet[Task]:
+        if self.status is not None:
+            tasks = tasks.filter(status=self.status)
+        if self.due_date_after is not None:
+            tasks = tasks.filter(due_date__gte=self.due_date_after)
+        if self.due_date_before is not None:
+            tasks = tasks.filter(due_date__lte=self.due_date_before)
+        if self.assigned_to is not None:
+            tasks = tasks.filter(assigned_to_id=self.assigned_to)
+        if self.project is not None:
+            tasks = tasks.filter(project_id=self.project)
+        if self.team is not None:
+            tasks = tasks.filter(project__team_id=self.team)
+        return tasks
+
+
+def get_changes(queryset: QuerySet[ChangeTrackedModel], since: int, limit: int) -> ChangeSet:
+    """
+    Return the first `limit` rows of `queryset` saved and ids deleted after change sequence
+    number `since`, in sequence order, and the token to pass as `since` next.
+
+    When nothing changed this is one primary key lookup of the sequence counter. Otherwise
+    the changed rows and tombstones are read through their change sequence indexes.
+    """
+    model = queryset.model
+    label = model._meta.label_lower
+    sequences = ChangeSequence.objects.using(queryset.db)
+    if not sequences.filter(name=label, value__gt=since).exists():
+        return ChangeSet(items=queryset.none(), deleted=[], next_token=since)
+
+    changed = queryset.filter(change_seq__gt=since).order_by("change_seq")
+    saved = changed.values_list("change_seq", flat=True)[: limit + 1]
+    deleted = (
+        Tombstone.objects.using(queryset.db)
+        .filter(model=label, change_seq__gt=since)
+        .order_by("change_seq")
+        .values_list("change_seq", "object_id")[: limit + 1]
+    )
+    changes = sorted([(change_seq, None) for change_seq in saved] + list(deleted))
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    next_token = changes[-1][0] if changes else since
+    return ChangeSet(
+        items=changed.filter(change_seq__lte=next_token),
+        deleted=[object_id for _, object_id in changes if object_id is not None],
+        next_token=next_token,
+        has_more=has_more,
+    )
 
 
 class ProjectsReadService:
-    def list(self) -> ProjectList:
-        return ProjectList(items=Project.objects.all())
+    def list(
+        self,
+        serializer: BaseSerializer | None = None,
+        page: PageRequest | None = None,
+        filters: ProjectFilters = ProjectFilters(),
+    ) -> ProjectList:
+        projects = filters.apply(Project.objects.using(get_read_alias()))
+        if serializer is not None:
+            projects = optimize_queryset(projects, serializer)
+        if page is None:
+            return ProjectList(items=projects.order_by(*PROJECT_ORDERING))
+        result = paginate(projects, PROJECT_ORDERING, page)
+        return ProjectList(
+            items=result.items,
+            count=result.count,
+            next_cursor=result.next_cursor,
+            previous_cursor=result.previous_cursor,
+        )
+
+    async def alist(
+        self,
+        serializer: BaseSerializer | None = None,
+        page: PageRequest | None = None,
+        filters: ProjectFilters = ProjectFilters(),
+    ) -> ProjectList:
+        """
+        Async version of `list`, the items are an unevaluated queryset to read with the async ORM.
+        """
+        projects = filters.apply(Project.objects.using(get_read_alias()))
+        if serializer is not None:
+            projects = optimize_queryset(projects, serializer)
+        if page is None:
+            return ProjectList(items=projects.order_by(*PROJECT_ORDERING))
+        result = await apaginate(projects, PROJECT_ORDERING, page)
+        return ProjectList(
+            items=result.items,
+            count=result.count,
+            next_cursor=result.next_cursor,
+            previous_cursor=result.previous_cursor,
+        )
+
+    def changes(
+        self,
+        since: int = 0,
+        serializer: BaseSerializer | None = None,
+        limit: int = DEFAULT_CHANGES_LIMIT,
+    ) -> ChangeSet:
+        projects = Project.objects.using(get_read_alias())
+        if serializer is not None:
+            projects = optimize_queryset(projects, serializer)
+        return get_changes(projects, since, limit)
+
+
+class ProjectStatsReadService:
+    def stats(self, page: PageRequest, today: date, team: int | None = None) -> ProjectStats:
+        """
+        Return a page of per-project task counts and the per-team totals, of `team` only if given.
+
+        Pending and done counts come from the project counter columns. Overdue tasks,
+        pending ones due before `today`, depend on the date and are counted by query:
+        once for the page's projects through the project/due date index, once per team.
+        """
+        using = get_read_alias()
+        projects = Project.objects.using(using).only("id", "name", "team_id", "pending_task_count", "done_task_count")
+        teams = Project.objects.using(using).filter(team__isnull=False)
+        overdue = Task.objects.using(using).filter(status="pending", due_date__lt=today).order_by()
+        if team is not None:
+            projects = projects.filter(team_id=team)
+            teams = teams.filter(team_id=team)
+            overdue = overdue.filter(project__team_id=team)
+
+        result = paginate(projects, PROJECT_ORDERING, page)
+        page_projects = list(result.items)
+        project_overdue = dict(
+            overdue.filter(project_id__in=[project.id for project in page_projects])
+            .values("project_id")
+            .annotate(count=Count("id"))
+            .values_list("project_id", "count")
+        )
+        team_overdue = dict(
+            overdue.filter(project__team__isnull=False)
+            .values("project__team_id")
+            .annotate(count=Count("id"))
+            .values_list("project__team_id", "count")
+        )
+        team_rows = (
+            teams.order_by()
+            .values("team_id", "team__name")
+            .annotate(projects=Count("id"), pending=Sum("pending_task_count"), done=Sum("done_task_count"))
+            .order_by("team_id")
+        )
+        return ProjectStats(
+            items=[
+                ProjectTaskStats(
+                    id=project.id,
+                    name=project.name,
+                    team=project.team_id,
+                    pending=project.pending_task_count,
+                    done=project.done_task_count,
+                    overdue=project_overdue.get(project.id, 0),
+                )
+                for project in page_projects
+            ],
+            teams=[
+                TeamTaskStats(
+                    id=row["team_id"],
+                    name=row["team__name"],
+                    projects=row["projects"],
+                    pending=row["pending"],
+                    done=row["done"],
+                    overdue=team_overdue.get(row["team_id"], 0),
+                )
+                for row in team_rows
+            ],
+            count=result.count,
+            next_cursor=result.next_cursor,
+            previous_cursor=result.previous_cursor,
+        )
 
 
 class TasksReadService:
-    def list(self) -> TaskList:
-        return TaskList(items=Task.objects.all())
\ No newline at end of file
+    def list(
+        self,
+        serializer: BaseSerializer | None = None,
+        page: PageRequest | None = None,
+        ordering: str = "id",
+        filters: TaskFilters = TaskFilters(),
+    ) -> TaskList:
+        tasks = filters.apply(Task.objects.using(get_read_alias()))
+        if serializer is not None:
+            tasks = optimize_queryset(tasks, serializer)
+        if page is None:
+            return TaskList(items=tasks.order_by(*TASK_ORDERINGS[ordering]))
+        result = paginate(tasks, TASK_ORDERINGS[ordering], page)
+        return TaskList(
+            items=result.items,
+            count=result.count,
+            next_cursor=result.next_cursor,
+            previous_cursor=result.previous_cursor,
+        )
+
+    async def alist(
+        self,
+        serializer: BaseSerializer | None = None,
+        page: PageRequest | None = None,
+        ordering: str = "id",
+        filters: TaskFilters = TaskFilters(),
+    ) -> TaskList:
+        """
+        Async version of `list`, the items are an unevaluated queryset to read with the async ORM.
+        """
+        tasks = filters.apply(Task.objects.using(get_read_alias()))
+        if serializer is not None:
+            tasks = optimize_queryset(tasks, serializer)
+        if page is None:
+            return TaskList(items=tasks.order_by(*TASK_ORDERINGS[ordering]))
+        result = await apaginate(tasks, TASK_ORDERINGS[ordering], page)
+        return TaskList(
+            items=result.items,
+            count=result.count,
+            next_cursor=result.next_cursor,
+            previous_cursor=result.previous_cursor,
+        )
+
+    def changes(
+        self,
+        since: int = 0,
+        serializer: BaseSerializer | None = None,
+        limit: int = DEFAULT_CHANGES_LIMIT,
+    ) -> ChangeSet:
+        tasks = Task.objects.using(get_read_alias())
+        if serializer is not None:
+            tasks = optimize_queryset(tasks, serializer)
+        return get_changes(tasks, since, limit)
+
+    def export(self, filters: TaskFilters = TaskFilters(), ordering: str = "id") -> QuerySet[Task]:
+        """
+        Return `TASK_EXPORT_COLUMNS` rows of the filtered tasks, joined with their project
+        and assignee in the same query. Read them with `.iterator()` so exports of any size
+        are fetched in chunks through one cursor.
+        """
+        tasks = filters.apply(Task.objects.using(get_read_alias()))
+        return tasks.order_by(*TASK_ORDERINGS[ordering]).values_list(*TASK_EXPORT_COLUMNS.values())
+
+    def search(
+        self,
+        text: str,
+        serializer: BaseSerializer | None = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+    ) -> TaskList:
+        """
+        Return the tasks whose title or description match `text`, best match first.
+        Two queries whatever the table size: the ranked ids from the full-text index,
+        then the tasks.
+        """
+        tasks = Task.objects.using(get_read_alias())
+        if serializer is not None:
+            tasks = optimize_queryset(tasks, serializer)
+        return TaskList(items=TASK_SEARCH_INDEX.search(tasks, text, limit))
+
+
+@dataclass(frozen=True)
+class RowError:
+    index: int
+    errors: dict[str, list[str]]
+
+
+@dataclass(frozen=True)
+class BulkTaskResult:
+    created: int = 0
+    updated: int = 0
+    errors: list[RowError] = field(default_factory=list)
+
+
+class TasksWriteService:
+    def bulk_upsert(self, rows: list[tuple[int, dict[str, Any]]]) -> BulkTaskResult:
+        """
+        Create tasks without an `id` and update tasks with one, in a single transaction.
+
+        `rows` are `(index, data)` pairs of rows that passed field validation. Referenced
+        projects, users and updated tasks are resolved with one `IN` query each, rows
+        referencing missing objects or assigning a user outside the project's team are
+        reported as errors and skipped. Team membership comes from the membership index,
+        so it costs no query per row. Rows repeating the `id` of another row are errors
+        too, rather than one of them silently winning. The lookups, project task counters
+        and change sequence numbers are all in the same transaction.
+        """
+        with transaction.atomic():
+            project_ids = {data["project"] for _, data in rows}
+            user_ids = {data["assigned_to"] for _, data in rows}
+            id_counts = Counter(data["id"] for _, data in rows if data.get("id") is not None)
+            task_ids = set(id_counts)
+            project_teams = dict(Project.objects.filter(id__in=project_ids).values_list("id", "team_id"))
+            users = set(User.objects.filter(id__in=user_ids).values_list("id", flat=True))
+            # Locked where the backend supports it: the counter deltas below come from this read.
+            tasks = Task.objects.select_for_update().in_bulk(task_ids)
+            assignable = validate_assignments(
+                (project_teams.get(data["project"]), data["assigned_to"]) for _, data in rows
+            )
+
+            errors = []
+            to_create = []
+            to_update = []
+            count_changes = Counter()
+            now = timezone.now()
+            for (index, data), is_assignable in zip(rows, assignable):
+                row_errors = {}
+                if data["project"] not in project_teams:
+                    row_errors["project"] = [f"Project {data['project']} does not exist."]
+                if data["assigned_to"] not in users:
+                    row_errors["assigned_to"] = [f"User {data['assigned_to']} does not exist."]
+                elif not is_assignable:
+                    row_errors["assigned_to"] = [f"User {data['assigned_to']} is not a member of the project's team."]
+                task_id = data.get("id")
+                if task_id is not None and task_id not in tasks:
+                    row_errors["id"] = [f"Task {task_id} does not exist."]
+                elif id_counts[task_id] > 1:
+                    row_errors["id"] = [f"Task {task_id} appears more than once in the batch."]
+                if row_errors:
+                    errors.append(RowError(index=index, errors=row_errors))
+                    continue
+
+                values = {
+                    "project_id": data["project"],
+                    "assigned_to_id": data["assigned_to"],
+                    **{name: data[name] for name in ("title", "description", "due_date", "status")},
+                }
+                if task_id is None:
+                    to_create.append(Task(**values))
+                    count_changes[(values["project_id"], values["status"])] += 1
+                else:
+                    task = tasks[task_id]
+                    count_changes[get_counter_key(task)] -= 1
+                    count_changes[(values["project_id"], values["status"])] += 1
+                    for name, value in values.items():
+                        setattr(task, name, value)
+                    # bulk_update() does not apply auto_now.
+                    task.updated_at = now
+                    to_update.append(task)
+
+            # Bulk writes do not call save(), which stamps the change sequence number.
+            written = to_create + to_update
+            if written:
+                for task, change_seq in zip(written, ChangeSequence.allocate(Task, len(written))):
+                    task.change_seq = change_seq
+            Task.objects.bulk_create(to_create, batch_size=BULK_WRITE_BATCH_SIZE)
+            Task.objects.bulk_update(
+                to_update,
+                ["project", "assigned_to", "title", "description", "due_date", "status", "updated_at", "change_seq"],
+                batch_size=BULK_WRITE_BATCH_SIZE,
+            )
+            # Bulk writes do not send model signals.
+            apply_task_count_changes(count_changes)
+            if to_create or to_update:
+                bump_generation(Task)
+
+        return BulkTaskResult(created=len(to_create), updated=len(to_update), errors=errors)
@@ -0,0 +1,86 @@
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from core.cache import bump_generation
+from .counters import apply_task_count_changes, get_counter_key, get_loaded_counter_key
+from .models import ChangeSequence, Project, Task, Team, Tombstone
+from .search import PROJECT_SEARCH_INDEX, TASK_SEARCH_INDEX
+from .serializers import UserSerializer
+
+# Fields cached responses show of models they only partly serialize. Saves limited to
+# other fields, e.g. `update_last_login()` on every login, keep the cached responses.
+SERIALIZED_FIELDS = {
+    User: {"id", *UserSerializer._declared_fields},
+}
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_model_generation(sender, update_fields=None, **kwargs):
+    serialized_fields = SERIALIZED_FIELDS.get(sender)
+    if update_fields and serialized_fields is not None and serialized_fields.isdisjoint(update_fields):
+        return
+    bump_generation(sender)
+
+
+@receiver(m2m_changed, sender=Team.members.through)
+def bump_team_members_generation(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_generation(Team)
+
+
+@receiver(post_migrate)
+def install_search_triggers(sender, using, **kwargs):
+    # SQLite drops a table's triggers when a migration rebuilds it.
+    if sender.name == "project_manager":
+        for index in (TASK_SEARCH_INDEX, PROJECT_SEARCH_INDEX):
+            index.install_triggers(using)
+
+
+@receiver(pre_save, sender=Task)
+def remember_task_counter_key(sender, instance, raw, using, **kwargs):
+    if raw or instance.pk is None:
+        return
+    # Tasks not read from the database, or with project/status deferred, cost one query.
+    instance._saved_counter_key = get_loaded_counter_key(instance) or (
+        Task.objects.using(using).filter(pk=instance.pk).values_list("project_id", "status").first()
+    )
+
+
+@receiver(post_save, sender=Task)
+def update_task_counters_on_save(sender, instance, created, raw, using, **kwargs):
+    if raw:
+        return
+    current = get_counter_key(instance)
+    if None in current:
+        current = Task.objects.using(using).filter(pk=instance.pk).values_list("project_id", "status").get()
+    changes = Counter({current: 1})
+    previous = instance.__dict__.pop("_saved_counter_key", None)
+    if previous is not None and not created:
+        changes[previous] -= 1
+    apply_task_count_changes(changes, using=using)
+    instance._loaded_counter_key = current
+
+
+@receiver(post_delete, sender=Task)
+def update_task_counters_on_delete(sender, instance, using, **kwargs):
+    apply_task_count_changes(Counter({get_loaded_counter_key(instance) or get_counter_key(instance): -1}), using=using)
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Task)
+def record_tombstone(sender, instance, using, **kwargs):
+    Tombstone.objects.using(using).create(
+        model=sender._meta.label_lower,
+        object_id=instance.pk,
+        change_seq=ChangeSequence.allocate(sender, using=using).start,
+    )
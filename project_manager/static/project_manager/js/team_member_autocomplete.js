@@ -0,0 +1,31 @@
+'use strict';
+{
+    const $ = django.jQuery;
+
+    // Like admin/js/autocomplete.js, but sends the selected project so only
+    // members of its team are offered.
+    $.fn.teamMemberSelect2 = function() {
+        $.each(this, function(i, element) {
+            const project = document.getElementById(element.dataset.projectField);
+            $(element).select2({
+                ajax: {
+                    data: (params) => {
+                        return {
+                            term: params.term,
+                            page: params.page,
+                            project: project ? project.value : ''
+                        };
+                    }
+                }
+            });
+            if (project) {
+                $(project).on('change', () => $(element).val(null).trigger('change'));
+            }
+        });
+        return this;
+    };
+
+    $(function() {
+        $('.team-member-autocomplete').teamMemberSelect2();
+    });
+}
@@ -1,3 +1,1385 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import io
+import itertools
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import ProtectedError
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import serializers
+
+from core.api.pagination import MAX_PAGE_SIZE, encode_cursor
+from core.api.querysets import get_query_plan, optimize_queryset
+from core.api.serializers import BaseOutputSerializer, CompiledListSerializer
+from core.models import CacheGeneration
+from .admin import EstimatedCountPaginator
+from .management.commands.benchmark_endpoints import iter_pattern_names
+from .models import Project, Task, Team
+from .search import TASK_SEARCH_INDEX
+from .seeding import SeedSize, Seeder
+from .serializers import ProjectSerializer, TaskSerializer
+from .membership import team_membership_index
+from .urls import urlpatterns
+from .views import MAX_SEARCH_LIMIT, TaskListAPIView
+from .services import TASK_ORDERINGS, TasksWriteService
+
+
+class TeamSerializer(BaseOutputSerializer):
+    name = serializers.CharField()
+
+
+class TaskQueryPlanTests(TestCase):
+    def test_nested_serializers_are_joined(self):
+        plan = get_query_plan(TaskSerializer(), Task)
+
+        self.assertEqual(plan.select_related, ("project", "assigned_to"))
+        self.assertIn("project__name", plan.only)
+        self.assertIn("assigned_to__email", plan.only)
+        self.assertNotIn("assigned_to__password", plan.only)
+
+
+class CompiledSerializerParityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        team = Team.objects.create(name="Platform")
+        project = Project.objects.create(
+            name="Ünïcode ✓",
+            description="",
+            start_date="2025-01-01",
+            end_date="2025-02-01",
+            status="active",
+            team=team,
+        )
+        user = User.objects.create(username="empty", email="")
+        Task.objects.create(
+            project=project,
+            title="",
+            description="Line\nbreak",
+            assigned_to=user,
+            due_date="2025-01-15",
+            status="done",
+        )
+
+    def assertParity(self, serializer_class, queryset):
+        expected = serializers.ListSerializer(child=serializer_class()).to_representation(queryset)
+
+        self.assertIsNotNone(serializer_class().get_compiled(queryset.model))
+        self.assertEqual(serializer_class(many=True).to_representation(queryset), expected)
+
+    def test_task_serializer(self):
+        self.assertParity(TaskSerializer, Task.objects.all())
+
+    def test_project_serializer(self):
+        self.assertParity(ProjectSerializer, Project.objects.all())
+
+    def test_optimized_queryset(self):
+        self.assertParity(TaskSerializer, optimize_queryset(Task.objects.all(), TaskSerializer()))
+
+    def test_nested_null_relation(self):
+        class ProjectTeamSerializer(BaseOutputSerializer):
+            name = serializers.CharField()
+            team = TeamSerializer()
+
+            class Meta:
+                list_serializer_class = CompiledListSerializer
+
+        Project.objects.filter(pk=Project.objects.first().pk).update(team=None)
+
+        self.assertParity(ProjectTeamSerializer, Project.objects.all())
+
+    def test_dotted_source(self):
+        class TaskProjectNameSerializer(BaseOutputSerializer):
+            project_name = serializers.CharField(source="project.name")
+            username = serializers.CharField(source="assigned_to.username")
+
+            class Meta:
+                list_serializer_class = CompiledListSerializer
+
+        self.assertParity(TaskProjectNameSerializer, Task.objects.all())
+
+    def test_uncompilable_serializer_falls_back(self):
+        class MethodSerializer(BaseOutputSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta:
+                list_serializer_class = CompiledListSerializer
+
+            def get_label(self, obj):
+                return str(obj)
+
+        self.assertIsNone(MethodSerializer().get_compiled(Task))
+        self.assertEqual(
+            MethodSerializer(many=True).to_representation(Task.objects.all()),
+            [{"label": str(task)} for task in Task.objects.all()],
+        )
+
+
+class TaskListAPIViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @classmethod
+    def setUpTestData(cls):
+        project = Project.objects.first()
+        user = User.objects.first()
+        for index in range(10):
+            Task.objects.create(
+                project=project,
+                title=f"Task {index}",
+                description="",
+                assigned_to=user,
+                due_date=project.end_date,
+                status="pending",
+            )
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        # One query for the cache generations, one for the page boundaries, one for the page rows.
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("tasks_list"), {"page_size": 1000})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["items"]), Task.objects.count())
+        self.assertIsNone(response.json()["count"])
+
+    def test_count_is_optional(self):
+        response = self.client.get(reverse("tasks_list"), {"count": "true"})
+
+        self.assertEqual(response.json()["count"], Task.objects.count())
+
+    def test_cursors_walk_every_task_once(self):
+        for ordering in ("id", "due_date"):
+            with self.subTest(ordering=ordering):
+                titles = []
+                pages = []
+                params = {"page_size": 4, "ordering": ordering}
+                response = self.client.get(reverse("tasks_list"), params)
+                while True:
+                    body = response.json()
+                    pages.append(body)
+                    titles.extend(item["title"] for item in body["items"])
+                    if body["next"] is None:
+                        break
+                    response = self.client.get(reverse("tasks_list"), {**params, "cursor": body["next"]})
+
+                expected = Task.objects.order_by(*TASK_ORDERINGS[ordering]).values_list("title", flat=True)
+                self.assertEqual(titles, list(expected))
+                self.assertIsNone(pages[0]["previous"])
+
+                previous = self.client.get(reverse("tasks_list"), {**params, "cursor": pages[-1]["previous"]})
+                self.assertEqual(previous.json()["items"], pages[-2]["items"])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse("tasks_list"), {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_crafted_cursor_keys_are_rejected(self):
+        for ordering, key in (
+            (["id"], [10**30]),
+            (["due_date", "id"], ["2025-01-01", None]),
+            (["id"], [[1]]),
+            (["id"], [True]),
+        ):
+            with self.subTest(key=key):
+                cursor = encode_cursor("n", ordering, key)
+
+                response = self.client.get(reverse("tasks_list"), {"cursor": cursor, "ordering": ordering[0]})
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"cursor": ["Invalid cursor."]})
+
+    def test_stream_matches_list_items(self):
+        items = self.client.get(reverse("tasks_list"), {"page_size": 1000}).json()["items"]
+
+        response = self.client.get(reverse("tasks_list"), {"stream": "json"})
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), items)
+
+        response = self.client.get(reverse("tasks_list"), {"stream": "ndjson"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], items)
+
+    def test_sparse_fieldset(self):
+        task = Task.objects.order_by("id").first()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("tasks_list"), {"fields": "title,project", "expand": ""})
+
+        self.assertEqual(response.json()["items"][0], {"project": task.project_id, "title": task.title})
+        page_query = queries.captured_queries[-1]["sql"]
+        self.assertNotIn("JOIN", page_query)
+        self.assertNotIn("description", page_query)
+
+    def test_expand_one_relation(self):
+        task = Task.objects.order_by("id").first()
+        item = self.client.get(reverse("tasks_list"), {"expand": "project"}).json()["items"][0]
+
+        self.assertEqual(item["project"]["name"], task.project.name)
+        self.assertEqual(item["assigned_to"], task.assigned_to_id)
+        self.assertEqual(item["title"], task.title)
+
+    def test_sparse_fieldset_parity(self):
+        queryset = Task.objects.order_by("id")
+        for fields, expand in ((("title", "project"), ()), (None, ("assigned_to",)), (("status",), None)):
+            with self.subTest(fields=fields, expand=expand):
+                serializer = TaskListAPIView.TaskListOutputSerializer.get_item_serializer(fields, expand)
+                expected = [serializer.to_representation(task) for task in queryset]
+
+                self.assertIsNotNone(serializer.get_compiled(Task))
+                self.assertEqual(serializer.get_compiled(Task).serialize(queryset), expected)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse("tasks_list"), {"fields": "title,secret", "expand": "title"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {"fields", "expand"})
+
+
+class ListResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def assertCacheStatus(self, params, status):
+        response = self.client.get(reverse("tasks_list"), params)
+        self.assertEqual(response["X-Cache"], status)
+        return response
+
+    def test_hit_until_a_dependency_changes(self):
+        self.assertCacheStatus({}, "MISS")
+        self.assertCacheStatus({}, "HIT")
+        self.assertCacheStatus({"page_size": 5}, "MISS")
+
+        project = Project.objects.first()
+        project.name = "Renamed"
+        project.save()
+
+        response = self.assertCacheStatus({}, "MISS")
+        self.assertIn("Renamed", {item["project"]["name"] for item in response.json()["items"]})
+
+    def test_login_keeps_cached_responses(self):
+        user = User.objects.first()
+        self.assertCacheStatus({}, "MISS")
+
+        self.client.force_login(user)
+        self.assertCacheStatus({}, "HIT")
+
+        user.first_name = "Renamed"
+        user.save(update_fields=["first_name"])
+        self.assertCacheStatus({}, "MISS")
+
+    def test_team_membership_change_invalidates(self):
+        self.assertCacheStatus({}, "MISS")
+
+        Team.objects.create(name="Platform").members.add(User.objects.first())
+
+        self.assertCacheStatus({}, "MISS")
+
+    def test_stats(self):
+        TaskListAPIView.response_cache.reset_stats()
+
+        self.assertCacheStatus({}, "MISS")
+        self.assertCacheStatus({}, "HIT")
+        self.assertCacheStatus({}, "HIT")
+
+        stats = TaskListAPIView.response_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+    def test_file_based_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            file_cache = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location}}
+            with override_settings(CACHES=file_cache):
+                self.assertCacheStatus({}, "MISS")
+                self.assertCacheStatus({}, "HIT")
+                Task.objects.first().save()
+                self.assertCacheStatus({}, "MISS")
+
+
+class ConditionalListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_if_none_match(self):
+        response = self.client.get(reverse("tasks_list"))
+        etag = response["ETag"]
+
+        # The cache generations, one primary key lookup.
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("tasks_list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(reverse("tasks_list"), {"page_size": 5}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_changes_on_write_and_delete(self):
+        etag = self.client.get(reverse("projects_list"))["ETag"]
+
+        Project.objects.first().save()
+        response = self.client.get(reverse("projects_list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        project = Project.objects.last()
+        project.tasks.all().delete()
+        project.delete()
+        response = self.client.get(reverse("projects_list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_changes_on_task_delete_and_user_rename(self):
+        etag = self.client.get(reverse("tasks_list"))["ETag"]
+
+        Task.objects.first().delete()
+        response = self.client.get(reverse("tasks_list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        user = User.objects.first()
+        user.username = "renamed"
+        user.save()
+        response = self.client.get(reverse("tasks_list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_is_shared_by_processes(self):
+        etag = self.client.get(reverse("tasks_list"))["ETag"]
+
+        # Another worker has an empty local-memory cache but reads the same generations.
+        cache.clear()
+        response = self.client.get(reverse("tasks_list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # A write made by another worker.
+        CacheGeneration.objects.update_or_create(name="project_manager.task", defaults={"value": 1})
+        response = self.client.get(reverse("tasks_list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since_is_ignored(self):
+        response = self.client.get(reverse("tasks_list"))
+        self.assertNotIn("Last-Modified", response)
+
+        response = self.client.get(reverse("tasks_list"), HTTP_IF_MODIFIED_SINCE="Sat, 01 Jan 2100 00:00:00 GMT")
+
+        self.assertEqual(response.status_code, 200)
+
+
+class ListFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.team = Team.objects.create(name="Platform")
+        cls.project = Project.objects.first()
+        cls.project.team = cls.team
+        cls.project.save()
+        cls.user = User.objects.first()
+
+    def get_task_filter_groups(self):
+        return {
+            "status": {"status": "pending"},
+            "due_date": {"due_date_after": "2000-01-01", "due_date_before": "2100-01-01"},
+            "assigned_to": {"assigned_to": self.user.pk},
+            "project": {"project": self.project.pk},
+            "team": {"team": self.team.pk},
+        }
+
+    def get_project_filter_groups(self):
+        return {
+            "status": {"status": "active"},
+            "team": {"team": self.team.pk},
+            "start_date": {"start_date_after": "2000-01-01", "start_date_before": "2100-01-01"},
+        }
+
+    def iter_combinations(self, groups):
+        for size in range(1, len(groups) + 1):
+            for names in itertools.combinations(groups, size):
+                params = {}
+                for name in names:
+                    params.update(groups[name])
+                yield names, params
+
+    def assertIndexedQueries(self, url_name, params):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, 200)
+
+        for query in queries.captured_queries:
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                plan = [row[-1] for row in cursor.fetchall()]
+            full_scans = [step for step in plan if re.fullmatch(r"SCAN \S+", step)]
+            self.assertEqual(full_scans, [], f"{query['sql']}\n{plan}")
+        return response
+
+    def test_task_filters_use_indexes(self):
+        for ordering in TASK_ORDERINGS:
+            for names, params in self.iter_combinations(self.get_task_filter_groups()):
+                with self.subTest(ordering=ordering, filters=names):
+                    self.assertIndexedQueries("tasks_list", {**params, "ordering": ordering, "page_size": 1000})
+
+    def test_project_filters_use_indexes(self):
+        for names, params in self.iter_combinations(self.get_project_filter_groups()):
+            with self.subTest(filters=names):
+                self.assertIndexedQueries("projects_list", params)
+
+    def test_out_of_range_ids_are_rejected(self):
+        self.client.force_login(self.user)
+        for url_name, name in (
+            ("projects_list", "team"),
+            ("tasks_list", "assigned_to"),
+            ("tasks_list", "project"),
+            ("tasks_export", "team"),
+        ):
+            for value in (10**30, 0):
+                with self.subTest(url_name=url_name, name=name, value=value):
+                    response = self.client.get(reverse(url_name), {name: value})
+
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn(name, response.json())
+
+    def test_task_filters(self):
+        response = self.assertIndexedQueries("tasks_list", {"team": self.team.pk, "status": "done", "page_size": 1000})
+
+        expected = Task.objects.filter(project__team=self.team, status="done").order_by("id")
+        self.assertEqual(
+            [item["title"] for item in response.json()["items"]],
+            list(expected.values_list("title", flat=True)),
+        )
+
+    def test_project_filters(self):
+        response = self.assertIndexedQueries("projects_list", {"team": self.team.pk})
+
+        self.assertEqual([item["name"] for item in response.json()["items"]], [self.project.name])
+
+
+class TaskBulkAPIViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="importer")
+        cls.project = Project.objects.first()
+        cls.user = User.objects.first()
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def build_row(self, **values):
+        return {
+            "project": self.project.pk,
+            "assigned_to": self.user.pk,
+            "title": "Imported",
+            "description": "",
+            "due_date": "2030-01-01",
+            "status": "pending",
+            **values,
+        }
+
+    def post(self, rows):
+        return self.client.post(reverse("tasks_bulk"), {"tasks": rows}, content_type="application/json")
+
+    def test_create_and_update_with_constant_queries(self):
+        task = Task.objects.first()
+        rows = [self.build_row(title=f"Imported {index}") for index in range(50)]
+        rows.append(self.build_row(id=task.pk, title="Updated"))
+
+        # Session, user, projects, users, updated tasks, team generation, then the transaction's writes, change
+        # sequence, counters and the task generation, whose row is created here.
+        with self.assertNumQueries(18):
+            response = self.post(rows)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"created": 50, "updated": 1, "errors": []})
+        self.assertEqual(Task.objects.filter(title__startswith="Imported ").count(), 50)
+        task.refresh_from_db()
+        self.assertEqual(task.title, "Updated")
+
+    def test_errors_are_reported_per_row(self):
+        rows = [
+            self.build_row(),
+            self.build_row(project=0),
+            self.build_row(status="unknown"),
+            self.build_row(id=0),
+        ]
+
+        response = self.post(rows)
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["created"], 1)
+        self.assertEqual([(error["index"], list(error["errors"])) for error in body["errors"]], [
+            (1, ["project"]),
+            (2, ["status"]),
+            (3, ["id"]),
+        ])
+
+    def test_repeated_ids_are_rejected(self):
+        task = Task.objects.first()
+        rows = [
+            self.build_row(id=task.pk, title="First"),
+            self.build_row(id=task.pk, title="Second"),
+            self.build_row(id=10**30),
+        ]
+
+        body = self.post(rows).json()
+
+        self.assertEqual(body["updated"], 0)
+        self.assertEqual([(error["index"], list(error["errors"])) for error in body["errors"]], [
+            (0, ["id"]),
+            (1, ["id"]),
+            (2, ["id"]),
+        ])
+        task.refresh_from_db()
+        self.assertNotIn(task.title, ("First", "Second"))
+
+    def test_requires_authentication(self):
+        self.client.logout()
+
+        self.assertEqual(self.post([self.build_row()]).status_code, 403)
+
+
+class TeamMembershipIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member, cls.outsider = User.objects.all()[:2]
+        cls.team = Team.objects.create(name="Platform")
+        cls.team.members.add(cls.member)
+        cls.project = Project.objects.first()
+        cls.project.team = cls.team
+        cls.project.save()
+
+    def setUp(self):
+        cache.clear()
+        team_membership_index.clear()
+
+    def test_lookups_are_served_from_memory(self):
+        # The team generation, then the members.
+        with self.assertNumQueries(2):
+            self.assertTrue(team_membership_index.is_member(self.team.pk, self.member.pk))
+        with self.assertNumQueries(1):
+            self.assertFalse(team_membership_index.is_member(self.team.pk, self.outsider.pk))
+
+    def test_other_processes_are_served_from_the_cache(self):
+        team_membership_index.is_member(self.team.pk, self.member.pk)
+        team_membership_index.clear()
+
+        # Only the team generation.
+        with self.assertNumQueries(1):
+            self.assertTrue(team_membership_index.is_member(self.team.pk, self.member.pk))
+
+    def test_membership_changes_invalidate(self):
+        self.assertFalse(team_membership_index.is_member(self.team.pk, self.outsider.pk))
+
+        self.team.members.add(self.outsider)
+        self.assertTrue(team_membership_index.is_member(self.team.pk, self.outsider.pk))
+
+        self.outsider.team_set.remove(self.team)
+        self.assertFalse(team_membership_index.is_member(self.team.pk, self.outsider.pk))
+
+    def test_task_clean(self):
+        task = Task(project=self.project, assigned_to=self.outsider, title="t", description="d", due_date="2030-01-01", status="pending")
+
+        with self.assertRaises(ValidationError):
+            task.full_clean()
+
+        task.assigned_to = self.member
+        task.full_clean()
+
+    def test_bulk_import_validates_membership_in_constant_queries(self):
+        staff = User.objects.create_user(username="importer")
+        self.client.force_login(staff)
+        rows = [
+            {
+                "project": self.project.pk,
+                "assigned_to": (self.member if index % 2 else self.outsider).pk,
+                "title": f"Imported {index}",
+                "description": "",
+                "due_date": "2030-01-01",
+                "status": "pending",
+            }
+            for index in range(200)
+        ]
+
+        # Session, user, projects, users, team generation, team members, then the change sequence, one insert,
+        # one counter update and the task generation, whose row is created here, in a savepoint.
+        with self.assertNumQueries(17):
+            response = self.client.post(reverse("tasks_bulk"), {"tasks": rows}, content_type="application/json")
+
+        body = response.json()
+        self.assertEqual(body["created"], 100)
+        self.assertEqual({error["index"] % 2 for error in body["errors"]}, {0})
+
+
+class TaskAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(username="admin", password="secret")
+        cls.team = Team.objects.create(name="Platform")
+        cls.team.members.add(*User.objects.filter(username__in=["jsmith", "agarcia"]))
+        cls.project = Project.objects.first()
+        cls.project.team = cls.team
+        cls.project.save()
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def autocomplete(self, **params):
+        response = self.client.get(reverse("admin:project_manager_task_assignee_autocomplete"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_autocomplete_offers_team_members(self):
+        body = self.autocomplete(project=self.project.pk)
+
+        self.assertEqual([result["text"] for result in body["results"]], ["agarcia", "jsmith"])
+
+    def test_autocomplete_prefix_search(self):
+        body = self.autocomplete(project=self.project.pk, term="js")
+
+        self.assertEqual([result["text"] for result in body["results"]], ["jsmith"])
+
+    def test_autocomplete_without_team_is_paginated(self):
+        User.objects.bulk_create(User(username=f"bulk{index:03}") for index in range(30))
+
+        first = self.autocomplete(term="bulk")
+        second = self.autocomplete(term="bulk", page=2)
+
+        self.assertEqual(len(first["results"]), 20)
+        self.assertTrue(first["pagination"]["more"])
+        self.assertEqual(len(second["results"]), 10)
+        self.assertFalse(second["pagination"]["more"])
+
+    def test_autocomplete_ignores_out_of_range_numbers(self):
+        for params in ({"project": 10**30}, {"page": 10**30}, {"project": "²", "page": "²"}):
+            with self.subTest(params=params):
+                self.assertIn("results", self.autocomplete(**params))
+
+    def test_autocomplete_requires_staff(self):
+        self.client.logout()
+
+        response = self.client.get(reverse("admin:project_manager_task_assignee_autocomplete"))
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_forms_do_not_list_every_user(self):
+        task = Task.objects.filter(project=self.project).first()
+        other_usernames = User.objects.exclude(pk=task.assigned_to_id).values_list("username", flat=True)
+
+        response = self.client.get(reverse("admin:project_manager_task_change", args=[task.pk]))
+
+        self.assertContains(response, "team-member-autocomplete")
+        for username in other_usernames:
+            self.assertNotContains(response, f">{username}</option>")
+
+    def test_changelist_assignee_filter(self):
+        response = self.client.get(reverse("admin:project_manager_task_changelist"), {"assignee": "jsmith"})
+
+        self.assertEqual(
+            {task.assigned_to.username for task in response.context["cl"].result_list},
+            {"jsmith"} if Task.objects.filter(assigned_to__username="jsmith").exists() else set(),
+        )
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        url = reverse("admin:project_manager_task_changelist")
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(url)
+        Task.objects.bulk_create(
+            Task(
+                project=self.project,
+                title=f"Bulk {index}",
+                description="d",
+                assigned_to=self.admin_user,
+                due_date="2025-01-01",
+                status="pending",
+            )
+            for index in range(150)
+        )
+
+        with CaptureQueriesContext(connection) as after:
+            response = self.client.get(url)
+
+        self.assertEqual(len(after), len(before))
+        self.assertFalse(any("COUNT" in query["sql"] and "LIMIT" not in query["sql"] for query in after))
+        self.assertFalse(response.context["cl"].show_full_result_count)
+
+    def test_changelist_search_uses_prefix_index(self):
+        Team.objects.create(name="Platform Ops")
+        Team.objects.create(name="Design")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("admin:project_manager_team_changelist"), {"q": "PLAT"})
+
+        self.assertEqual(
+            sorted(team.name for team in response.context["cl"].result_list), ["Platform", "Platform Ops"]
+        )
+        (search,) = [query["sql"] for query in queries if "LOWER" in query["sql"] and "LIMIT 100" in query["sql"]]
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {search}")
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("team_name_lower_idx", plan)
+
+    def test_changelist_search_uses_full_text_index(self):
+        task = Task.objects.first()
+        Task.objects.filter(pk=task.pk).update(description="Migrate the billing service to Kubernetes")
+
+        response = self.client.get(reverse("admin:project_manager_task_changelist"), {"q": "kubern"})
+
+        self.assertEqual(list(response.context["cl"].result_list), [task])
+
+    def test_estimated_count_is_capped(self):
+        with mock.patch("project_manager.admin.EXACT_COUNT_LIMIT", 3):
+            paginator = EstimatedCountPaginator(Task.objects.filter(status__in=["pending", "done"]).order_by("id"), 100)
+
+            self.assertEqual(paginator.count, min(Task.objects.count(), 4))
+
+
+class TaskSearchAPIViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.first()
+        cls.project = Project.objects.first()
+
+    def setUp(self):
+        cache.clear()
+
+    def create_task(self, title, description="d"):
+        return Task.objects.create(
+            project=self.project,
+            title=title,
+            description=description,
+            assigned_to=self.user,
+            due_date="2025-01-01",
+            status="pending",
+        )
+
+    def search(self, **params):
+        return self.client.get(reverse("tasks_search"), params)
+
+    def titles(self, **params):
+        response = self.search(**params)
+        self.assertEqual(response.status_code, 200)
+        return [item["title"] for item in response.json()["items"]]
+
+    def test_results_are_ranked(self):
+        self.create_task("Quarterly report", "Collect numbers")
+        self.create_task("Cleanup", "Mention the quarterly report once")
+
+        self.assertEqual(self.titles(q="quarterly report"), ["Quarterly report", "Cleanup"])
+
+    def test_query_count_does_not_depend_on_matches(self):
+        for index in range(30):
+            self.create_task(f"Invoice {index}")
+
+        # The cache generations, the matching ids, then the rows.
+        with self.assertNumQueries(3):
+            titles = self.titles(q="invoice", limit=10)
+
+        self.assertEqual(len(titles), 10)
+
+    def test_index_follows_writes(self):
+        task = self.create_task("Draft roadmap")
+        self.assertEqual(self.titles(q="roadmap"), ["Draft roadmap"])
+
+        task.title = "Final plan"
+        task.save()
+        cache.clear()
+        self.assertEqual(self.titles(q="roadmap"), [])
+        self.assertEqual(self.titles(q="final"), ["Final plan"])
+
+        task.title = "Bulk renamed"
+        Task.objects.bulk_update([task], ["title"])
+        task.delete()
+        cache.clear()
+        self.assertEqual(self.titles(q="bulk"), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.create_task("Fix OR NOT AND")
+
+        self.assertEqual(self.titles(q='"fix" OR (not:'), ["Fix OR NOT AND"])
+        self.assertEqual(self.titles(q="***"), [])
+
+    def test_q_is_required(self):
+        self.assertEqual(self.search().status_code, 400)
+
+
+class ProjectTaskCountersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.first()
+        cls.project, cls.other_project = Project.objects.all()[:2]
+
+    def setUp(self):
+        cache.clear()
+
+    def assertCountersMatchTasks(self):
+        for project in Project.objects.all():
+            with self.subTest(project=project.pk):
+                self.assertEqual(project.pending_task_count, project.tasks.filter(status="pending").count())
+                self.assertEqual(project.done_task_count, project.tasks.filter(status="done").count())
+
+    def test_migration_filled_counters(self):
+        self.assertCountersMatchTasks()
+
+    def test_task_writes_update_counters(self):
+        task = Task.objects.create(
+            project=self.project,
+            title="Counted",
+            description="d",
+            assigned_to=self.user,
+            due_date="2025-01-01",
+            status="pending",
+        )
+        self.assertCountersMatchTasks()
+
+        task.status = "done"
+        task.save()
+        self.assertCountersMatchTasks()
+
+        task = Task.objects.only("id", "title").get(pk=task.pk)
+        task.project = self.other_project
+        task.save()
+        self.assertCountersMatchTasks()
+
+        Task.objects.get(pk=task.pk).delete()
+        self.assertCountersMatchTasks()
+
+    def test_bulk_upsert_updates_counters(self):
+        client = self.client
+        client.force_login(self.user)
+        task = Task.objects.filter(project=self.project).first()
+        row = {
+            "project": self.other_project.pk,
+            "assigned_to": self.user.pk,
+            "title": "Bulk",
+            "description": "",
+            "due_date": "2030-01-01",
+            "status": "done",
+        }
+
+        response = client.post(
+            reverse("tasks_bulk"), {"tasks": [row, {**row, "id": task.pk}]}, content_type="application/json"
+        )
+
+        self.assertEqual(response.json()["errors"], [])
+        self.assertCountersMatchTasks()
+
+    def test_bulk_upsert_counts_from_status_read_in_its_transaction(self):
+        task = Task.objects.filter(project=self.project, status="pending").first()
+        atomic = transaction.atomic
+        interleaved = []
+
+        def atomic_after_concurrent_write(*args, **kwargs):
+            # Another request marks the task done just before the bulk write starts.
+            if not interleaved:
+                interleaved.append(True)
+                concurrent = Task.objects.get(pk=task.pk)
+                concurrent.status = "done"
+                concurrent.save()
+            return atomic(*args, **kwargs)
+
+        row = {
+            "id": task.pk,
+            "project": self.project.pk,
+            "assigned_to": task.assigned_to_id,
+            "title": task.title,
+            "description": task.description,
+            "due_date": task.due_date,
+            "status": "pending",
+        }
+        with mock.patch.object(transaction, "atomic", atomic_after_concurrent_write):
+            result = TasksWriteService().bulk_upsert([(0, row)])
+
+        self.assertEqual(result.updated, 1)
+        self.assertCountersMatchTasks()
+
+    def test_rebuild_command_repairs_counters(self):
+        Project.objects.update(pending_task_count=99, done_task_count=99)
+
+        call_command("rebuild_task_counts", stdout=io.StringIO())
+
+        self.assertCountersMatchTasks()
+
+
+class ProjectStatsAPIViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.team = Team.objects.create(name="Platform")
+        cls.project = Project.objects.first()
+        cls.project.team = cls.team
+        cls.project.save()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_project_and_team_stats(self):
+        today = timezone.localdate()
+        tasks = self.project.tasks.all()
+        overdue = tasks.filter(status="pending", due_date__lt=today).count()
+
+        # Cache generations, page boundaries, page projects, page overdue counts, team totals, team overdue counts.
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse("projects_stats"), {"page_size": 1000})
+
+        body = response.json()
+        project_stats = next(item for item in body["items"] if item["id"] == self.project.pk)
+        self.assertEqual(
+            project_stats,
+            {
+                "id": self.project.pk,
+                "name": self.project.name,
+                "team": self.team.pk,
+                "pending": tasks.filter(status="pending").count(),
+                "done": tasks.filter(status="done").count(),
+                "overdue": overdue,
+            },
+        )
+        self.assertEqual(len(body["items"]), Project.objects.count())
+        self.assertEqual(
+            body["teams"],
+            [
+                {
+                    "id": self.team.pk,
+                    "name": "Platform",
+                    "projects": 1,
+                    "pending": project_stats["pending"],
+                    "done": project_stats["done"],
+                    "overdue": overdue,
+                }
+            ],
+        )
+
+    def test_team_filter(self):
+        response = self.client.get(reverse("projects_stats"), {"team": self.team.pk})
+
+        self.assertEqual([item["id"] for item in response.json()["items"]], [self.project.pk])
+
+    def test_out_of_range_team_is_rejected(self):
+        response = self.client.get(reverse("projects_stats"), {"team": 10**30})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("team", response.json())
+
+
+class AsyncListViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        project = Project.objects.first()
+        user = User.objects.first()
+        Task.objects.bulk_create(
+            Task(
+                project=project,
+                title=f"Async {index}",
+                description="d",
+                assigned_to=user,
+                due_date="2025-01-01",
+                status="pending",
+            )
+            for index in range(15)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_pages_match_sync_views(self):
+        for name in ("projects_list", "tasks_list"):
+            with self.subTest(name=name):
+                params = {"page_size": 2, "count": "true"}
+                expected = (await sync_to_async(self.client.get)(reverse(name), params)).json()
+                cache.clear()
+
+                response = await self.async_client.get(reverse(f"async_{name}"), params)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response["X-Cache"], "MISS")
+                self.assertEqual(response.json(), expected)
+                next_page = await self.async_client.get(reverse(f"async_{name}"), {"cursor": expected["next"]})
+                self.assertEqual(next_page.status_code, 200)
+
+    async def test_stream(self):
+        response = await self.async_client.get(reverse("async_tasks_list"), {"stream": "ndjson"})
+
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(body.splitlines()), await Task.objects.acount())
+
+    async def test_conditional_get(self):
+        response = await self.async_client.get(reverse("async_tasks_list"))
+
+        not_modified = await self.async_client.get(
+            reverse("async_tasks_list"), headers={"If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    async def test_invalid_input(self):
+        response = await self.async_client.get(reverse("async_tasks_list"), {"cursor": "nope"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"cursor": ["Invalid cursor."]})
+
+    async def test_requests_run_concurrently(self):
+        barrier = asyncio.Barrier(2)
+
+        async def aget_or_set_once_both_started(input_data, aget_data):
+            # Each request waits for the other. With a sync only middleware Django serves
+            # them one after another, and the first one times out.
+            await asyncio.wait_for(barrier.wait(), timeout=5)
+            return {}, True
+
+        with mock.patch.object(TaskListAPIView.response_cache, "aget_or_set", aget_or_set_once_both_started):
+            responses = await asyncio.gather(
+                *(self.async_client.get(reverse("async_tasks_list"), {"page_size": size}) for size in (1, 2))
+            )
+
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+
+
+class ChangesAPIViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.first()
+        cls.project = Project.objects.first()
+
+    def sync(self, name, since):
+        items = []
+        deleted = []
+        while True:
+            body = self.client.get(reverse(name), {"since": since, "limit": 3}).json()
+            items.extend(body["items"])
+            deleted.extend(body["deleted"])
+            since = body["next"]
+            if not body["has_more"]:
+                return items, deleted, since
+
+    def test_initial_sync_returns_every_row(self):
+        items, deleted, _ = self.sync("tasks_changes", 0)
+
+        self.assertEqual(sorted(item["id"] for item in items), sorted(Task.objects.values_list("id", flat=True)))
+        self.assertEqual(deleted, [])
+
+    def test_changes_since_token(self):
+        _, _, since = self.sync("tasks_changes", 0)
+        task, deleted_task = Task.objects.order_by("id")[:2]
+        deleted_id = deleted_task.pk
+        task.title = "Renamed"
+        task.save(update_fields=["title"])
+        deleted_task.delete()
+        created = Task.objects.create(
+            project=self.project,
+            title="New",
+            description="",
+            assigned_to=self.user,
+            due_date="2030-01-01",
+            status="pending",
+        )
+
+        items, deleted, since = self.sync("tasks_changes", since)
+
+        self.assertEqual([(item["id"], item["title"]) for item in items], [(task.pk, "Renamed"), (created.pk, "New")])
+        self.assertEqual(deleted, [deleted_id])
+        self.assertEqual(since, created.change_seq)
+
+    def test_empty_sync_is_one_query(self):
+        _, _, since = self.sync("projects_changes", 0)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("projects_changes"), {"since": since})
+
+        self.assertEqual(response.json(), {"items": [], "deleted": [], "next": since, "has_more": False})
+
+    def test_out_of_range_token_is_rejected(self):
+        for name in ("projects_changes", "tasks_changes"):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name), {"since": 10**30})
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("since", response.json())
+
+    def test_bulk_writes_are_tracked(self):
+        _, _, since = self.sync("tasks_changes", 0)
+        self.client.force_login(self.user)
+        row = {
+            "project": self.project.pk,
+            "assigned_to": self.user.pk,
+            "title": "Bulk",
+            "description": "",
+            "due_date": "2030-01-01",
+            "status": "done",
+        }
+        self.client.post(reverse("tasks_bulk"), {"tasks": [row, row]}, content_type="application/json")
+
+        items, _, _ = self.sync("tasks_changes", since)
+        self.assertEqual([item["title"] for item in items], ["Bulk", "Bulk"])
+
+
+class TaskExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.first()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_csv_export(self):
+        with self.assertNumQueries(3):
+            # Session, user, then the rows through one cursor.
+            response = self.client.get(reverse("tasks_export"))
+            body = b"".join(response.streaming_content).decode()
+
+        rows = list(csv.DictReader(io.StringIO(body)))
+        task = Task.objects.select_related("project", "assigned_to").order_by("id").first()
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="tasks.csv"')
+        self.assertEqual(len(rows), Task.objects.count())
+        self.assertEqual(rows[0]["project_name"], task.project.name)
+        self.assertEqual(rows[0]["assigned_to_username"], task.assigned_to.username)
+
+    def test_gzip_ndjson_export_with_filters(self):
+        project = Project.objects.first()
+        params = {"output": "ndjson", "gzip": "true", "project": project.pk, "due_date_after": "2000-01-01"}
+        response = self.client.get(reverse("tasks_export"), params)
+
+        lines = gzip.decompress(b"".join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertEqual(
+            sorted(json.loads(line)["id"] for line in lines),
+            sorted(project.tasks.values_list("id", flat=True)),
+        )
+
+    def test_requires_authentication(self):
+        self.client.logout()
+
+        self.assertEqual(self.client.get(reverse("tasks_export")).status_code, 403)
+
+    def test_command_partitions_by_month(self):
+        with tempfile.TemporaryDirectory() as directory:
+            call_command("export_tasks", directory, "--partition-by", "month", "--gzip", stdout=io.StringIO())
+
+            exported = {}
+            for path in Path(directory).iterdir():
+                with gzip.open(path, "rt") as file:
+                    for row in csv.DictReader(file):
+                        self.assertEqual(path.name, f"tasks-{row['due_date'][:7]}.csv.gz")
+                        exported[int(row["id"])] = row
+
+        self.assertEqual(sorted(exported), sorted(Task.objects.values_list("id", flat=True)))
+
+
+class SeederTests(TestCase):
+    def test_seed_scale(self):
+        size = SeedSize.from_scale(3)
+        before = {model: model.objects.count() for model in (User, Team, Project, Task)}
+        task_indexes = connection.introspection.get_constraints(connection.cursor(), Task._meta.db_table)
+
+        with mock.patch("project_manager.seeding.DEFER_INDEXES_MIN_TASKS", 0):
+            Seeder(prefix="seeded-", seed=1).seed(size)
+
+        projects = Project.objects.filter(name__startswith="seeded-")
+        tasks = Task.objects.filter(project__in=projects)
+        self.assertEqual(User.objects.count() - before[User], size.users)
+        self.assertEqual(Team.objects.count() - before[Team], size.teams)
+        self.assertEqual(projects.count(), size.projects)
+        self.assertEqual(tasks.count(), size.tasks)
+        self.assertFalse(tasks.filter(change_seq=0).exists())
+        self.assertEqual(tasks.values("change_seq").distinct().count(), size.tasks)
+        for project in projects:
+            with self.subTest(project=project.pk):
+                self.assertEqual(project.pending_task_count, project.tasks.filter(status="pending").count())
+                self.assertEqual(project.done_task_count, project.tasks.filter(status="done").count())
+                self.assertFalse(project.tasks.exclude(assigned_to__in=project.team.members.all()).exists())
+        # Seeded tasks are searchable and the dropped task indexes are back.
+        task = tasks.first()
+        self.assertIn(task, TASK_SEARCH_INDEX.search(tasks, task.title, 100))
+        self.assertEqual(
+            connection.introspection.get_constraints(connection.cursor(), Task._meta.db_table), task_indexes
+        )
+
+
+class LoadTestingCommandTests(TestCase):
+    def test_generate_dataset_scale(self):
+        size = SeedSize.from_scale(2)
+        before = Task.objects.count()
+
+        call_command("generate_dataset", "--scale", "2", "--prefix", "scaled", stdout=io.StringIO())
+
+        self.assertEqual(Project.objects.filter(name__startswith="scaled-").count(), size.projects)
+        self.assertEqual(Task.objects.count() - before, size.tasks)
+
+    def test_benchmark_save_and_compare(self):
+        options = ["--requests", "1", "--warmup", "0"]
+        with tempfile.TemporaryDirectory() as directory:
+            baseline_path = Path(directory) / "baseline.json"
+            stdout = io.StringIO()
+            call_command("benchmark_endpoints", *options, "--save", baseline_path, stdout=stdout)
+            baseline = json.loads(baseline_path.read_text())
+
+            self.assertNotIn("Skipping", stdout.getvalue())
+            self.assertIn("tasks_export", baseline)
+            self.assertIn("tasks_bulk", baseline)
+
+            baseline["tasks_list"]["queries"] -= 1
+            baseline_path.write_text(json.dumps(baseline))
+            with self.assertRaisesRegex(CommandError, "tasks_list queries"):
+                call_command("benchmark_endpoints", *options, "--compare", baseline_path, stdout=io.StringIO())
+
+
+class ProjectDeleteProtectionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(username="admin", password="secret")
+        cls.team = Team.objects.create(name="Platform")
+        cls.project = Project.objects.first()
+        cls.project.team = cls.team
+        cls.project.save()
+        cls.empty_project = Project.objects.create(
+            name="Empty", description="", start_date="2025-01-01", end_date="2025-02-01", status="active"
+        )
+
+    def test_project_with_tasks_is_protected(self):
+        task_count = self.project.tasks.count()
+
+        with self.assertNumQueries(1), self.assertRaises(ProtectedError):
+            self.project.delete()
+
+        self.assertEqual(self.project.tasks.count(), task_count)
+
+    def test_bulk_delete_is_checked_once(self):
+        projects = Project.objects.filter(pk__in=[self.project.pk, self.empty_project.pk])
+
+        with self.assertRaises(ProtectedError) as raised:
+            projects.delete()
+
+        self.assertEqual(list(raised.exception.protected_objects), [self.project])
+        self.assertEqual(projects.count(), 2)
+
+    def test_project_without_tasks_is_deleted(self):
+        self.empty_project.delete()
+
+        self.assertFalse(Project.objects.filter(pk=self.empty_project.pk).exists())
+
+    def test_team_with_tasks_is_protected(self):
+        with self.assertRaises(ProtectedError):
+            self.team.delete()
+        with self.assertRaises(ProtectedError):
+            Team.objects.filter(pk=self.team.pk).delete()
+
+        self.empty_project.team = self.team
+        self.empty_project.save()
+        self.project.tasks.all().delete()
+        self.team.delete()
+        self.assertFalse(Project.objects.filter(pk__in=[self.project.pk, self.empty_project.pk]).exists())
+
+    def test_admin_delete_selected_reports_protected_projects(self):
+        self.client.force_login(self.admin_user)
+        data = {"action": "delete_selected", "_selected_action": [self.project.pk, self.empty_project.pk]}
+
+        response = self.client.post(reverse("admin:project_manager_project_changelist"), data)
+
+        self.assertContains(response, "Cannot delete")
+        self.assertContains(response, f"{self.project}: {self.project.tasks.count()} tasks")
+        self.assertNotContains(response, "Are you sure?")
+
+    def test_admin_team_delete_reports_protected_projects(self):
+        self.client.force_login(self.admin_user)
+
+        response = self.client.get(reverse("admin:project_manager_team_delete", args=[self.team.pk]))
+
+        self.assertContains(response, f"{self.project}: {self.project.tasks.count()} tasks")
+
+
+QUERY_SNAPSHOT_PATH = Path(__file__).parent / "test_snapshots" / "query_signatures.json"
+# Literals and parameter lists vary with the data, the statements do not.
+SQL_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+SQL_PARAMETER_LIST_RE = re.compile(r"\(\?(?:, \?)*\)")
+
+
+@override_settings(REQUEST_INSTRUMENTATION_SAMPLE_RATE=0.0)
+class EndpointQueryRegressionTests(TestCase):
+    """
+    Request every GET endpoint of `project_manager/urls.py` with 10, 100 and 1000 more
+    projects and tasks, asking for the largest page, and check that the number of
+    queries does not grow with the data and that the statements match the snapshot in
+    `test_snapshots/query_signatures.json`. Rerun with `UPDATE_QUERY_SNAPSHOTS=1` to
+    rewrite the snapshot after an intended change, and commit it with the change.
+    """
+
+    sizes = (10, 100, 1000)
+    params = {
+        "page_size": MAX_PAGE_SIZE,
+        "limit": MAX_PAGE_SIZE,
+    }
+    endpoint_params = {
+        "tasks_search": {"q": "testing", "limit": MAX_SEARCH_LIMIT},
+    }
+
+    def setUp(self):
+        self.client.force_login(User.objects.first())
+
+    def get_signature(self, sql):
+        return SQL_PARAMETER_LIST_RE.sub("(...)", SQL_LITERAL_RE.sub("?", sql))
+
+    def measure(self, name):
+        """
+        Return the status, statements and response size of a cold cache GET of `name`.
+        """
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse(name), self.endpoint_params.get(name, self.params))
+            if response.streaming:
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                size = len(response.content)
+        return response.status_code, [self.get_signature(query["sql"]) for query in captured], size
+
+    def measure_sizes(self):
+        results = {}
+        for size in self.sizes:
+            with transaction.atomic():
+                Seeder(prefix=f"n{size}-", seed=size).seed(
+                    SeedSize(users=size, teams=size // 10, team_size=5, projects=size, tasks=size)
+                )
+                for name in iter_pattern_names(urlpatterns):
+                    status, signatures, size_bytes = self.measure(name)
+                    # POST-only endpoints are covered by their own tests.
+                    if status != 405:
+                        self.assertEqual(status, 200, name)
+                        results.setdefault(name, {})[size] = (signatures, size_bytes)
+                transaction.set_rollback(True)
+        return results
+
+    def test_query_counts_do_not_grow_and_match_the_snapshot(self):
+        results = self.measure_sizes()
+        snapshot = {
+            name: {"queries": len(by_size[self.sizes[-1]][0]), "signatures": by_size[self.sizes[-1]][0]}
+            for name, by_size in results.items()
+        }
+        if os.environ.get("UPDATE_QUERY_SNAPSHOTS") == "1":
+            QUERY_SNAPSHOT_PATH.parent.mkdir(exist_ok=True)
+            QUERY_SNAPSHOT_PATH.write_text(json.dumps(snapshot, indent=2, sort_keys=True) + "\n")
+        expected = json.loads(QUERY_SNAPSHOT_PATH.read_text())
+
+        for name, by_size in results.items():
+            with self.subTest(endpoint=name):
+                report = ", ".join(
+                    f"{size} rows: {len(signatures)} queries, {size_bytes} bytes"
+                    for size, (signatures, size_bytes) in by_size.items()
+                )
+                self.assertEqual(
+                    {len(signatures) for signatures, _ in by_size.values()},
+                    {len(by_size[self.sizes[0]][0])},
+                    f"Query count grows with the data: {report}",
+                )
+                self.assertIn(name, expected, "Endpoint missing from the snapshot, rerun with UPDATE_QUERY_SNAPSHOTS=1.")
+                self.assertEqual(
+                    snapshot[name]["signatures"],
+                    expected[name]["signatures"],
+                    f"Queries changed ({report}), rerun with UPDATE_QUERY_SNAPSHOTS=1 if intended.",
+                )
+        self.assertEqual(sorted(expected), sorted(snapshot), "Snapshot lists removed endpoints.")
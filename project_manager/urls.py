@@ -1,6 +1,6 @@
 from django.urls import include, path
 
-from . import views as api_views
+from . import async_views, views as api_views
 
 project_urlpatterns = [
     path(
@@ -8,11 +8,49 @@ project_urlpatterns = [
         api_views.ProjectListAPIView.as_view(),
         name="projects_list",
     ),
+    path(
+        "projects/changes/",
+        api_views.ProjectChangesAPIView.as_view(),
+        name="projects_changes",
+    ),
+    path(
+        "projects/stats/",
+        api_views.ProjectStatsAPIView.as_view(),
+        name="projects_stats",
+    ),
     path(
         "tasks/list/",
         api_views.TaskListAPIView.as_view(),
         name="tasks_list",
     ),
+    path(
+        "tasks/changes/",
+        api_views.TaskChangesAPIView.as_view(),
+        name="tasks_changes",
+    ),
+    path(
+        "tasks/export/",
+        api_views.TaskExportAPIView.as_view(),
+        name="tasks_export",
+    ),
+    path(
+        "tasks/search/",
+        api_views.TaskSearchAPIView.as_view(),
+        name="tasks_search",
+    ),
+    path(
+        "tasks/bulk/",
+        api_views.TaskBulkAPIView.as_view(),
+        name="tasks_bulk",
+    ),
 ]
 
-urlpatterns = project_urlpatterns
+async_urlpatterns = [
+    path("projects/list/", async_views.projects_list, name="async_projects_list"),
+    path("tasks/list/", async_views.tasks_list, name="async_tasks_list"),
+]
+
+urlpatterns = [
+    *project_urlpatterns,
+    path("async/", include(async_urlpatterns)),
+]
@@ -1,29 +1,297 @@
-from rest_framework import status
+from dataclasses import replace
+
+from django.contrib.auth.models import User
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from rest_framework import permissions, serializers, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from core.api.serializers import BaseListOutputSerializer
+from core.api.conditional import list_condition
+from core.api.pagination import MAX_PAGE_SIZE, CursorPaginationInputSerializer
+from core.api.serializers import (
+    MAX_INTEGER,
+    BaseInputSerializer,
+    BaseListOutputSerializer,
+    BaseOutputSerializer,
+    SparseFieldsetInputSerializer,
+)
+from core.api.streaming import CSV, EXPORT_FORMATS, STREAM_FORMATS, stream_queryset, stream_rows
+from core.cache import ResponseCache
+from .models import Project, Task, Team
 from .serializers import ProjectSerializer, TaskSerializer
-from .services import ProjectsReadService, TasksReadService
+from .services import (
+    DEFAULT_CHANGES_LIMIT,
+    DEFAULT_SEARCH_LIMIT,
+    TASK_EXPORT_COLUMNS,
+    TASK_ORDERINGS,
+    ProjectFilters,
+    ProjectStatsReadService,
+    ProjectsReadService,
+    RowError,
+    TaskFilters,
+    TasksReadService,
+    TasksWriteService,
+)
+
+MAX_BULK_TASKS = 5000
+MAX_SEARCH_LIMIT = 100
 
 
 class ProjectListAPIView(APIView):
+    response_cache = ResponseCache("projects_list", (Project, Team))
+
+    class ProjectListInputSerializer(CursorPaginationInputSerializer, SparseFieldsetInputSerializer):
+        stream = serializers.ChoiceField(choices=list(STREAM_FORMATS), required=False)
+        status = serializers.ChoiceField(choices=Project._meta.get_field("status").choices, required=False)
+        team = serializers.IntegerField(min_value=1, max_value=MAX_INTEGER, required=False)
+        start_date_after = serializers.DateField(required=False)
+        start_date_before = serializers.DateField(required=False)
 
     class ProjectListOutputSerializer(BaseListOutputSerializer):
         items = ProjectSerializer(many=True)
 
+    @method_decorator(list_condition(response_cache.model_list))
+    def get(self, request) -> Response:
+        input_serializer = self.ProjectListInputSerializer(data=request.query_params)
+        page = input_serializer.get_page_request()
+        filters = ProjectFilters.from_data(input_serializer.validated_data)
+        item_serializer = self.ProjectListOutputSerializer.get_item_serializer(
+            fields=input_serializer.validated_data.get("fields"),
+            expand=input_serializer.validated_data.get("expand"),
+        )
+        if stream_format := input_serializer.validated_data.get("stream"):
+            projects = ProjectsReadService().list(serializer=item_serializer, filters=filters)
+            return stream_queryset(projects.items, item_serializer, stream_format)
+
+        def get_output_data():
+            projects = ProjectsReadService().list(serializer=item_serializer, page=page, filters=filters)
+            return self.ProjectListOutputSerializer.get_output_data(projects, item_serializer=item_serializer)
+
+        output_data, hit = self.response_cache.get_or_set(input_serializer.validated_data, get_output_data)
+        return Response(output_data, status=status.HTTP_200_OK, headers={"X-Cache": "HIT" if hit else "MISS"})
+
+
+class ProjectChangesAPIView(APIView):
+    class ProjectChangesInputSerializer(BaseInputSerializer):
+        since = serializers.IntegerField(min_value=0, max_value=MAX_INTEGER, default=0)
+        limit = serializers.IntegerField(min_value=1, max_value=MAX_PAGE_SIZE, default=DEFAULT_CHANGES_LIMIT)
+
+    class ProjectChangesOutputSerializer(BaseOutputSerializer):
+        class ProjectChangeSerializer(ProjectSerializer):
+            id = serializers.IntegerField()
+            change_seq = serializers.IntegerField()
+
+        items = ProjectChangeSerializer(many=True)
+        deleted = serializers.ListField(child=serializers.IntegerField())
+        next = serializers.IntegerField(source="next_token")
+        has_more = serializers.BooleanField()
+
     def get(self, request) -> Response:
-        projects = ProjectsReadService().list()
-        output_data = self.ProjectListOutputSerializer.get_output_data(projects)
+        input_data = self.ProjectChangesInputSerializer(data=request.query_params).get_input_data()
+        item_serializer = self.ProjectChangesOutputSerializer().fields["items"].child
+        changes = ProjectsReadService().changes(
+            input_data["since"], serializer=item_serializer, limit=input_data["limit"]
+        )
+        output_data = self.ProjectChangesOutputSerializer.get_output_data(changes)
         return Response(output_data, status=status.HTTP_200_OK)
 
 
+class ProjectStatsAPIView(APIView):
+    response_cache = ResponseCache("projects_stats", (Project, Task, Team))
+
+    class ProjectStatsInputSerializer(CursorPaginationInputSerializer):
+        team = serializers.IntegerField(min_value=1, max_value=MAX_INTEGER, required=False)
+
+    class ProjectStatsOutputSerializer(BaseListOutputSerializer):
+        class ProjectTaskStatsSerializer(BaseOutputSerializer):
+            id = serializers.IntegerField()
+            name = serializers.CharField()
+            team = serializers.IntegerField()
+            pending = serializers.IntegerField()
+            done = serializers.IntegerField()
+            overdue = serializers.IntegerField()
+
+        class TeamTaskStatsSerializer(BaseOutputSerializer):
+            id = serializers.IntegerField()
+            name = serializers.CharField()
+            projects = serializers.IntegerField()
+            pending = serializers.IntegerField()
+            done = serializers.IntegerField()
+            overdue = serializers.IntegerField()
+
+        items = ProjectTaskStatsSerializer(many=True)
+        teams = TeamTaskStatsSerializer(many=True)
+
+    def get(self, request) -> Response:
+        input_serializer = self.ProjectStatsInputSerializer(data=request.query_params)
+        page = input_serializer.get_page_request()
+        team = input_serializer.validated_data.get("team")
+        # Overdue counts change with the date, not only with writes.
+        today = timezone.localdate()
+
+        def get_output_data():
+            stats = ProjectStatsReadService().stats(page, today=today, team=team)
+            return self.ProjectStatsOutputSerializer.get_output_data(stats)
+
+        output_data, hit = self.response_cache.get_or_set(
+            {**input_serializer.validated_data, "today": today}, get_output_data
+        )
+        return Response(output_data, status=status.HTTP_200_OK, headers={"X-Cache": "HIT" if hit else "MISS"})
+
+
 class TaskListAPIView(APIView):
+    response_cache = ResponseCache("tasks_list", (Task, Project, User, Team))
+
+    class TaskListInputSerializer(CursorPaginationInputSerializer, SparseFieldsetInputSerializer):
+        ordering = serializers.ChoiceField(choices=list(TASK_ORDERINGS), default="id")
+        stream = serializers.ChoiceField(choices=list(STREAM_FORMATS), required=False)
+        status = serializers.ChoiceField(choices=Task._meta.get_field("status").choices, required=False)
+        due_date_after = serializers.DateField(required=False)
+        due_date_before = serializers.DateField(required=False)
+        assigned_to = serializers.IntegerField(min_value=1, max_value=MAX_INTEGER, required=False)
+        project = serializers.IntegerField(min_value=1, max_value=MAX_INTEGER, required=False)
+        team = serializers.IntegerField(min_value=1, max_value=MAX_INTEGER, required=False)
 
     class TaskListOutputSerializer(BaseListOutputSerializer):
         items = TaskSerializer(many=True)
 
+    @method_decorator(list_condition(response_cache.model_list))
     def get(self, request) -> Response:
-        tasks = TasksReadService().list()
-        output_data = self.TaskListOutputSerializer.get_output_data(tasks)
-        return Response(output_data, status=status.HTTP_200_OK)
\ No newline at end of file
+        input_serializer = self.TaskListInputSerializer(data=request.query_params)
+        page = input_serializer.get_page_request()
+        ordering = input_serializer.validated_data["ordering"]
+        filters = TaskFilters.from_data(input_serializer.validated_data)
+        item_serializer = self.TaskListOutputSerializer.get_item_serializer(
+            fields=input_serializer.validated_data.get("fields"),
+            expand=input_serializer.validated_data.get("expand"),
+        )
+        if stream_format := input_serializer.validated_data.get("stream"):
+            tasks = TasksReadService().list(serializer=item_serializer, ordering=ordering, filters=filters)
+            return stream_queryset(tasks.items, item_serializer, stream_format)
+
+        def get_output_data():
+            tasks = TasksReadService().list(serializer=item_serializer, page=page, ordering=ordering, filters=filters)
+            return self.TaskListOutputSerializer.get_output_data(tasks, item_serializer=item_serializer)
+
+        output_data, hit = self.response_cache.get_or_set(input_serializer.validated_data, get_output_data)
+        return Response(output_data, status=status.HTTP_200_OK, headers={"X-Cache": "HIT" if hit else "MISS"})
+
+
+class TaskChangesAPIView(APIView):
+    class TaskChangesInputSerializer(BaseInputSerializer):
+        since = serializers.IntegerField(min_value=0, max_value=MAX_INTEGER, default=0)
+        limit = serializers.IntegerField(min_value=1, max_value=MAX_PAGE_SIZE, default=DEFAULT_CHANGES_LIMIT)
+
+    class TaskChangesOutputSerializer(BaseOutputSerializer):
+        class TaskChangeSerializer(TaskSerializer):
+            id = serializers.IntegerField()
+            change_seq = serializers.IntegerField()
+
+        items = TaskChangeSerializer(many=True)
+        deleted = serializers.ListField(child=serializers.IntegerField())
+        next = serializers.IntegerField(source="next_token")
+        has_more = serializers.BooleanField()
+
+    def get(self, request) -> Response:
+        input_data = self.TaskChangesInputSerializer(data=request.query_params).get_input_data()
+        item_serializer = self.TaskChangesOutputSerializer().fields["items"].child
+        changes = TasksReadService().changes(
+            input_data["since"], serializer=item_serializer, limit=input_data["limit"]
+        )
+        output_data = self.TaskChangesOutputSerializer.get_output_data(changes)
+        return Response(output_data, status=status.HTTP_200_OK)
+
+
+class TaskExportAPIView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    class TaskExportInputSerializer(BaseInputSerializer):
+        # Not `format`, DRF reads it to pick a renderer.
+        output = serializers.ChoiceField(choices=list(EXPORT_FORMATS), default=CSV)
+        gzip = serializers.BooleanField(default=False)
+        ordering = serializers.ChoiceField(choices=list(TASK_ORDERINGS), default="id")
+        status = serializers.ChoiceField(choices=Task._meta.get_field("status").choices, required=False)
+        due_date_after = serializers.DateField(required=False)
+        due_date_before = serializers.DateField(required=False)
+        assigned_to = serializers.IntegerField(min_value=1, max_value=MAX_INTEGER, required=False)
+        project = serializers.IntegerField(min_value=1, max_value=MAX_INTEGER, required=False)
+        team = serializers.IntegerField(min_value=1, max_value=MAX_INTEGER, required=False)
+
+    def get(self, request) -> StreamingHttpResponse:
+        input_data = self.TaskExportInputSerializer(data=request.query_params).get_input_data()
+        rows = TasksReadService().export(TaskFilters.from_data(input_data), ordering=input_data["ordering"])
+        return stream_rows(
+            rows,
+            tuple(TASK_EXPORT_COLUMNS),
+            input_data["output"],
+            filename="tasks",
+            compress=input_data["gzip"],
+        )
+
+
+class TaskSearchAPIView(APIView):
+    response_cache = ResponseCache("tasks_search", (Task, Project, User, Team))
+
+    class TaskSearchInputSerializer(BaseInputSerializer):
+        q = serializers.CharField(max_length=255)
+        limit = serializers.IntegerField(min_value=1, max_value=MAX_SEARCH_LIMIT, default=DEFAULT_SEARCH_LIMIT)
+
+    class TaskSearchOutputSerializer(BaseOutputSerializer):
+        items = TaskSerializer(many=True)
+
+    def get(self, request) -> Response:
+        input_data = self.TaskSearchInputSerializer(data=request.query_params).get_input_data()
+        item_serializer = self.TaskSearchOutputSerializer().fields["items"].child
+
+        def get_output_data():
+            tasks = TasksReadService().search(input_data["q"], serializer=item_serializer, limit=input_data["limit"])
+            return self.TaskSearchOutputSerializer.get_output_data(tasks)
+
+        output_data, hit = self.response_cache.get_or_set(input_data, get_output_data)
+        return Response(output_data, status=status.HTTP_200_OK, headers={"X-Cache": "HIT" if hit else "MISS"})
+
+
+class TaskBulkAPIView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    class TaskBulkRowInputSerializer(BaseInputSerializer):
+        id = serializers.IntegerField(min_value=1, max_value=MAX_INTEGER, required=False)
+        project = serializers.IntegerField(min_value=1, max_value=MAX_INTEGER)
+        assigned_to = serializers.IntegerField(min_value=1, max_value=MAX_INTEGER)
+        title = serializers.CharField(max_length=255)
+        description = serializers.CharField(allow_blank=True)
+        due_date = serializers.DateField()
+        status = serializers.ChoiceField(choices=Task._meta.get_field("status").choices)
+
+    class TaskBulkInputSerializer(BaseInputSerializer):
+        tasks = serializers.ListField(child=serializers.DictField(), allow_empty=False, max_length=MAX_BULK_TASKS)
+
+    class TaskBulkOutputSerializer(BaseOutputSerializer):
+        class RowErrorSerializer(BaseOutputSerializer):
+            index = serializers.IntegerField()
+            errors = serializers.DictField()
+
+        created = serializers.IntegerField()
+        updated = serializers.IntegerField()
+        errors = RowErrorSerializer(many=True)
+
+    def post(self, request) -> Response:
+        input_data = self.TaskBulkInputSerializer(data=request.data).get_input_data()
+
+        # One serializer validates every row, errors are collected per row instead of failing the batch.
+        row_serializer = self.TaskBulkRowInputSerializer()
+        rows = []
+        field_errors = []
+        for index, row in enumerate(input_data["tasks"]):
+            try:
+                rows.append((index, row_serializer.run_validation(row)))
+            except serializers.ValidationError as error:
+                field_errors.append(RowError(index=index, errors=error.detail))
+
+        result = TasksWriteService().bulk_upsert(rows)
+        result = replace(result, errors=sorted(field_errors + result.errors, key=lambda error: error.index))
+        output_data = self.TaskBulkOutputSerializer.get_output_data(result)
+        succeeded = result.created + result.updated
+        return Response(output_data, status=status.HTTP_200_OK if succeeded else status.HTTP_400_BAD_REQUEST)